@@ -0,0 +1,331 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   bench.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   benchmarks of the graph, IO and rendering on synthetic graphs (see
+#   generators.py). Each case is timed several times on a new graph and
+#   its peak memory is measured with tracemalloc in a separate run. The
+#   results are written in a json file, two files are compared to find
+#   the regressions :
+#
+#       python3 benchmarks/bench.py run -o before.json
+#       ...
+#       python3 benchmarks/bench.py run -o after.json
+#       python3 benchmarks/bench.py compare before.json after.json
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generators import GENERATORS
+from graphs.graph.geometry import vertex_bbox, vertex_center
+from graphs.graph.graph import Graph, Vertex, Edge
+from graphs.utils.columnar import ColumnarIO
+from graphs.utils.read_write import IO
+from graphs.export.png import PNGExporter
+from graphs.export.svg import SVGExporter
+
+# the png rendering needs Pillow
+PILLOW = importlib.util.find_spec('PIL') is not None
+
+# number of verticies of the graphs
+SIZE = 10000
+# number of timed runs of each case
+REPEAT = 5
+# a case is a regression when it is slower by more than this ratio...
+THRESHOLD = 0.10
+# ... and by more than this time in s, or memory in bytes, below it is
+# noise
+NOISE = 0.001
+MEMORY_NOISE = 64 * 1024
+# number of points looked up in the lookup case
+LOOKUPS = 1000
+
+# -----------------------------------------------------------------------------
+# cases, a case gets the fixture and returns the function to time, what
+# is done before is not timed.
+
+def make_items(positions, edges):
+    """
+    :param positions: (list(Tuple(float, float))) centers of the verticies.
+    :param edges: (list(Tuple(int, int))) indexes of the ends of the edges.
+
+    :returns: (Tuple(list(Vertex), list(Edge))) new items.
+    """
+    verticies = [Vertex(None, None, str(i), list(vertex_bbox(x, y)))
+                 for i, (x, y) in enumerate(positions)]
+    return verticies, [Edge(verticies[i], verticies[j], None, weight=1)
+                       for i, j in edges]
+
+def make_graph(fixture, compact=False):
+    verticies, edges = make_items(*fixture)
+    return Graph(verticies=verticies, edges=edges, compact=compact)
+
+def case_build(fixture, tmp):
+    verticies, edges = make_items(*fixture)
+
+    def run():
+        graph = Graph()
+        for vertex in verticies:
+            graph.add_vx(vertex)
+        for edge in edges:
+            graph.add_edge(edge)
+    return run
+
+def case_load(fixture, tmp):
+    verticies, edges = make_items(*fixture)
+    return lambda: Graph(verticies=verticies, edges=edges)
+
+def case_load_compact(fixture, tmp):
+    verticies, edges = make_items(*fixture)
+    return lambda: Graph(verticies=verticies, edges=edges, compact=True)
+
+def case_lookup(fixture, tmp):
+    graph = make_graph(fixture)
+    verticies = list(graph.get_verticies())
+    points = [vertex_center(vertex) for vertex in
+              random.Random(0).sample(verticies, min(LOOKUPS, len(verticies)))]
+
+    def run():
+        for x, y in points:
+            graph.find_item_at(x, y)
+        for vertex in verticies:
+            for edge in graph.get_incident_edges(vertex):
+                pass
+    return run
+
+def case_delete(fixture, tmp):
+    graph = make_graph(fixture)
+    rng = random.Random(0)
+    edges = rng.sample(list(graph.get_edges()), len(graph.get_edges()) // 10)
+    verticies = rng.sample(list(graph.get_verticies()),
+                           len(graph.get_verticies()) // 10)
+
+    def run():
+        for edge in edges:
+            graph.remove_edge(edge)
+        for vertex in verticies:
+            graph.remove_vx(vertex)
+    return run
+
+def case_adjacency(fixture, tmp):
+    graph = make_graph(fixture)
+    return graph.generate_adjacency_list
+
+def case_csr(fixture, tmp):
+    # a new graph, its CSR is not cached yet
+    graph = make_graph(fixture)
+    return graph.get_csr
+
+def case_io_write(fixture, tmp):
+    graph = make_graph(fixture)
+    filename = os.path.join(tmp, 'graph.graph')
+
+    def run():
+        with open(filename, 'w') as f:
+            IO().parse(f, graph)
+    return run
+
+def case_io_read(fixture, tmp):
+    filename = os.path.join(tmp, 'graph.graph')
+    with open(filename, 'w') as f:
+        IO().parse(f, make_graph(fixture))
+    return lambda: IO().read(filename)
+
+def case_columnar_write(fixture, tmp):
+    graph = make_graph(fixture, compact=True)
+    filename = os.path.join(tmp, 'columnar.graph')
+    return lambda: ColumnarIO().write(filename, graph)
+
+def case_columnar_read(fixture, tmp):
+    filename = os.path.join(tmp, 'columnar.graph')
+    ColumnarIO().write(filename, make_graph(fixture, compact=True))
+    return lambda: ColumnarIO().read(filename)
+
+def case_render_png(fixture, tmp):
+    graph = make_graph(fixture)
+    return lambda: PNGExporter().render(graph)
+
+def case_render_svg(fixture, tmp):
+    graph = make_graph(fixture)
+    filename = os.path.join(tmp, 'graph.svg')
+    return lambda: SVGExporter().write(filename, graph)
+
+CASES = {'build' : case_build,
+         'load' : case_load,
+         'load_compact' : case_load_compact,
+         'lookup' : case_lookup,
+         'delete' : case_delete,
+         'adjacency' : case_adjacency,
+         'csr' : case_csr,
+         'io_write' : case_io_write,
+         'io_read' : case_io_read,
+         'columnar_write' : case_columnar_write,
+         'columnar_read' : case_columnar_read,
+         'render_png' : case_render_png,
+         'render_svg' : case_render_svg}
+
+# -----------------------------------------------------------------------------
+
+def measure(case, fixture, repeat):
+    """
+    :param case: (function)
+    :param fixture: (Tuple(list, list))
+    :param repeat: (int) number of timed runs.
+
+    :returns: (dict) min and median time in s, peak memory in bytes.
+    """
+    times = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            run = case(fixture, tmp)
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        # the peak is measured apart, tracemalloc slows down the run
+        run = case(fixture, tmp)
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {'min' : min(times),
+            'median' : statistics.median(times),
+            'peak' : peak}
+
+def run_all(size, repeat, fixtures, cases, out=sys.stdout):
+    """
+    :param size: (int) number of verticies of the graphs.
+    :param repeat: (int)
+    :param fixtures: (list(str)) names of the generators.
+    :param cases: (list(str)) names of the cases.
+
+    :returns: (dict) the results by 'fixture/case'.
+    """
+    results = {}
+    for name in fixtures:
+        fixture = GENERATORS[name](size)
+        for case in cases:
+            if case == 'render_png' and not PILLOW:
+                continue
+            result = measure(CASES[case], fixture, repeat)
+            result.update(verticies=len(fixture[0]), edges=len(fixture[1]))
+            results['{}/{}'.format(name, case)] = result
+            out.write('{:<30} {:>10.2f} ms {:>10.1f} KiB\n'.format(
+                            '{}/{}'.format(name, case),
+                            result['median'] * 1000,
+                            result['peak'] / 1024))
+            out.flush()
+    return results
+
+def compare(old, new, threshold=THRESHOLD, out=sys.stdout):
+    """
+    :param old: (dict) results of the reference run.
+    :param new: (dict) results of the new run.
+    :param threshold: (float) ratio over which a case is a regression.
+
+    :returns: (list(str)) the cases slower or using more memory.
+    """
+    regressions = []
+    for key in sorted(set(old) & set(new)):
+        before, after = old[key], new[key]
+        # the fastest run is the least disturbed by the rest of the system
+        ratio = after['min'] / max(before['min'], 1e-12)
+        memory = after['peak'] / max(before['peak'], 1)
+        slower = ratio > 1 + threshold and after['min'] - before['min'] > NOISE
+        larger = memory > 1 + threshold and \
+                 after['peak'] - before['peak'] > MEMORY_NOISE
+        flag = 'REGRESSION' if slower or larger else ''
+        if flag:
+            regressions.append(key)
+        out.write('{:<30} {:>10.2f} -> {:>10.2f} ms ({:+6.1%}) '
+                  'memory {:+6.1%} {}\n'.format(key,
+                                                before['min'] * 1000,
+                                                after['min'] * 1000,
+                                                ratio - 1,
+                                                memory - 1,
+                                                flag))
+
+    for key in sorted(set(old) ^ set(new)):
+        out.write('{:<30} only in {}\n'.format(key, 'old' if key in old else 'new'))
+    return regressions
+
+def _commit():
+    """
+    :returns: (str) current git commit, None outside of a git repository.
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='graphix benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks')
+    run.add_argument('-o', '--output', default='bench.json')
+    run.add_argument('--size', type=int, default=SIZE,
+                     help='number of verticies of the graphs')
+    run.add_argument('--repeat', type=int, default=REPEAT)
+    run.add_argument('--fixtures', nargs='+', default=list(GENERATORS),
+                     choices=list(GENERATORS))
+    run.add_argument('--cases', nargs='+', default=list(CASES),
+                     choices=list(CASES))
+
+    diff = commands.add_parser('compare', help='compare two runs')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_all(args.size, args.repeat, args.fixtures, args.cases)
+        with open(args.output, 'w') as f:
+            json.dump({'meta' : {'date' : datetime.datetime.now().isoformat(),
+                                 'commit' : _commit(),
+                                 'python' : platform.python_version(),
+                                 'platform' : platform.platform(),
+                                 'size' : args.size,
+                                 'repeat' : args.repeat},
+                       'results' : results}, f, indent=1)
+    else:
+        with open(args.old) as f:
+            old = json.load(f)['results']
+        with open(args.new) as f:
+            new = json.load(f)['results']
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print('{} regressions'.format(len(regressions)))
+            sys.exit(1)
@@ -0,0 +1,130 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   generators.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   synthetic graphs of a given size and shape for the benchmarks. A
+#   generator returns the verticies, placed on the canvas, and the edges
+#   as pairs of indexes, so the benchmarks can time the construction of
+#   the graph too. The random graphs are the same for a same seed.
+
+import math
+import random
+
+# distance between two neighbour verticies on the canvas
+SPACING = 40
+
+def path(n):
+    """
+    :param n: (int) number of verticies.
+
+    :returns: (Tuple(list, list)) positions and edges of a path.
+    """
+    side = max(1, int(math.sqrt(n)))
+    positions = [_grid_position(i, side) for i in range(n)]
+    return positions, [(i, i + 1) for i in range(n - 1)]
+
+def grid(n):
+    """
+    :param n: (int) about the number of verticies, the grid is square.
+
+    :returns: (Tuple(list, list)) positions and edges of a grid.
+    """
+    side = max(1, int(math.sqrt(n)))
+    positions = [_grid_position(i, side) for i in range(side * side)]
+    edges = []
+    for i in range(side * side):
+        if (i + 1) % side:
+            edges.append((i, i + 1))
+        if i + side < side * side:
+            edges.append((i, i + side))
+    return positions, edges
+
+def erdos_renyi(n, degree=4, seed=0):
+    """
+    :param n: (int) number of verticies.
+    :param degree: (float) average degree.
+    :param seed: (int)
+
+    :returns: (Tuple(list, list)) positions and edges of a G(n, m) random
+    graph with m = n * degree / 2 distinct edges, without loops.
+    """
+    rng = random.Random(seed)
+    m = min(int(n * degree / 2), n * (n - 1) // 2)
+    edges = set()
+    while len(edges) < m:
+        i, j = rng.randrange(n), rng.randrange(n)
+        if i != j:
+            edges.add((min(i, j), max(i, j)))
+    return _random_positions(n, rng), sorted(edges)
+
+def power_law(n, m=2, seed=0):
+    """
+    :param n: (int) number of verticies.
+    :param m: (int) number of edges of each new vertex.
+    :param seed: (int)
+
+    :returns: (Tuple(list, list)) positions and edges of a Barabasi-Albert
+    graph, its degrees follow a power law.
+    """
+    rng = random.Random(seed)
+    m = min(m, n - 1)
+    edges = [(i, j) for i in range(m + 1) for j in range(i + 1, m + 1)]
+    # each vertex appears once per edge, so a uniform pick in this list is
+    # proportional to the degree
+    ends = [v for edge in edges for v in edge]
+    for i in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(ends))
+        for j in targets:
+            edges.append((j, i))
+            ends += [j, i]
+    return _random_positions(n, rng), edges
+
+def petersen(n, k=2):
+    """
+    :param n: (int) about the number of verticies.
+    :param k: (int)
+
+    :returns: (Tuple(list, list)) positions and edges of the generalized
+    Petersen graph GP(n / 2, k), an outer and an inner cycle. GP(5, 2) is
+    the Petersen graph.
+    """
+    half = max(3, n // 2)
+    radius = SPACING * half / (2 * math.pi)
+    positions = []
+    for ring in (radius * 2, radius):
+        positions += [(radius * 2 + ring * math.cos(2 * math.pi * i / half),
+                       radius * 2 + ring * math.sin(2 * math.pi * i / half))
+                      for i in range(half)]
+    edges = []
+    for i in range(half):
+        edges.append((i, (i + 1) % half))
+        edges.append((i, half + i))
+        edges.append((half + i, half + (i + k) % half))
+    return positions, edges
+
+GENERATORS = {'path' : path,
+              'grid' : grid,
+              'erdos_renyi' : erdos_renyi,
+              'power_law' : power_law,
+              'petersen' : petersen}
+
+# -----------------------------------------------------------------------------
+
+def _grid_position(i, side):
+    return (SPACING * (i % side + 1), SPACING * (i // side + 1))
+
+def _random_positions(n, rng):
+    size = SPACING * max(1, math.sqrt(n))
+    return [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(n)]
@@ -0,0 +1,23 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   __init__.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   graphix, draw graphs. The graph model (graph), the files (utils), the
+#   algorithms, layouts and exports do not need Tk, only the app (app.py and
+#   ui) does, so they can be used in scripts :
+#
+#       from graphs.utils.read_write import IO
+#       from graphs.algorithms.shortest_path import shortest_path
+#
+#   The subpackages import nothing here, numpy and Pillow are only loaded
+#   by the modules which need them.
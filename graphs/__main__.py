@@ -0,0 +1,21 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   __main__.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   python3 -m graphs runs the command line tool (see cli.py).
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,15 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   __init__.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   traversals, shortest paths and spanning trees of a graph.
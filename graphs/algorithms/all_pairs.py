@@ -0,0 +1,211 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   all_pairs.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   all pairs shortest paths, the distance matrix of a graph.
+#
+#   The sparse graphs run a Dijkstra from each vertex, the sources are
+#   split in blocks over a pool of processes. The workers do not receive
+#   the Vertex and Edge instances, only the arrays of the CSR adjacency
+#   in shared memory. The dense graphs use Floyd-Warshall with numpy.
+#
+#   numpy is needed for the matrix, it is an optional dependency of
+#   graphix.
+
+import os
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .shortest_path import dijkstra, _check_weights
+from ..utils.instrument import timed
+
+# with more entries in the CSR than this ratio of n * n the graph is dense
+# and Floyd-Warshall is used.
+DENSE_RATIO = 0.1
+# number of sources of a task.
+BLOCK_SIZE = 64
+# under this number of verticies the searches run in the main process.
+POOL_LIMIT = 256
+
+@timed
+def all_pairs(graph, filename=None, method='auto', workers=None):
+    """
+    :param graph: (Graph) the edges without weight count for 1.
+    :param filename: (str) if given, the matrix is a memory mapped .npy
+    file, so it can be larger than the memory.
+    :param method: (str) 'dijkstra', 'floyd_warshall' or 'auto' to choose
+    from the density of the graph.
+    :param workers: (int) number of processes, all the cpus by default.
+
+    :returns: (Tuple(list(Vertex), numpy.ndarray)) the verticies and the
+    matrix of the distances between them, matrix[i, j] is the distance
+    from verticies[i] to verticies[j], inf if there is no path.
+    """
+    if np is None:
+        raise ImportError('numpy is needed for the all pairs shortest paths')
+
+    csr = graph.get_csr()
+    _check_weights(csr)
+    n = len(csr)
+
+    if method == 'auto':
+        dense = len(csr.indices) >= DENSE_RATIO * n * n
+        method = 'floyd_warshall' if dense else 'dijkstra'
+
+    if filename is not None:
+        matrix = np.lib.format.open_memmap(filename, mode='w+',
+                                           dtype=np.float64, shape=(n, n))
+    else:
+        matrix = np.empty((n, n), dtype=np.float64)
+
+    if method == 'floyd_warshall':
+        floyd_warshall(csr, matrix)
+    elif method == 'dijkstra':
+        parallel_dijkstra(csr, matrix, workers)
+    else:
+        raise ValueError('unknown all pairs method {}'.format(method))
+
+    if filename is not None:
+        matrix.flush()
+    return csr.verticies, matrix
+
+def floyd_warshall(csr, matrix):
+    """
+    :param csr: (CSRAdjacency)
+    :param matrix: (numpy.ndarray) n x n matrix where the distances are
+    written.
+
+    Floyd-Warshall algorithm in O(n^3), each step k is a single numpy
+    operation on the whole matrix.
+    """
+    n = len(csr)
+    matrix.fill(np.inf)
+    np.fill_diagonal(matrix, 0)
+
+    # the typed arrays of the CSR are read by numpy without copy
+    rows = np.repeat(np.arange(n), np.diff(np.asarray(csr.indptr)))
+    columns = np.asarray(csr.indices)
+    weights = np.asarray(csr.weights)
+    # with multiple edges between two verticies the lightest is kept
+    np.minimum.at(matrix, (rows, columns), weights)
+
+    for k in range(n):
+        np.minimum(matrix, matrix[:, k, None] + matrix[None, k, :], out=matrix)
+
+def parallel_dijkstra(csr, matrix, workers=None):
+    """
+    :param csr: (CSRAdjacency)
+    :param matrix: (numpy.ndarray) n x n matrix where the distances are
+    written.
+    :param workers: (int) number of processes, all the cpus by default.
+
+    one Dijkstra from each vertex, the blocks of rows are written in the
+    matrix as soon as a worker has finished them.
+    """
+    n = len(csr)
+    blocks = [(first, min(first + BLOCK_SIZE, n))
+              for first in range(0, n, BLOCK_SIZE)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or n < POOL_LIMIT:
+        for first, last in blocks:
+            matrix[first:last] = _rows(_distances(csr, first, last), first, last, n)
+        return
+
+    # the arrays are copied once in shared memory, the workers attach to
+    # them when they start.
+    shared = []
+    try:
+        for column in (csr.indptr, csr.indices, csr.weights, csr.edge_ids):
+            block = shared_memory.SharedMemory(create=True,
+                                               size=max(1, len(column) * column.itemsize))
+            block.buf[:len(column) * column.itemsize] = column.tobytes()
+            shared.append((block, column.typecode, len(column)))
+
+        specs = [(block.name, typecode, length) for block, typecode, length in shared]
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(specs, n, csr.non_negative)) as pool:
+            tasks = {pool.submit(_worker, first, last) : (first, last)
+                     for first, last in blocks}
+            for task in as_completed(tasks):
+                first, last = tasks[task]
+                matrix[first:last] = _rows(task.result(), first, last, n)
+    finally:
+        for block, _, _ in shared:
+            block.close()
+            block.unlink()
+
+# -----------------------------------------------------------------------------
+
+def _distances(csr, first, last):
+    """
+    :param csr: (CSRAdjacency) or the _SharedCSR of a worker.
+    :param first: (int) first source.
+    :param last: (int) last source, excluded.
+
+    :returns: (bytes) the distances from the sources, row after row.
+    """
+    rows = array('d')
+    for source in range(first, last):
+        dist, _, _, _ = dijkstra(csr, source)
+        rows.extend(dist)
+    return rows.tobytes()
+
+def _rows(data, first, last, n):
+    """
+    :param data: (bytes) rows from _distances.
+
+    :returns: (numpy.ndarray) the rows as a (last - first) x n matrix.
+    """
+    return np.frombuffer(data, dtype=np.float64).reshape(last - first, n)
+
+class _SharedCSR(object):
+    """
+    the CSR arrays of a worker, read from the shared memory. It has the
+    attributes used by dijkstra.
+    """
+    def __init__(self, specs, n, non_negative):
+        self.blocks = []
+        columns = []
+        for name, typecode, length in specs:
+            block = shared_memory.SharedMemory(name=name)
+            self.blocks.append(block)
+            # a memoryview gives python ints and floats, which are faster
+            # than numpy scalars in the loop of dijkstra
+            columns.append(block.buf.cast('B')[:length * array(typecode).itemsize]
+                                    .cast(typecode))
+        self.indptr, self.indices, self.weights, self.edge_ids = columns
+        self.n = n
+        self.non_negative = non_negative
+
+    def __len__(self):
+        return self.n
+
+# the CSR of the worker process
+_shared_csr = None
+
+def _init_worker(specs, n, non_negative):
+    global _shared_csr
+    _shared_csr = _SharedCSR(specs, n, non_negative)
+
+def _worker(first, last):
+    return _distances(_shared_csr, first, last)
@@ -0,0 +1,67 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   result.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   result of the algorithms run on a graph.
+
+class Result(object):
+    """
+    Result class
+
+    The verticies and edges found by an algorithm (a traversal, a path, a
+    tree...), in the order the algorithm found them, so they can be 
+    highlighted on the canvas.
+    """
+    def __init__(self, verticies, edges, cost=None, expanded=None):
+        """
+        :param verticies: (list(Vertex)) 
+        :param edges: (list(Edge))
+        :param cost: (float) total weight, e.g. the length of a path.
+        :param expanded: (int) number of verticies the algorithm expanded.
+
+        Constructor.
+        """
+        self.verticies = verticies
+        self.edges = edges
+        self.cost = cost
+        self.expanded = expanded
+
+    def get_verticies(self):
+        """
+        :returns: (list(Vertex))
+        """
+        return self.verticies
+
+    def get_edges(self):
+        """
+        :returns: (list(Edge))
+        """
+        return self.edges
+
+    def get_cost(self):
+        """
+        :returns: (float)
+        """
+        return self.cost
+
+    def get_expanded(self):
+        """
+        :returns: (int)
+        """
+        return self.expanded
+
+    def __repr__(self):
+        return 'result ({}), cost : {}, expanded : {}'.format(
+                            [vertex.get_label() for vertex in self.verticies],
+                            self.cost,
+                            self.expanded)
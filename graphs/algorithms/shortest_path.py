@@ -0,0 +1,317 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   shortest_path.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   shortest paths with Dijkstra algorithm and a binary heap, on the CSR 
+#   adjacency of the graph. The edges without weight count for 1.
+#
+#   For a path between two verticies, A* and the bidirectional Dijkstra
+#   only expand the verticies around the path, their state is kept in 
+#   dicts so a query does not touch the whole graph.
+
+import heapq
+import math
+
+from array import array
+
+from .result import Result
+from ..graph.geometry import vertex_center
+from ..utils.instrument import timed
+
+METHODS = ('dijkstra', 'astar', 'bidirectional')
+
+INF = float('inf')
+
+def _check_weights(csr):
+    """
+    :param csr: (CSRAdjacency)
+
+    Dijkstra algorithm is wrong with negative weights.
+    """
+    if not csr.non_negative:
+        raise ValueError('Dijkstra algorithm needs non negative weights')
+
+def dijkstra(csr, start, target=None):
+    """
+    :param csr: (CSRAdjacency) adjacency of the graph.
+    :param start: (int) index of the source vertex.
+    :param target: (int) index of the target vertex, the search stops 
+    when its distance is known.
+
+    :returns: (Tuple(array, array, array, int)) the distance to each 
+    vertex (inf if it is not reachable), the previous vertex and the edge
+    used to reach each vertex (-1 for the source and the unreached ones)
+    and the number of expanded verticies.
+
+    Dijkstra algorithm in O((V + E) log V). The heap has stale entries 
+    instead of a decrease key operation, an entry is skipped when a 
+    shorter distance was found in the meantime.
+    """
+    _check_weights(csr)
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+    edge_ids = csr.edge_ids
+    n = len(csr)
+
+    dist = array('d', [INF]) * n
+    pred = array('l', [-1]) * n
+    pred_edge = array('l', [-1]) * n
+    done = bytearray(n)
+    expanded = 0
+
+    dist[start] = 0
+    heap = [(0, start)]
+    while heap:
+        d, i = heapq.heappop(heap)
+        if done[i]:
+            continue
+        done[i] = 1
+        expanded += 1
+        if i == target:
+            break
+
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            d_j = d + weights[k]
+            if d_j < dist[j]:
+                dist[j] = d_j
+                pred[j] = i
+                pred_edge[j] = edge_ids[k]
+                heapq.heappush(heap, (d_j, j))
+
+    return dist, pred, pred_edge, expanded
+
+def _path_from(pred, pred_edge, start, end):
+    """
+    :param pred: (array) previous vertex of each vertex.
+    :param pred_edge: (array) edge used to reach each vertex.
+    :param start: (int) index of the source vertex.
+    :param end: (int) index of the last vertex of the path.
+
+    :returns: (Tuple(list(int), list(int))) indexes of the verticies and 
+    of the edges of the path from start to end.
+    """
+    verticies = [end]
+    edges = []
+    i = end
+    while i != start:
+        edges.append(pred_edge[i])
+        i = pred[i]
+        verticies.append(i)
+
+    verticies.reverse()
+    edges.reverse()
+    return verticies, edges
+
+def astar(csr, start, target):
+    """
+    :param csr: (CSRAdjacency) adjacency of the graph.
+    :param start: (int) index of the source vertex.
+    :param target: (int) index of the target vertex.
+
+    :returns: (Tuple(float, dict, dict, int)) the distance to target (inf
+    if it is not reachable), the previous vertex and the edge used to 
+    reach each expanded vertex and the number of expanded verticies.
+
+    A* algorithm, the heuristic is the euclidean distance to target on
+    the canvas times the smallest weight per unit of length of the edges
+    (see CSRAdjacency.length_scale). It is never more than the cost of a
+    path to target, so the path found is a shortest one. With an edge of
+    weight 0 the heuristic is 0, A* is then Dijkstra.
+    """
+    _check_weights(csr)
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+    edge_ids, verticies = csr.edge_ids, csr.verticies
+    x_target, y_target = vertex_center(verticies[target])
+    scale = csr.length_scale()
+    if scale == INF:
+        # no edge with a length, target is only reachable by loops
+        scale = 0
+
+    # the heuristic is computed only for the verticies reached
+    heuristic = {}
+    def h(i):
+        value = heuristic.get(i)
+        if value is None:
+            x, y = vertex_center(verticies[i])
+            value = heuristic[i] = scale * math.hypot(x - x_target, y - y_target)
+        return value
+
+    dist = {start : 0}
+    pred = {start : (-1, -1)}
+    done = set()
+
+    heap = [(h(start), start)]
+    while heap:
+        _, i = heapq.heappop(heap)
+        if i in done:
+            continue
+        done.add(i)
+        if i == target:
+            break
+
+        d = dist[i]
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            d_j = d + weights[k]
+            if d_j < dist.get(j, INF):
+                dist[j] = d_j
+                pred[j] = (i, edge_ids[k])
+                heapq.heappush(heap, (d_j + h(j), j))
+
+    return dist.get(target, INF), pred, len(done)
+
+def bidirectional(csr, reverse_csr, start, target):
+    """
+    :param csr: (CSRAdjacency) adjacency of the graph.
+    :param reverse_csr: (CSRAdjacency) adjacency with the edges reversed,
+    the same as csr for an undirected graph.
+    :param start: (int) index of the source vertex.
+    :param target: (int) index of the target vertex.
+
+    :returns: (Tuple(float, list(int), list(int), int)) the distance to 
+    target (inf if it is not reachable), the indexes of the verticies and
+    of the edges of the path and the number of expanded verticies.
+
+    Bidirectional Dijkstra algorithm, a search from start on the graph and
+    one from target on the reversed graph, the search with the smallest 
+    distance is expanded first. It stops when the two distances add up to
+    more than the shortest path found where the searches meet.
+    """
+    _check_weights(csr)
+    searches = []
+    for adjacency, source in ((csr, start), (reverse_csr, target)):
+        searches.append({'csr' : adjacency, 
+                         'dist' : {source : 0},
+                         'pred' : {source : (-1, -1)},
+                         'done' : set(),
+                         'heap' : [(0, source)]})
+
+    best = INF if start != target else 0
+    meeting = start
+    expanded = 0
+
+    while searches[0]['heap'] and searches[1]['heap']:
+        if searches[0]['heap'][0][0] + searches[1]['heap'][0][0] >= best:
+            break
+
+        # the side with the closest vertex on its heap
+        side = 0 if searches[0]['heap'][0][0] <= searches[1]['heap'][0][0] else 1
+        search, other = searches[side], searches[1 - side]
+
+        d, i = heapq.heappop(search['heap'])
+        if i in search['done']:
+            continue
+        search['done'].add(i)
+        expanded += 1
+
+        adjacency, dist, pred = search['csr'], search['dist'], search['pred']
+        indptr, indices = adjacency.indptr, adjacency.indices
+        weights, edge_ids = adjacency.weights, adjacency.edge_ids
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            d_j = d + weights[k]
+            if d_j < dist.get(j, INF):
+                dist[j] = d_j
+                pred[j] = (i, edge_ids[k])
+                heapq.heappush(search['heap'], (d_j, j))
+
+            # the path through the edge (i, j) when j was reached by the 
+            # other search
+            if j in other['dist'] and d_j + other['dist'][j] < best:
+                best = d_j + other['dist'][j]
+                meeting = j
+
+    if best == INF:
+        return INF, [], [], expanded
+
+    # from start to the meeting vertex, then from it to target
+    verticies, edges = _path_from_dict(searches[0]['pred'], start, meeting)
+    back_verticies, back_edges = _path_from_dict(searches[1]['pred'], 
+                                                 target, meeting)
+    verticies += reversed(back_verticies[:-1])
+    edges += reversed(back_edges)
+    return best, verticies, edges, expanded
+
+def _path_from_dict(pred, start, end):
+    """
+    :param pred: (dict) previous vertex and edge of each reached vertex.
+    :param start: (int) index of the source vertex.
+    :param end: (int) index of the last vertex of the path.
+
+    :returns: (Tuple(list(int), list(int))) same as _path_from.
+    """
+    verticies = [end]
+    edges = []
+    i = end
+    while i != start:
+        i, edge = pred[i]
+        edges.append(edge)
+        verticies.append(i)
+
+    verticies.reverse()
+    edges.reverse()
+    return verticies, edges
+
+@timed
+def shortest_path(graph, source, target, method='dijkstra'):
+    """
+    :param graph: (Graph)
+    :param source: (Vertex)
+    :param target: (Vertex)
+    :param method: (str) 'dijkstra', 'astar' or 'bidirectional'.
+
+    :returns: (Result) the verticies and edges of a shortest path from 
+    source to target, with its cost and the number of verticies the 
+    method expanded. None if target is not reachable.
+    """
+    if method not in METHODS:
+        raise ValueError('unknown shortest path method {}'.format(method))
+
+    csr = graph.get_csr()
+    start = csr.index_of[source]
+    end = csr.index_of[target]
+
+    if method == 'dijkstra':
+        dist, pred, pred_edge, expanded = dijkstra(csr, start, end)
+        cost = dist[end]
+        if cost != INF:
+            verticies, edges = _path_from(pred, pred_edge, start, end)
+
+    elif method == 'astar':
+        cost, pred, expanded = astar(csr, start, end)
+        if cost != INF:
+            verticies, edges = _path_from_dict(pred, start, end)
+
+    else:
+        cost, verticies, edges, expanded = bidirectional(
+                                                csr, graph.get_csr(reverse=True),
+                                                start, end)
+
+    if cost == INF:
+        return None
+
+    return Result([csr.verticies[i] for i in verticies],
+                  [csr.edges[k] for k in edges],
+                  cost=cost,
+                  expanded=expanded)
+
+def distances(graph, source):
+    """
+    :param graph: (Graph)
+    :param source: (Vertex)
+
+    :returns: (dict) the distance from source to each reachable vertex.
+    """
+    csr = graph.get_csr()
+    dist, _, _, _ = dijkstra(csr, csr.index_of[source])
+    return {csr.verticies[i] : d for i, d in enumerate(dist) if d != INF}
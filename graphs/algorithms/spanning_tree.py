@@ -0,0 +1,176 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   spanning_tree.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   minimum spanning tree of an undirected graph, with Kruskal or Prim
+#   algorithm. When the graph is not connected the result is a minimum
+#   spanning forest, a tree for each connected component. The edges
+#   without weight count for 1.
+
+import heapq
+
+from array import array
+
+from .result import Result
+from ..utils.instrument import timed
+
+# with more edges than this ratio of n * (n - 1) / 2 the graph is dense
+# and Prim algorithm is used.
+DENSE_RATIO = 0.1
+METHODS = ('auto', 'kruskal', 'prim')
+
+class UnionFind(object):
+    """
+    UnionFind class
+
+    disjoint sets of the integers from 0 to n-1, with path compression
+    and union by rank, each operation is in almost constant time.
+    """
+    def __init__(self, n):
+        """
+        :param n: (int) number of elements, each one in its own set.
+
+        Constructor.
+        """
+        self.parent = array('l', range(n))
+        self.rank = bytearray(n)
+
+    def find(self, i):
+        """
+        :param i: (int)
+
+        :returns: (int) the representative of the set of i.
+        """
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+
+        # path compression, every element on the way points to the root
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        """
+        :param i: (int)
+        :param j: (int)
+
+        :returns: (bool) False if i and j were already in the same set.
+        """
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+
+        # the shortest tree goes under the highest one
+        if self.rank[root_i] < self.rank[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        if self.rank[root_i] == self.rank[root_j]:
+            self.rank[root_i] += 1
+        return True
+
+# -----------------------------------------------------------------------------
+
+def _weight(edge):
+    """
+    :param edge: (Edge)
+
+    :returns: (float) weight of the edge, 1 if it has no weight.
+    """
+    weight = edge.get_weight()
+    return 1 if weight is None else weight
+
+def kruskal(csr):
+    """
+    :param csr: (CSRAdjacency) adjacency of an undirected graph.
+
+    :returns: (list(int)) indexes of the edges of the tree.
+
+    Kruskal algorithm in O(E log E), the edges are taken by increasing
+    weight when they join two trees of the forest.
+    """
+    edges = csr.edges
+    index_of = csr.index_of
+    sets = UnionFind(len(csr))
+    tree = []
+
+    for k in sorted(range(len(edges)), key=lambda k: _weight(edges[k])):
+        edge = edges[k]
+        if sets.union(index_of[edge.get_vx_start()], index_of[edge.get_vx_end()]):
+            tree.append(k)
+            if len(tree) == len(csr) - 1:
+                break
+    return tree
+
+def prim(csr):
+    """
+    :param csr: (CSRAdjacency) adjacency of an undirected graph.
+
+    :returns: (list(int)) indexes of the edges of the tree.
+
+    lazy Prim algorithm in O(E log E), the tree grows from a vertex with
+    the lightest edge on a heap, the edges leading to a vertex already in
+    the tree are skipped when they are popped.
+    """
+    indptr, indices = csr.indptr, csr.indices
+    weights, edge_ids = csr.weights, csr.edge_ids
+    n = len(csr)
+    in_tree = bytearray(n)
+    tree = []
+
+    # a new tree of the forest is started from each vertex not reached
+    for root in range(n):
+        if in_tree[root]:
+            continue
+
+        heap = [(0, root, -1)]
+        while heap:
+            _, i, edge = heapq.heappop(heap)
+            if in_tree[i]:
+                continue
+            in_tree[i] = 1
+            if edge != -1:
+                tree.append(edge)
+
+            for k in range(indptr[i], indptr[i + 1]):
+                j = indices[k]
+                if not in_tree[j]:
+                    heapq.heappush(heap, (weights[k], j, edge_ids[k]))
+    return tree
+
+@timed
+def minimum_spanning_tree(graph, method='auto'):
+    """
+    :param graph: (Graph) an undirected graph.
+    :param method: (str) 'kruskal', 'prim' or 'auto' to choose from the
+    density of the graph, Kruskal for the sparse graphs and Prim for the
+    dense ones.
+
+    :returns: (Result) the verticies of the graph and the edges of the
+    tree, with its total weight.
+    """
+    if graph.is_directed():
+        raise ValueError('a spanning tree needs an undirected graph')
+    if method not in METHODS:
+        raise ValueError('unknown spanning tree method {}'.format(method))
+
+    csr = graph.get_csr()
+    n = len(csr)
+    if method == 'auto':
+        dense = len(csr.edges) >= DENSE_RATIO * n * (n - 1) / 2
+        method = 'prim' if dense else 'kruskal'
+
+    tree = prim(csr) if method == 'prim' else kruskal(csr)
+    edges = [csr.edges[k] for k in tree]
+    return Result(csr.verticies, edges, cost=sum(_weight(edge) for edge in edges))
@@ -0,0 +1,98 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   traversal.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   breadth first and depth first traversals, on the CSR adjacency of
+#   the graph and without recursion.
+
+from collections import deque
+
+from .result import Result
+from ..utils.instrument import timed
+
+@timed
+def bfs(graph, source):
+    """
+    :param graph: (Graph)
+    :param source: (Vertex) where the traversal starts.
+
+    :returns: (Result) the verticies in the order they are reached and the
+    edges of the traversal tree.
+
+    Breadth first traversal in O(V + E), a directed graph is traversed
+    along the direction of its edges.
+    """
+    csr = graph.get_csr()
+    indptr, indices, edge_ids = csr.indptr, csr.indices, csr.edge_ids
+    start = csr.index_of[source]
+
+    seen = bytearray(len(csr))
+    seen[start] = 1
+    order = [start]
+    tree = []
+
+    queue = deque([start])
+    while queue:
+        i = queue.popleft()
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if not seen[j]:
+                seen[j] = 1
+                order.append(j)
+                tree.append(edge_ids[k])
+                queue.append(j)
+
+    return Result([csr.verticies[i] for i in order], 
+                  [csr.edges[k] for k in tree],
+                  expanded=len(order))
+
+@timed
+def dfs(graph, source):
+    """
+    :param graph: (Graph)
+    :param source: (Vertex) where the traversal starts.
+
+    :returns: (Result) the verticies in preorder and the edges of the 
+    traversal tree.
+
+    Depth first traversal in O(V + E), same order as the recursive 
+    version but with an explicit stack, so there is no recursion limit.
+    """
+    csr = graph.get_csr()
+    indptr, indices, edge_ids = csr.indptr, csr.indices, csr.edge_ids
+    start = csr.index_of[source]
+
+    seen = bytearray(len(csr))
+    seen[start] = 1
+    order = [start]
+    tree = []
+
+    # each entry is a vertex and the next of its neighbours to look at
+    stack = [(start, indptr[start])]
+    while stack:
+        i, k = stack[-1]
+        if k == indptr[i + 1]:
+            stack.pop()
+            continue
+
+        stack[-1] = (i, k + 1)
+        j = indices[k]
+        if not seen[j]:
+            seen[j] = 1
+            order.append(j)
+            tree.append(edge_ids[k])
+            stack.append((j, indptr[j]))
+
+    return Result([csr.verticies[i] for i in order], 
+                  [csr.edges[k] for k in tree],
+                  expanded=len(order))
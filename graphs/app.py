@@ -8,27 +8,43 @@
 #
 #   app.py
 # 
-#   last update 30/07/22
+#   last update 18/10/26
 #
 #   laurent vouriot
 #
 #   The main app file where the window and 
 #   the widgets are created.
 
-from tkinter import filedialog as fd
-from tkinter import PhotoImage  # app icon 
-from tkinter import ttk
-from tkinter.colorchooser import askcolor 
-
-from PIL import ImageGrab # save as png
-
-import time
 import os
-
-from ui.items import *
-from utils.log import * 
-from utils.read_write import * 
-from utils.graph_exc import *
+import sys
+
+if __package__ in (None, ''):
+    # run as a script, python3 app.py : graphix is imported as a package
+    # from the parent directory so the relative imports work.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import graphs
+    __package__ = 'graphs'
+
+# the dialogs, algorithms, layouts and exports are imported in the methods
+# which use them, the first time, so the app starts without loading numpy
+# or Pillow.
+from .ui.items import *
+from .ui.renderer import *
+from .utils.log import * 
+from .utils.read_write import * 
+from .utils.graph_exc import *
+from .utils.journal import Journal, SUFFIX
+from .utils.columnar import ColumnarIO
+from .utils.instrument import timed, log_stats, dump_trace, ENABLED
+from .utils.watchdog import Watchdog
+
+# graphs with more items than this are drawn with culling when opened
+CULLING_THRESHOLD = 5000
+
+# journal of the graph not saved yet, replayed when the app starts
+SAVED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                         '..', 'saved')
+UNTITLED_JOURNAL = os.path.join(SAVED_DIR, 'untitled' + SUFFIX)
 
 class App(tk.Frame):
     """
@@ -44,10 +60,14 @@ class App(tk.Frame):
         Constructor.
         """
         self.graph = Graph()
+        # .graph file of the graph, None until it is saved
+        self.filename = None
+        self.journal = None
         tk.Frame.__init__(self, master)
         self.configure(bg='#D7FDF0')
         self.grid(sticky='nsew')
         self.createWidgets()
+        self.recover()
 
     def createWidgets(self):
         """
@@ -73,13 +93,76 @@ class App(tk.Frame):
         self.file_menu.add_command(label='New', command=self.new)
         self.file_menu.add_command(label='Open', command=self.open)
         self.file_menu.add_command(label='Save', command=self.save)
+        self.file_menu.add_command(label='Save as', command=self.save_as)
+        self.file_menu.add_command(label='Compact', command=self.compact)
         self.file_menu.add_command(label='Export', command=self.export)
+        self.file_menu.add_command(label='Export SVG', command=self.export_svg)
+        self.file_menu.add_command(label='Export TikZ', command=self.export_tikz)
+        self.file_menu.add_command(label='Export distances', 
+                                   command=self.export_distances)
+        self.file_menu.add_command(label='Export matrices', 
+                                   command=self.export_matrices)
 
         self.menubar.add_cascade(label='File', menu=self.file_menu) 
 
+        self.culling = tk.BooleanVar(value=False)
+        self.view_menu = tk.Menu(self.menubar)
+        self.view_menu.add_checkbutton(label='Draw visible area only', 
+                                       variable=self.culling,
+                                       command=self.toggle_culling)
+        self.view_menu.add_separator()
+        self.stall_detector = tk.BooleanVar(value=False)
+        self.view_menu.add_checkbutton(label='Detect stalls', 
+                                       variable=self.stall_detector,
+                                       command=self.toggle_watchdog)
+        self.view_menu.add_command(label='UI latency', 
+                                   command=self.ui_latency)
+        self.view_menu.add_command(label='Timing stats', 
+                                   command=self.timing_stats)
+        self.view_menu.add_command(label='Save timing trace', 
+                                   command=self.save_trace)
+
+        self.menubar.add_cascade(label='View', menu=self.view_menu)
+
+        self.layout_menu = tk.Menu(self.menubar)
+        self.layout_menu.add_command(label='Force directed', 
+                                     command=self.force_directed_layout)
+        self.layout_menu.add_command(label='Spectral', 
+                                     command=self.spectral_layout)
+
+        self.menubar.add_cascade(label='Layout', menu=self.layout_menu)
+
+        self.algorithms_menu = tk.Menu(self.menubar)
+        self.algorithms_menu.add_command(label='Breadth first search', 
+                                         command=lambda: self.useAlgorithm('bfs'))
+        self.algorithms_menu.add_command(label='Depth first search',
+                                         command=lambda: self.useAlgorithm('dfs'))
+        self.algorithms_menu.add_separator()
+        self.algorithms_menu.add_command(label='Shortest path (Dijkstra)',
+                                         command=lambda: self.useAlgorithm('dijkstra'))
+        self.algorithms_menu.add_command(label='Shortest path (A*)',
+                                         command=lambda: self.useAlgorithm('astar'))
+        self.algorithms_menu.add_command(label='Shortest path (bidirectional)',
+                                         command=lambda: self.useAlgorithm('bidirectional'))
+        self.algorithms_menu.add_separator()
+        self.algorithms_menu.add_command(label='Minimum spanning tree',
+                                         command=self.spanning_tree)
+
+        self.menubar.add_cascade(label='Algorithms', menu=self.algorithms_menu)
+
         # canvas
         self.canvas = CanvasWidget(self)
         self.canvas.grid(row=0, column=1, sticky=tk.N+tk.S+tk.E+tk.W)
+        self.renderer = Renderer(self.canvas, self.graph)
+
+        # the view is moved with the middle button or the mouse wheel 
+        self.canvas.bind('<ButtonPress-2>', self.start_pan)
+        self.canvas.bind('<B2-Motion>', self.pan)
+        self.canvas.bind('<MouseWheel>', self.scroll)
+        self.canvas.bind('<Button-4>', self.scroll)
+        self.canvas.bind('<Button-5>', self.scroll)
+        self.canvas.bind('<Configure>', 
+                         lambda event: self.renderer.schedule_refresh())
 
         # text
         self.text = tk.Text(self, height=10, bg='#D7FDF0')
@@ -91,6 +174,9 @@ class App(tk.Frame):
         
         # log
         self.text_log = Log(self.text)
+
+        # stalls of the event loop, started from the View menu
+        self.watchdog = Watchdog(self, self.text_log)
     
     def create_buttons(self):      
         """
@@ -140,141 +226,355 @@ class App(tk.Frame):
         self.color_selector.grid(row=6, column=0, sticky='new') 
 
 
+    def recover(self):
+        """
+        replay the journal of the graph which was not saved when the app
+        was closed, or crashed.
+        """
+        os.makedirs(SAVED_DIR, exist_ok=True)
+        self.journal = Journal(UNTITLED_JOURNAL)
+        replayed = self.journal.open(self.graph)
+        if replayed:
+            self.drawGraph()
+            self.text_log.log(recovered=replayed)
+
     def new(self):
         """
         New graph drawing, reset the canvas the datastructure and
         the text log.
         """
         self.canvas.delete('all')
-        self.text.delete('1.0', 'end')
+        self.text_log.clear()
+        self.journal.close()
         del self.graph
         self.graph = Graph()
+        self.renderer.set_graph(self.graph)
+
+        self.filename = None
+        self.journal = Journal(UNTITLED_JOURNAL)
+        self.journal.reset(self.graph)
 
     def open(self):
         """
-        Open a .graph file and draw it on the canvas.
+        Open a .graph file and draw it on the canvas, with the changes of
+        its journal which were not compacted in the file yet.
         """
         filetypes = (('Graph files', '*.graph'),)
 
+        from tkinter import filedialog as fd
         filename = fd.askopenfilename(title='Open a file',
-                                      initialdir='../saved',
+                                      initialdir=SAVED_DIR,
                                       filetypes=filetypes)
+        if not filename:
+            return
 
+        # the journal is replayed below, it records the next changes
         reader = IO()
-        self.graph = reader.read(filename)
-        print(repr(self.graph))
-        self.drawGraph()
+        graph = reader.read(filename, journal=False)
+
+        self.journal.close()
+        self.graph = graph
+        self.filename = filename
+        self.journal = Journal(filename + SUFFIX, base=filename)
+        replayed = self.journal.open(self.graph)
+        self.renderer.set_graph(self.graph)
 
+        # the large graphs are only drawn in the visible area
+        if len(self.graph.get_verticies()) + len(self.graph.get_edges()) > CULLING_THRESHOLD:
+            self.culling.set(True)
+        self.renderer.culling = self.culling.get()
+
+        self.drawGraph()
+        if replayed:
+            self.text_log.log(replayed=replayed)
+        if self.journal.orphan is not None:
+            self.text_log.log(exc=True,
+                              orphan='{} changed since its last changes were '
+                                     'saved, they are kept in {}'.format(
+                                            filename, self.journal.orphan))
 
     def save(self):
         """
-        Save a drawn graph as .graph file
+        Save a drawn graph. The changes are already in the journal of its
+        .graph file, they only need to be on the disk, so saving costs 
+        nothing however large the graph is. A graph never saved is
+        written entirely.
         """
-        parser = IO()
-        file_name = fd.asksaveasfile(initialfile='graph.graph',
-                                     defaultextension='.graph',
-                                     filetypes=(('Graph files', '*.graph'),), 
-                                     mode='w')
-        
-        if file_name is None:
+        if self.filename is None:
+            self.save_as()
+            return
+
+        self.journal.sync()
+        self.text_log.log(saved=self.filename)
+
+    def save_as(self):
+        """
+        Save a drawn graph entirely in a new .graph file.
+        """
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='graph.graph',
+                                         initialdir=SAVED_DIR,
+                                         defaultextension='.graph',
+                                         filetypes=(('Graph files', '*.graph'),))
+        if not file_name:
+            return
+
+        self.write_graph(file_name, binary=False)
+        # the journal of the previous file stays with it, its changes are
+        # part of it
+        if self.filename is None:
+            self.journal.discard()
+        else:
+            self.journal.close()
+        self.filename = file_name
+        self.journal = Journal(file_name + SUFFIX, base=file_name)
+        self.journal.reset(self.graph)
+        self.text_log.log(saved=file_name)
+
+    def compact(self):
+        """
+        Rewrite the .graph file with the changes of its journal, which
+        starts empty again.
+        """
+        if self.filename is None:
+            self.save_as()
             return
 
-        parser.parse(file_name, self.graph)
+        self.write_graph(self.filename, 
+                         binary=ColumnarIO().is_columnar(self.filename))
+        self.journal.reset(self.graph)
+        self.text_log.log(compacted=self.filename)
+
+    def write_graph(self, filename, binary):
+        """
+        :param filename: (str) .graph file.
+        :param binary: (bool) if True the file is written in the binary
+        columnar format, else in json.
+
+        the file is written next to the old one then replaces it, so a
+        crash while writing leaves the old file and its journal.
+        """
+        tmp = filename + '.tmp'
+        if binary:
+            ColumnarIO().write(tmp, self.graph)
+        else:
+            with open(tmp, 'w') as f:
+                IO().parse(f, self.graph)
+        os.replace(tmp, filename)
 
     def export(self):
         """
-        Save drawn graph as png. 
+        Save the graph as png, drawn from the graph instance and not from
+        the window, so the whole graph is in the image.
         """
+        from tkinter import filedialog as fd
         file_name = fd.asksaveasfilename(initialfile='img.png',
                                          defaultextension='.png',
                                          filetypes=(('png file', '*.png'),))
-        if file_name is '': 
+        if not file_name:
+            return
+
+        from .export.png import PNGExporter
+        try:
+            PNGExporter().write(file_name, self.graph)
+        except ValueError as e:
+            raise GraphError(str(e), self.text_log)
+        self.text_log.log(exported=file_name)
+
+    def export_svg(self):
+        """
+        Save the graph as svg.
+        """
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='graph.svg',
+                                         defaultextension='.svg',
+                                         filetypes=(('svg file', '*.svg'),))
+        if not file_name:
+            return
+
+        from .export.svg import SVGExporter
+        SVGExporter().write(file_name, self.graph)
+        self.text_log.log(exported=file_name)
+
+    def export_tikz(self):
+        """
+        Save the graph as a tikzpicture for LaTeX.
+        """
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='graph.tex',
+                                         defaultextension='.tex',
+                                         filetypes=(('LaTeX file', '*.tex'),))
+        if not file_name:
+            return
+
+        from .export.tikz import TikZExporter
+        TikZExporter().write(file_name, self.graph)
+        self.text_log.log(exported=file_name)
+
+    def export_distances(self):
+        """
+        Save the matrix of the shortest paths between all the verticies
+        as a .npy file, the labels of the verticies in the order of the
+        matrix are saved next to it in a .txt file.
+        """
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='distances.npy',
+                                         defaultextension='.npy',
+                                         filetypes=(('numpy file', '*.npy'),))
+        if not file_name:
+            return
+
+        try:
+            from .algorithms.all_pairs import all_pairs
+            verticies, _ = all_pairs(self.graph, filename=file_name)
+        except (ImportError, ValueError) as e:
+            raise GraphError(str(e), self.text_log)
+
+        with open(os.path.splitext(file_name)[0] + '.txt', 'w') as f:
+            for vertex in verticies:
+                f.write('{}\n'.format(vertex.get_label()))
+
+        self.text_log.log(distances=file_name)
+
+    def export_matrices(self):
+        """
+        Save the adjacency and laplacian matrices and the degrees of the
+        graph in a .npz file.
+        """
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='matrices.npz',
+                                         defaultextension='.npz',
+                                         filetypes=(('numpy file', '*.npz'),))
+        if not file_name:
             return
-        # we have to wait otherwise the dialogue box would still
-        # displayed on the picture
-        time.sleep(0.5)
 
-        ImageGrab.grab(bbox=(
-            self.canvas.winfo_rootx(),
-            self.canvas.winfo_rooty(),
-            self.canvas.winfo_rootx() + self.canvas.winfo_width(),
-            self.canvas.winfo_rooty() + self.canvas.winfo_height()
-        )).save(file_name)
+        try:
+            from .graph.matrices import save_npz
+            save_npz(file_name, self.graph)
+        except ImportError as e:
+            raise GraphError(str(e), self.text_log)
 
+        self.text_log.log(matrices=file_name)
     
+    @timed
     def drawGraph(self):
         """
         when .graph file is opened first the the datastructure is 
         created from the .graph file. From the new made Graph instance 
-        we will draw it on the canvas.
+        we will draw it on the canvas, entirely or only the visible area
+        with culling.
         """
-        self.canvas.delete('all')
-        
-        if self.graph.is_directed():
-            arrow = tk.LAST
+        self.renderer.draw()
+
+    def force_directed_layout(self):
+        """
+        move the verticies with the force directed layout and redraw
+        the graph.
+        """
+        try:
+            from .layout.force_directed import force_directed
+            iterations = force_directed(self.graph)
+        except ImportError as e:
+            raise GraphError(str(e), self.text_log)
+
+        self.drawGraph()
+        self.text_log.log(layout_iterations=iterations)
+
+    def spectral_layout(self):
+        """
+        move the verticies with the spectral layout and redraw the graph.
+        """
+        try:
+            from .layout.spectral import spectral
+            spectral(self.graph)
+        except ImportError as e:
+            raise GraphError(str(e), self.text_log)
+
+        self.drawGraph()
+
+    def toggle_watchdog(self):
+        """
+        start or stop the detection of the stalls of the event loop.
+        """
+        if self.stall_detector.get():
+            self.watchdog.start()
         else:
-            arrow = ''
-
-        r = 10
-        for vertex in self.graph.get_verticies():
-            x = vertex.get_coords()[0] 
-            y = vertex.get_coords()[1] 
-                
-            oval_id = self.canvas.create_oval(x-r, y-r, x+r, y+r, tag='ovals')
-            label_id = self.canvas.create_text(x,
-                                               y, 
-                                               text=vertex.get_label(), 
-                                               tag='labels')
-
-            self.canvas.itemconfigure(oval_id, fill=vertex.get_color())
-
-            # we reset the different items id the creation order may be 
-            # different
-            vertex.set_oval_id(oval_id)
-            vertex.set_label_id(label_id)
-
-        for edge in self.graph.get_edges():
-            
-            x_start = edge.get_vx_start().get_coords()[0]
-            y_start = edge.get_vx_start().get_coords()[1]
-            x_end = edge.get_vx_end().get_coords()[0]
-            y_end = edge.get_vx_end().get_coords()[1]
-
-            # if the edge is a loop
-            if x_start == x_end and y_start == y_end:
-                line_id = self.canvas.create_oval(x_start-25, y_start-25,
-                                                  x_start+15, y_start+15,
-                                                  tag='loops')
-
-                weight_id = self.canvas.create_text(x_start, y_start-25,
-                                                    text=edge.get_weight(),
-                                                    tag='loop_weights')
-
-                self.canvas.itemconfigure(line_id, outline=edge.get_color())
-
-            # common edge
-            else:
-                x_center = (x_end + x_start) / 2
-                y_center = (y_end + y_start) / 2
-
-                
-            
-                line_id = self.canvas.create_line(x_start, y_start,
-                                                  x_end, y_end,
-                                                  arrow=arrow,
-                                                  tag='lines')
-
-                weight_id = self.canvas.create_text(x_center, y_center,
-                                                    text=edge.get_weight(),
-                                                    tag='weights')
-
-                self.canvas.itemconfigure(line_id, fill=edge.get_color())
-            
-            # when opened the .graph file contains canvas ids of the items from 
-            # the previous drawing, but when redrawn, the ids won't be the same
-            # that's why we set them again.
-            edge.set_line_id(line_id)
-            edge.set_weight_id(weight_id)
+            self.watchdog.stop()
+
+    def ui_latency(self):
+        """
+        log the latency of the event loop measured by the watchdog.
+        """
+        if not self.watchdog.is_running() and not self.watchdog.latencies:
+            raise GraphError('View > Detect stalls must be on to measure the '
+                             'latency', self.text_log)
+        self.watchdog.log_latency()
+
+    def timing_stats(self):
+        """
+        log the time spent in the main operations, recorded when the app
+        is started with GRAPHIX_PROFILE set (see utils/instrument.py).
+        """
+        if not ENABLED:
+            raise GraphError('start graphix with GRAPHIX_PROFILE=1 to record '
+                             'the timings', self.text_log)
+        log_stats(self.text_log)
+
+    def save_trace(self):
+        """
+        Save the recorded operations as a Chrome trace.
+        """
+        if not ENABLED:
+            raise GraphError('start graphix with GRAPHIX_PROFILE=1 to record '
+                             'the timings', self.text_log)
+
+        from tkinter import filedialog as fd
+        file_name = fd.asksaveasfilename(initialfile='trace.json',
+                                         defaultextension='.json',
+                                         filetypes=(('trace file', '*.json'),))
+        if not file_name:
+            return
+
+        dump_trace(file_name)
+        self.text_log.log(trace=file_name)
+
+    def toggle_culling(self):
+        """
+        switch between drawing the whole graph and only the visible area.
+        """
+        self.renderer.culling = self.culling.get()
+        self.drawGraph()
+
+    def start_pan(self, event):
+        """
+        :param event: (tk.Event)
+
+        start moving the view.
+        """
+        self.canvas.scan_mark(event.x, event.y)
+
+    def pan(self, event):
+        """
+        :param event: (tk.Event)
+
+        move the view with the mouse.
+        """
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.renderer.schedule_refresh()
+
+    def scroll(self, event):
+        """
+        :param event: (tk.Event)
+
+        move the view vertically with the mouse wheel.
+        """
+        if event.num == 5 or event.delta < 0:
+            step = -30
+        else:
+            step = 30
+        self.canvas.scan_mark(0, 0)
+        self.canvas.scan_dragto(0, step, gain=1)
+        self.renderer.schedule_refresh()
         
     # on the canvas most of the drawing is made with the left clic
     # is used most of the time. So each time we select an item 
@@ -326,6 +626,7 @@ class App(tk.Frame):
                                                   self.graph))
 
     def select_color(self):
+        from tkinter.colorchooser import askcolor
         color = askcolor(title="Color selector")
         self.canvas.unbind('<Button-1>')
         self.canvas.bind('<Button-1>', ColorItem(self.canvas, 
@@ -333,6 +634,41 @@ class App(tk.Frame):
                                                  self.graph,
                                                  color))
 
+    def useAlgorithm(self, algorithm):
+        """
+        :param algorithm: (str) 'bfs', 'dfs' or a shortest path method.
+
+        Bind left clic to the algorithm, its result is colored with the
+        selected color.
+        """
+        from tkinter.colorchooser import askcolor
+        color = askcolor(title="Result color")
+        if color[1] is None:
+            return
+        self.canvas.unbind('<Button-1>')
+        self.canvas.bind('<Button-1>', RunAlgorithm(self.canvas,
+                                                    self.text_log,
+                                                    self.graph,
+                                                    color,
+                                                    algorithm))
+
+    def spanning_tree(self):
+        """
+        Color the minimum spanning tree of the graph with the selected
+        color.
+        """
+        from tkinter.colorchooser import askcolor
+        color = askcolor(title="Result color")
+        if color[1] is None:
+            return
+        try:
+            from .algorithms.spanning_tree import minimum_spanning_tree
+            result = minimum_spanning_tree(self.graph)
+        except ValueError as e:
+            raise GraphError(str(e), self.text_log)
+
+        RunAlgorithm(self.canvas, self.text_log, self.graph, 
+                     color, 'spanning_tree').highlight(result)
 
 # -----------------------------------------------------------------------------
 
@@ -0,0 +1,381 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   cli.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   command line tool to convert, analyse or render many .graph files
+#   without the app :
+#
+#       python3 -m graphs convert saved/ -o converted/ --to binary
+#       python3 -m graphs stats 'saved/*.graph' --json stats.jsonl
+#       python3 -m graphs render saved/ -o images/ --format png --scale 2
+#
+#   The files are given as files, directories (their .graph files, with
+#   the subdirectories) or glob patterns. They are spread over a pool of
+#   processes, each worker is replaced after a number of files so its
+#   memory stays bounded. A file which fails is reported and the others
+#   go on.
+
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .utils.read_write import IO
+
+# number of files handled by a worker before it is replaced
+MAX_TASKS_PER_CHILD = 50
+# number of files submitted ahead per worker, so the pending results do
+# not pile up in memory on large batches
+QUEUE_PER_WORKER = 2
+# when the progress is not written on a terminal, a line every this many
+# files
+PROGRESS_EVERY = 100
+FORMATS = {'png' : '.png', 'svg' : '.svg', 'tikz' : '.tex'}
+
+# -----------------------------------------------------------------------------
+# the tasks, run in the workers on a single file. They return something
+# which can be pickled, the exceptions are caught by run_task.
+
+def convert(path, output, binary=True):
+    """
+    :param path: (str) .graph file.
+    :param output: (str) converted .graph file.
+    :param binary: (bool) if True the binary columnar format, else json.
+
+    :returns: (str) the output file.
+    """
+    if os.path.abspath(path) == os.path.abspath(output):
+        raise ValueError('the output is the input file')
+    IO().convert(path, output, binary=binary)
+    return output
+
+def stats(path, output=None):
+    """
+    :param path: (str) .graph file.
+    :param output: unused.
+
+    :returns: (dict) number of verticies and edges, degree distribution,
+    number of connected components and size of the largest one. The
+    components of a directed graph are its weakly connected components,
+    a loop counts once in the degree of its vertex.
+    """
+    from .algorithms.spanning_tree import UnionFind
+
+    graph = IO().read(path, compact=True)
+    csr = graph.get_csr()
+    n = len(csr)
+    indptr, indices = csr.indptr, csr.indices
+
+    degrees = [indptr[i + 1] - indptr[i] for i in range(n)]
+    if csr.directed:
+        # plus the in-degree, a loop is in both CSRs but counts once
+        reverse = graph.get_csr(reverse=True).indptr
+        for i in range(n):
+            loops = sum(1 for k in range(indptr[i], indptr[i + 1])
+                        if indices[k] == i)
+            degrees[i] += reverse[i + 1] - reverse[i] - loops
+
+    components = UnionFind(n)
+    for i in range(n):
+        for k in range(indptr[i], indptr[i + 1]):
+            components.union(i, indices[k])
+    sizes = Counter(components.find(i) for i in range(n))
+
+    return {'verticies' : n,
+            'edges' : len(csr.edges),
+            'directed' : csr.directed,
+            'weighted' : graph.is_weighted(),
+            'degrees' : {degree : count for degree, count in
+                         sorted(Counter(degrees).items())},
+            'components' : len(sizes),
+            'largest_component' : max(sizes.values(), default=0)}
+
+def render(path, output, format='png', scale=1.0):
+    """
+    :param path: (str) .graph file.
+    :param output: (str) image or document.
+    :param format: (str) 'png', 'svg' or 'tikz'.
+    :param scale: (float) size of a unit of the canvas in pixels, png only.
+
+    :returns: (str) the output file.
+    """
+    graph = IO().read(path, compact=True)
+    if format == 'png':
+        from .export.png import PNGExporter
+        PNGExporter(scale=scale).write(output, graph)
+    elif format == 'svg':
+        from .export.svg import SVGExporter
+        SVGExporter().write(output, graph)
+    else:
+        from .export.tikz import TikZExporter
+        TikZExporter().write(output, graph)
+    return output
+
+TASKS = {'convert' : convert, 'stats' : stats, 'render' : render}
+
+def run_task(name, path, output, options):
+    """
+    :param name: (str) task.
+    :param path: (str) .graph file.
+    :param output: (str) output file, None for stats.
+    :param options: (dict) other arguments of the task.
+
+    :returns: (Tuple(str, bool, object)) the file, True and the result of
+    the task, or False and the error.
+    """
+    try:
+        if output is not None:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        return path, True, TASKS[name](path, output, **options)
+    except Exception as e:
+        return path, False, '{}: {}'.format(type(e).__name__, e)
+
+# -----------------------------------------------------------------------------
+
+def find_files(patterns):
+    """
+    :param patterns: (list(str)) files, directories or glob patterns.
+
+    :returns: (list(Tuple(str, str))) each .graph file and its path
+    relative to the directory given, or its name, without duplicates.
+    """
+    files = []
+    seen = set()
+
+    def add(path, relative):
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            files.append((path, relative))
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, names in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.endswith('.graph'):
+                        path = os.path.join(root, name)
+                        add(path, os.path.relpath(path, pattern))
+        elif os.path.isfile(pattern):
+            add(pattern, os.path.basename(pattern))
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, os.path.basename(path))
+    return files
+
+def output_path(relative, directory, extension):
+    """
+    :param relative: (str) path of a file relative to its input.
+    :param directory: (str) output directory.
+    :param extension: (str) extension of the output file.
+
+    :returns: (str)
+    """
+    return os.path.join(directory, os.path.splitext(relative)[0] + extension)
+
+def run_batch(name, jobs, options, workers=None,
+              max_tasks_per_child=MAX_TASKS_PER_CHILD, progress=sys.stderr):
+    """
+    :param name: (str) task.
+    :param jobs: (list(Tuple(str, str))) input and output files.
+    :param options: (dict) other arguments of the task.
+    :param workers: (int) number of processes, the number of cpus if
+    None, 0 to run in this process.
+    :param max_tasks_per_child: (int) files handled by a worker before it
+    is replaced.
+    :param progress: (file) where the progress and failures are written.
+
+    :yields: (Tuple(str, bool, object)) the result of each file, in the
+    order they are done.
+
+    When a worker dies (killed, out of memory...) the pool is broken, the
+    files in flight fail and the next ones go to a new pool.
+    """
+    total = len(jobs)
+    done = 0
+
+    def report(result):
+        path, ok, value = result
+        tty = progress.isatty()
+        if not ok:
+            progress.write('{}FAILED {} : {}\n'.format('\r\033[K' if tty else '',
+                                                       path, value))
+        if tty:
+            progress.write('\r[{}/{}] {}\033[K'.format(done, total, path))
+        elif done % PROGRESS_EVERY == 0 or done == total:
+            progress.write('[{}/{}]\n'.format(done, total))
+        progress.flush()
+
+    if workers == 0 or total <= 1:
+        for path, output in jobs:
+            result = run_task(name, path, output, options)
+            done += 1
+            report(result)
+            yield result
+    else:
+        workers = workers or os.cpu_count() or 1
+
+        def new_pool():
+            # the workers are replaced after max_tasks_per_child files,
+            # which needs processes started with spawn and python 3.11,
+            # before the workers live as long as the pool.
+            try:
+                return ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context('spawn'),
+                                           max_tasks_per_child=max_tasks_per_child)
+            except TypeError:
+                return ProcessPoolExecutor(max_workers=workers)
+
+        # the file of each future in flight
+        pending = {}
+        broken = False
+
+        def collect(futures):
+            nonlocal done, broken
+            for future in futures:
+                path = pending.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    result = (path, False, 'BrokenProcessPool: a worker '
+                                           'process died')
+                done += 1
+                report(result)
+                yield result
+
+        pool = new_pool()
+        jobs = iter(jobs)
+        try:
+            while True:
+                broken = False
+                for path, output in jobs:
+                    try:
+                        future = pool.submit(run_task, name, path, output, options)
+                    except BrokenProcessPool:
+                        # submitted again to the new pool
+                        jobs = itertools.chain([(path, output)], jobs)
+                        broken = True
+                        break
+                    pending[future] = path
+                    if len(pending) >= workers * QUEUE_PER_WORKER:
+                        break
+                if not pending and not broken:
+                    break
+
+                if not broken:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from collect(finished)
+                if broken:
+                    # the other files in flight are lost with the pool
+                    yield from collect(wait(pending)[0])
+                    pool.shutdown(wait=False)
+                    pool = new_pool()
+        finally:
+            pool.shutdown()
+
+    if progress.isatty() and total:
+        progress.write('\n')
+
+def main(argv=None):
+    """
+    :param argv: (list(str)) arguments, those of the command line if None.
+
+    :returns: (int) exit status, 1 if a file failed.
+    """
+    parser = argparse.ArgumentParser(prog='python3 -m graphs',
+                                     description='convert, analyse or render '
+                                                 'graphix .graph files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='+',
+                        help='.graph files, directories or glob patterns')
+    common.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of processes, 0 to run without pool '
+                             '(default: the number of cpus)')
+    common.add_argument('--max-tasks-per-child', type=int,
+                        default=MAX_TASKS_PER_CHILD,
+                        help='files handled by a process before it is '
+                             'replaced (default: %(default)s)')
+
+    command = commands.add_parser('convert', parents=[common],
+                                  help='convert to json or binary')
+    command.add_argument('-o', '--output', required=True,
+                         help='output directory')
+    command.add_argument('--to', choices=('json', 'binary'), default='binary')
+
+    command = commands.add_parser('stats', parents=[common],
+                                  help='verticies, edges, degrees and '
+                                       'components')
+    command.add_argument('--json', help='write the stats in this file, one '
+                                        'json object per line')
+
+    command = commands.add_parser('render', parents=[common],
+                                  help='draw as png, svg or TikZ')
+    command.add_argument('-o', '--output', required=True,
+                         help='output directory')
+    command.add_argument('--format', choices=list(FORMATS), default='png')
+    command.add_argument('--scale', type=float, default=1.0,
+                         help='pixels per unit of the canvas, png only')
+
+    args = parser.parse_args(argv)
+
+    files = find_files(args.files)
+    if not files:
+        parser.error('no .graph file found')
+
+    if args.command == 'convert':
+        options = {'binary' : args.to == 'binary'}
+        jobs = [(path, output_path(relative, args.output, '.graph'))
+                for path, relative in files]
+    elif args.command == 'render':
+        options = {'format' : args.format, 'scale' : args.scale}
+        jobs = [(path, output_path(relative, args.output, FORMATS[args.format]))
+                for path, relative in files]
+    else:
+        options = {}
+        jobs = [(path, None) for path, _ in files]
+
+    out = open(args.json, 'w') if args.command == 'stats' and args.json else None
+    failed = 0
+    try:
+        for path, ok, value in run_batch(args.command, jobs, options,
+                                         workers=args.workers,
+                                         max_tasks_per_child=args.max_tasks_per_child):
+            if not ok:
+                failed += 1
+            elif args.command == 'stats':
+                if out is not None:
+                    out.write(json.dumps(dict(file=path, **value)) + '\n')
+                else:
+                    print('{} : {} verticies, {} edges, {} components '
+                          '(largest {}), degrees {}'.format(
+                                path, value['verticies'], value['edges'],
+                                value['components'],
+                                value['largest_component'],
+                                value['degrees']))
+    finally:
+        if out is not None:
+            out.close()
+
+    sys.stderr.write('{} files, {} failed\n'.format(len(jobs), failed))
+    return 1 if failed else 0
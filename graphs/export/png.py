@@ -0,0 +1,180 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   png.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   draws a graph in a png image with Pillow, without Tk, so a graph can
+#   be exported at any resolution and on a server without display.
+#
+#   Pillow is imported the first time an image is drawn :
+#
+#       python3 -m graphs.export.png file.graph image.png [scale]
+
+from ..graph.geometry import *
+from ..utils.instrument import timed
+
+# default size of the text of the canvas
+FONT_SIZE = 12
+# maximum number of pixels of an image, 3 bytes each in memory
+MAX_PIXELS = 100000000
+
+class PNGExporter(object):
+    """
+    PNGExporter class
+
+    draws the verticies, labels, edges, arrows, loops and weights of a
+    graph like the canvas does (see Renderer), the image covers the whole
+    graph.
+    """
+    def __init__(self, scale=1.0, padding=20, background='white'):
+        """
+        :param scale: (float) size of a unit of the canvas in pixels.
+        :param padding: (int) space around the graph, in units of the
+        canvas.
+        :param background: (str) color of the background.
+
+        Constructor.
+        """
+        self.scale = scale
+        self.padding = padding
+        self.background = background
+
+    def render(self, graph):
+        """
+        :param graph: (Graph)
+
+        :returns: (PIL.Image.Image) the image of the graph.
+
+        raises ValueError if the image would have more than MAX_PIXELS
+        pixels, before any memory is allocated.
+        """
+        bbox = graph_bbox(graph) or (0, 0, 0, 0)
+        self.x0 = bbox[0] - self.padding
+        self.y0 = bbox[1] - self.padding
+        width = int((bbox[2] - bbox[0] + 2 * self.padding) * self.scale) + 1
+        height = int((bbox[3] - bbox[1] + 2 * self.padding) * self.scale) + 1
+        if width * height > MAX_PIXELS:
+            # the scale which fits, the area grows with its square
+            fit = self.scale * (MAX_PIXELS / (width * height)) ** 0.5
+            raise ValueError('the image would be {} x {} pixels, more than '
+                             '{} pixels, use a scale below {:.3g}'.format(
+                                    width, height, MAX_PIXELS, fit))
+
+        from PIL import Image, ImageDraw
+
+        image = Image.new('RGB', (width, height), self.background)
+        self.draw = ImageDraw.Draw(image)
+        self.font = self._font()
+        self.width = max(1, round(self.scale))
+
+        # same order as the canvas, the edges are drawn over the verticies
+        for vertex in graph.get_verticies():
+            self.draw_vertex(vertex)
+        directed = graph.is_directed()
+        for edge in graph.get_edges():
+            self.draw_edge(edge, directed)
+
+        del self.draw
+        return image
+
+    @timed
+    def write(self, filename, graph):
+        """
+        :param filename: (str) .png file.
+        :param graph: (Graph)
+        """
+        self.render(graph).save(filename, format='PNG')
+
+    def draw_vertex(self, vertex):
+        """
+        :param vertex: (Vertex)
+        """
+        x, y = vertex_center(vertex)
+        # a vertex without color is only a circle, as on the canvas
+        self.draw.ellipse(self._points(vertex_bbox(x, y)),
+                          fill=vertex.get_color(),
+                          outline='black',
+                          width=self.width)
+        self.draw_text(x, y, vertex.get_label())
+
+    def draw_edge(self, edge, directed):
+        """
+        :param edge: (Edge)
+        :param directed: (bool) if True the edge has an arrow.
+        """
+        x_start, y_start, x_end, y_end = edge_segment(edge)
+        color = edge.get_color() or 'black'
+
+        if is_loop(edge):
+            self.draw.ellipse(self._points(loop_bbox(x_start, y_start)),
+                              outline=color, width=self.width)
+            self.draw_text(*loop_weight_position(x_start, y_start),
+                           edge.get_weight())
+            return
+
+        self.draw.line(self._points((x_start, y_start, x_end, y_end)),
+                       fill=color, width=self.width)
+        if directed:
+            head = arrow_head(x_start, y_start, x_end, y_end)
+            if head is not None:
+                self.draw.polygon(self._points(head), fill=color)
+        self.draw_text((x_start + x_end) / 2, (y_start + y_end) / 2,
+                       edge.get_weight())
+
+    def draw_text(self, x, y, text):
+        """
+        :param x: (float)
+        :param y: (float) center of the text on the canvas.
+        :param text: (str) nothing is drawn if it is None.
+        """
+        if text is None:
+            return
+        text = str(text)
+        x, y = self._points((x, y))
+        left, top, right, bottom = self.draw.textbbox((0, 0), text, font=self.font)
+        self.draw.text((x - (left + right) / 2, y - (top + bottom) / 2),
+                       text, fill='black', font=self.font)
+
+    def _font(self):
+        """
+        :returns: (PIL.ImageFont) the default font at the size of the image.
+        """
+        from PIL import ImageFont
+
+        try:
+            return ImageFont.load_default(size=FONT_SIZE * self.scale)
+        except TypeError:
+            # before Pillow 10.1 the default font has a single size
+            return ImageFont.load_default()
+
+    def _points(self, coords):
+        """
+        :param coords: (Tuple(float)) x, y, x, y... on the canvas.
+
+        :returns: (list(float)) the coords in the image.
+        """
+        return [(c - (self.x0 if i % 2 == 0 else self.y0)) * self.scale
+                for i, c in enumerate(coords)]
+
+# -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    from ..utils.read_write import IO
+
+    if len(sys.argv) < 3:
+        print('usage : python3 -m graphs.export.png file.graph image.png [scale]')
+        sys.exit(1)
+
+    scale = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    PNGExporter(scale=scale).write(sys.argv[2], IO().read(sys.argv[1]))
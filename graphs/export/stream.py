@@ -0,0 +1,106 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   stream.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   base of the exporters to text formats (svg, tikz), the items of the
+#   graph are written to the file as they are read from the graph, the
+#   document is never built in memory.
+
+from ..graph.geometry import *
+from ..utils.read_write import ITEMS_PER_WRITE
+from ..utils.instrument import timed
+
+class StreamExporter(object):
+    """
+    StreamExporter class
+
+    writes a header, the verticies, the edges (over the verticies, as on
+    the canvas) and a footer. The derived classes give the text of each
+    part.
+    """
+    def __init__(self, padding=20):
+        """
+        :param padding: (int) space around the graph, in units of the
+        canvas.
+
+        Constructor.
+        """
+        self.padding = padding
+
+    @timed
+    def write(self, filename, graph):
+        """
+        :param filename: (str)
+        :param graph: (Graph)
+
+        the graph is read twice, once for its bounding box and once to
+        write its items, the memory used does not depend on its size.
+        """
+        bbox = graph_bbox(graph) or (0, 0, 0, 0)
+        bbox = (bbox[0] - self.padding, bbox[1] - self.padding,
+                bbox[2] + self.padding, bbox[3] + self.padding)
+        directed = graph.is_directed()
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.header(bbox))
+            self._write_items(f, (self.vertex(vertex) 
+                                  for vertex in graph.get_verticies()))
+            self._write_items(f, (self.edge(edge, directed) 
+                                  for edge in graph.get_edges()))
+            f.write(self.footer())
+
+    def _write_items(self, f, items):
+        """
+        :param f: (file)
+        :param items: (iterable(str)) text of the items.
+
+        write the items ITEMS_PER_WRITE at a time.
+        """
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == ITEMS_PER_WRITE:
+                f.write(''.join(chunk))
+                chunk = []
+        f.write(''.join(chunk))
+
+    def header(self, bbox):
+        """
+        :param bbox: (Tuple(float)) area of the document on the canvas.
+
+        :returns: (str)
+        """
+        raise NotImplementedError
+
+    def vertex(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        :returns: (str)
+        """
+        raise NotImplementedError
+
+    def edge(self, edge, directed):
+        """
+        :param edge: (Edge)
+        :param directed: (bool) if True the edge has an arrow.
+
+        :returns: (str)
+        """
+        raise NotImplementedError
+
+    def footer(self):
+        """
+        :returns: (str)
+        """
+        raise NotImplementedError
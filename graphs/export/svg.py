@@ -0,0 +1,83 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   svg.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   export of a graph to svg.
+
+from xml.sax.saxutils import escape, quoteattr
+
+from .stream import StreamExporter
+from ..graph.geometry import *
+
+# style of the texts, as the default font of the canvas
+TEXT_STYLE = ('text-anchor="middle" dominant-baseline="central" '
+              'font-family="sans-serif" font-size="12"')
+
+class SVGExporter(StreamExporter):
+    """
+    SVGExporter class
+
+    an svg document with the coords of the canvas, a vertex is a circle
+    and a text, an edge a line (and the polygon of its arrow) or a circle
+    for a loop, and a text for its weight.
+    """
+    def header(self, bbox):
+        x0, y0, x1, y1 = bbox
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<svg xmlns="http://www.w3.org/2000/svg" '
+                'width="{w:g}" height="{h:g}" viewBox="{x:g} {y:g} {w:g} {h:g}">\n'
+                '<rect x="{x:g}" y="{y:g}" width="{w:g}" height="{h:g}" fill="white"/>\n'
+                .format(x=x0, y=y0, w=x1 - x0, h=y1 - y0))
+
+    def vertex(self, vertex):
+        x, y = vertex_center(vertex)
+        return ('<circle cx="{:g}" cy="{:g}" r="{:g}" fill={} stroke="black"/>\n'
+                .format(x, y, VX_RADIUS, quoteattr(vertex.get_color() or 'none'))
+                + self._text(x, y, vertex.get_label()))
+
+    def edge(self, edge, directed):
+        x_start, y_start, x_end, y_end = edge_segment(edge)
+        color = quoteattr(edge.get_color() or 'black')
+
+        if is_loop(edge):
+            x0, y0, x1, y1 = loop_bbox(x_start, y_start)
+            return ('<circle cx="{:g}" cy="{:g}" r="{:g}" fill="none" stroke={}/>\n'
+                    .format((x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2, color)
+                    + self._text(*loop_weight_position(x_start, y_start),
+                                 edge.get_weight()))
+
+        svg = ('<line x1="{:g}" y1="{:g}" x2="{:g}" y2="{:g}" stroke={}/>\n'
+               .format(x_start, y_start, x_end, y_end, color))
+        if directed:
+            head = arrow_head(x_start, y_start, x_end, y_end)
+            if head is not None:
+                svg += ('<polygon points="{}" fill={}/>\n'
+                        .format(' '.join('{:g}'.format(c) for c in head), color))
+        return svg + self._text((x_start + x_end) / 2, (y_start + y_end) / 2,
+                                edge.get_weight())
+
+    def footer(self):
+        return '</svg>\n'
+
+    def _text(self, x, y, text):
+        """
+        :param x: (float)
+        :param y: (float) center of the text.
+        :param text: (str) nothing is written if it is None.
+
+        :returns: (str)
+        """
+        if text is None:
+            return ''
+        return '<text x="{:g}" y="{:g}" {}>{}</text>\n'.format(
+                                        x, y, TEXT_STYLE, escape(str(text)))
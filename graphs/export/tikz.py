@@ -0,0 +1,141 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   tikz.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   export of a graph to tikz, for LaTeX. The file is a tikzpicture to
+#   \input in a document (with \usepackage{tikz}), or a whole document
+#   with standalone.
+
+import re
+
+from .stream import StreamExporter
+from ..graph.geometry import *
+
+HEX_COLOR = re.compile(r'#([0-9a-fA-F]{6})$')
+# characters with a meaning for LaTeX
+LATEX_SPECIALS = {'\\' : r'\textbackslash{}', '{' : r'\{', '}' : r'\}',
+                  '$' : r'\$', '&' : r'\&', '#' : r'\#', '^' : r'\^{}',
+                  '_' : r'\_', '%' : r'\%', '~' : r'\textasciitilde{}',
+                  '<' : r'\textless{}', '>' : r'\textgreater{}'}
+
+class TikZExporter(StreamExporter):
+    """
+    TikZExporter class
+
+    a tikzpicture with the coords of the canvas (the y axis goes down as
+    on the canvas), a vertex is a circle and a node with its label, an
+    edge a line, with an arrow if the graph is directed, or a circle for
+    a loop, and a node for its weight.
+    """
+    def __init__(self, unit='0.02cm', standalone=False, padding=20):
+        """
+        :param unit: (str) length of a unit of the canvas.
+        :param standalone: (bool) if True the file is a whole LaTeX 
+        document.
+        :param padding: (int)
+
+        Constructor.
+        """
+        StreamExporter.__init__(self, padding)
+        self.unit = unit
+        self.standalone = standalone
+
+    def header(self, bbox):
+        # the colors are defined when they are used for the first time
+        self.colors = set()
+        tikz = ''
+        if self.standalone:
+            tikz += ('\\documentclass{standalone}\n'
+                     '\\usepackage{tikz}\n'
+                     '\\begin{document}\n')
+        return tikz + ('\\begin{{tikzpicture}}[x={0}, y=-{0}, '
+                       'every node/.style={{font=\\scriptsize}}]\n'
+                       '\\useasboundingbox ({1:g},{2:g}) rectangle ({3:g},{4:g});\n'
+                       .format(self.unit, *bbox))
+
+    def vertex(self, vertex):
+        x, y = vertex_center(vertex)
+        definition, fill = self._color(vertex.get_color())
+        tikz = definition
+        tikz += '\\draw{} ({:g},{:g}) circle[radius={:g}];\n'.format(
+                    '[fill={}]'.format(fill) if fill else '', x, y, VX_RADIUS)
+        return tikz + self._node(x, y, vertex.get_label())
+
+    def edge(self, edge, directed):
+        x_start, y_start, x_end, y_end = edge_segment(edge)
+        definition, color = self._color(edge.get_color())
+        options = [color] if color else []
+
+        if is_loop(edge):
+            x0, y0, x1, y1 = loop_bbox(x_start, y_start)
+            tikz = '\\draw{} ({:g},{:g}) circle[radius={:g}];\n'.format(
+                        self._options(options), (x0 + x1) / 2, (y0 + y1) / 2,
+                        (x1 - x0) / 2)
+            return definition + tikz + self._node(
+                        *loop_weight_position(x_start, y_start), edge.get_weight())
+
+        if directed:
+            options.append('->')
+        tikz = '\\draw{} ({:g},{:g}) -- ({:g},{:g});\n'.format(
+                    self._options(options), x_start, y_start, x_end, y_end)
+        return definition + tikz + self._node((x_start + x_end) / 2,
+                                              (y_start + y_end) / 2,
+                                              edge.get_weight())
+
+    def footer(self):
+        tikz = '\\end{tikzpicture}\n'
+        if self.standalone:
+            tikz += '\\end{document}\n'
+        return tikz
+
+    def _options(self, options):
+        """
+        :param options: (list(str))
+
+        :returns: (str) the options of a tikz command.
+        """
+        return '[{}]'.format(', '.join(options)) if options else ''
+
+    def _color(self, color):
+        """
+        :param color: (str) color of the canvas, '#rrggbb' or a name.
+
+        :returns: (Tuple(str, str)) the definition of the color if it is
+        new, and its name for tikz (None if there is no color).
+        """
+        if color is None:
+            return '', None
+
+        match = HEX_COLOR.match(color)
+        if match is None:
+            return '', color
+
+        name = 'c' + match.group(1).lower()
+        if name in self.colors:
+            return '', name
+        self.colors.add(name)
+        return '\\definecolor{{{}}}{{HTML}}{{{}}}\n'.format(
+                            name, match.group(1).upper()), name
+
+    def _node(self, x, y, text):
+        """
+        :param x: (float)
+        :param y: (float) center of the text.
+        :param text: (str) nothing is written if it is None.
+
+        :returns: (str)
+        """
+        if text is None:
+            return ''
+        text = ''.join(LATEX_SPECIALS.get(c, c) for c in str(text))
+        return '\\node at ({:g},{:g}) {{{}}};\n'.format(x, y, text)
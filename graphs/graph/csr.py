@@ -0,0 +1,170 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   csr.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   compressed sparse row adjacency of a graph, for the algorithms.
+
+from array import array
+from math import hypot
+
+from .geometry import vertex_center
+
+class CSRAdjacency(object):
+    """
+    CSRAdjacency class
+
+    Compressed sparse row representation of the adjacency of a graph.
+    The verticies are numbered from 0 to n-1 in the order of the graph,
+    the neighbours of the vertex i are :
+
+        indices[indptr[i]:indptr[i+1]]
+
+    with the weights of the corresponding edges in weights and the index
+    of the Edge instances (in edges) in edge_ids. An undirected edge
+    is stored in both directions, a loop only once.
+
+    All the arrays are typed arrays (array.array) so the memory is O(n + E)
+    and the algorithms can iterate over plain ints and floats.
+
+    non_negative is True when no weight is negative, it is found while the
+    arrays are built so the algorithms check it in O(1).
+    """
+    def __init__(self, verticies, edges, directed, reverse=False):
+        """
+        :param verticies: (iterable(Vertex)) verticies of the graph.
+        :param edges: (iterable(Edge)) edges of the graph.
+        :param directed: (bool) True if the graph is directed.
+        :param reverse: (bool) if True and the graph is directed, the edges
+        are stored from their end vertex to their start vertex.
+
+        Constructor, builds the arrays in O(n + E).
+        """
+        self.verticies = list(verticies)
+        self.edges = list(edges)
+        self.directed = directed
+        self.index_of = {vertex : i for i, vertex in enumerate(self.verticies)}
+
+        n = len(self.verticies)
+        starts = array('l')
+        ends = array('l')
+        for edge in self.edges:
+            i_start = self.index_of[edge.get_vx_start()]
+            i_end = self.index_of[edge.get_vx_end()]
+            if reverse and directed:
+                i_start, i_end = i_end, i_start
+            starts.append(i_start)
+            ends.append(i_end)
+
+        # counting the degrees
+        degrees = array('l', bytes(array('l').itemsize * (n + 1)))
+        for k in range(len(self.edges)):
+            degrees[starts[k] + 1] += 1
+            if not directed and starts[k] != ends[k]:
+                degrees[ends[k] + 1] += 1
+
+        # cumulative sum to get the row pointers
+        self.indptr = degrees
+        for i in range(n):
+            self.indptr[i + 1] += self.indptr[i]
+
+        nnz = self.indptr[n]
+        self.indices = array('l', bytes(array('l').itemsize * nnz))
+        self.weights = array('d', bytes(array('d').itemsize * nnz))
+        self.edge_ids = array('l', bytes(array('l').itemsize * nnz))
+
+        # filling the rows, fill[i] is the next free slot of the row i
+        fill = array('l', self.indptr[:n])
+        self.non_negative = True
+        for k, edge in enumerate(self.edges):
+            weight = edge.get_weight()
+            if weight is None:
+                weight = 1
+            elif weight < 0:
+                self.non_negative = False
+
+            i_start, i_end = starts[k], ends[k]
+            self._set(fill, i_start, i_end, weight, k)
+            if not directed and i_start != i_end:
+                self._set(fill, i_end, i_start, weight, k)
+
+        # see length_scale
+        self._length_scale = None
+
+    def _set(self, fill, row, column, weight, edge_id):
+        """
+        :param fill: (array) next free slot of each row.
+        :param row: (int)
+        :param column: (int)
+        :param weight: (float)
+        :param edge_id: (int)
+
+        store an entry in the next free slot of the row.
+        """
+        slot = fill[row]
+        self.indices[slot] = column
+        self.weights[slot] = weight
+        self.edge_ids[slot] = edge_id
+        fill[row] = slot + 1
+
+    def length_scale(self):
+        """
+        :returns: (float) the smallest weight per unit of length of the
+        line of an edge, the loops and the edges between two verticies at
+        the same place do not count. inf if there is no such edge.
+
+        computed on the first call, forget_lengths resets it when a vertex
+        moved.
+        """
+        if self._length_scale is None:
+            scale = float('inf')
+            for edge in self.edges:
+                x_start, y_start = vertex_center(edge.get_vx_start())
+                x_end, y_end = vertex_center(edge.get_vx_end())
+                length = hypot(x_end - x_start, y_end - y_start)
+                if length > 0:
+                    weight = edge.get_weight()
+                    scale = min(scale, (1 if weight is None else weight) / length)
+            self._length_scale = scale
+        return self._length_scale
+
+    def forget_lengths(self):
+        """
+        the verticies moved, the lengths of the edges changed.
+        """
+        self._length_scale = None
+
+    def neighbours(self, i):
+        """
+        :param i: (int) index of a vertex.
+
+        :returns: (zip) (neighbour index, weight, edge index) of the vertex i.
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end],
+                   self.weights[start:end],
+                   self.edge_ids[start:end])
+
+    def degree(self, i):
+        """
+        :param i: (int) index of a vertex.
+
+        :returns: (int) out degree of the vertex i.
+        """
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def __len__(self):
+        return len(self.verticies)
+
+    def __repr__(self):
+        return 'csr ({} verticies, {} entries)'.format(len(self.verticies),
+                                                       len(self.indices))
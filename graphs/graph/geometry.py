@@ -0,0 +1,182 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   geometry.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   where the items of the graph are drawn, shared by everything that
+#   draws a graph so they all agree with the canvas.
+
+from math import hypot
+
+# radius of the vertex circle
+VX_RADIUS = 10
+# shape of the arrows of the directed edges, the default of Tk : length
+# from the tip to the neck, from the tip to the corners and width of the
+# corners from the line.
+ARROW_SHAPE = (8, 10, 3)
+
+def vertex_center(vertex):
+    """
+    :param vertex: (Vertex)
+
+    :returns: (Tuple(float, float)) center of the vertex.
+
+    The coords of a vertex are the bounding box of its circle on the canvas
+    (x1, y1, x2, y2), or directly its center (x, y).
+    """
+    coords = vertex.get_coords()
+    if len(coords) >= 4:
+        return ((coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2)
+    return (coords[0], coords[1])
+
+def vertex_bbox(x, y):
+    """
+    :param x: (float)
+    :param y: (float) center of the vertex.
+
+    :returns: (Tuple(float)) bounding box of the vertex circle.
+    """
+    return (x - VX_RADIUS, y - VX_RADIUS, x + VX_RADIUS, y + VX_RADIUS)
+
+def loop_bbox(x, y):
+    """
+    :param x: (float)
+    :param y: (float) center of the vertex.
+
+    :returns: (Tuple(float)) bounding box of the circle of a loop, on the
+    top left of the vertex.
+    """
+    return (x - 35, y - 35, x + 5, y + 5)
+
+def loop_weight_position(x, y):
+    """
+    :param x: (float)
+    :param y: (float) center of the vertex.
+
+    :returns: (Tuple(float, float)) where the weight of a loop is written.
+    """
+    return (x - 10, y - 35)
+
+def edge_segment(edge):
+    """
+    :param edge: (Edge)
+
+    :returns: (Tuple(float)) (x_start, y_start, x_end, y_end) the line 
+    between the centers of the verticies of the edge.
+    """
+    return vertex_center(edge.get_vx_start()) + vertex_center(edge.get_vx_end())
+
+def is_loop(edge):
+    """
+    :param edge: (Edge)
+
+    :returns: (bool) True if the edge starts and ends at the same vertex.
+    """
+    return edge.get_vx_start() == edge.get_vx_end()
+
+def edge_line(edge):
+    """
+    :param edge: (Edge)
+
+    :returns: (Tuple(float)) the line of the edge for the spatial index,
+    None for a loop which is a circle filling its bounding box.
+    """
+    if is_loop(edge):
+        return None
+    return edge_segment(edge)
+
+def edge_bbox(edge):
+    """
+    :param edge: (Edge)
+
+    :returns: (Tuple(float)) bounding box of the edge on the canvas.
+    """
+    x_start, y_start, x_end, y_end = edge_segment(edge)
+    if is_loop(edge):
+        return loop_bbox(x_start, y_start)
+    return (min(x_start, x_end), min(y_start, y_end),
+            max(x_start, x_end), max(y_start, y_end))
+
+def distance_to_edge(edge, x, y):
+    """
+    :param edge: (Edge)
+    :param x: (float)
+    :param y: (float) a point.
+
+    :returns: (float) distance from the point to the line of the edge, or
+    to the circle of a loop.
+    """
+    x_start, y_start, x_end, y_end = edge_segment(edge)
+    if is_loop(edge):
+        x0, y0, x1, y1 = loop_bbox(x_start, y_start)
+        return abs(hypot(x - (x0 + x1) / 2, y - (y0 + y1) / 2) - (x1 - x0) / 2)
+
+    dx, dy = x_end - x_start, y_end - y_start
+    length = dx * dx + dy * dy
+    if length == 0:
+        return hypot(x - x_start, y - y_start)
+
+    # projection of the point on the segment
+    t = max(0, min(1, ((x - x_start) * dx + (y - y_start) * dy) / length))
+    return hypot(x - x_start - t * dx, y - y_start - t * dy)
+
+def arrow_head(x_start, y_start, x_end, y_end, width=1):
+    """
+    :param x_start: (float)
+    :param y_start: (float)
+    :param x_end: (float)
+    :param y_end: (float) the line of the edge.
+    :param width: (float) width of the line.
+
+    :returns: (Tuple(float)) the polygon (tip, corner, neck, corner) of 
+    the arrow at the end of the line, as Tk draws it. None if the line
+    has no length.
+    """
+    dx, dy = x_end - x_start, y_end - y_start
+    length = hypot(dx, dy)
+    if length == 0:
+        return None
+
+    to_neck, to_corners, corner_width = ARROW_SHAPE
+    corner_width += width / 2
+    ux, uy = dx / length, dy / length
+    return (x_end, y_end,
+            x_end - to_corners * ux - corner_width * uy,
+            y_end - to_corners * uy + corner_width * ux,
+            x_end - to_neck * ux, 
+            y_end - to_neck * uy,
+            x_end - to_corners * ux + corner_width * uy,
+            y_end - to_corners * uy - corner_width * ux)
+
+def graph_bbox(graph):
+    """
+    :param graph: (Graph)
+
+    :returns: (Tuple(float)) bounding box of all the verticies and edges
+    of the graph, None if it has no vertex.
+    """
+    x0 = y0 = float('inf')
+    x1 = y1 = float('-inf')
+    for vertex in graph.get_verticies():
+        bx0, by0, bx1, by1 = vertex_bbox(*vertex_center(vertex))
+        x0, y0 = min(x0, bx0), min(y0, by0)
+        x1, y1 = max(x1, bx1), max(y1, by1)
+
+    # only the loops go out of the boxes of the verticies
+    for edge in graph.get_edges():
+        if is_loop(edge):
+            bx0, by0, _, _ = edge_bbox(edge)
+            x0, y0 = min(x0, bx0), min(y0, by0)
+
+    if x0 == float('inf'):
+        return None
+    return (x0, y0, x1, y1)
@@ -8,12 +8,20 @@
 #
 #   graph.py
 #
-#   last update 30/07/22
+#   last update 18/10/26
 #
 #   laurent vouriot
 # 
 #   The graph data structure to keep the drawn graph in memory.
 
+from math import hypot
+
+from .csr import CSRAdjacency
+from .geometry import *
+from .spatial import SpatialGrid
+from .storage import VertexStore, EdgeStore, CompactAdjacency
+from ..utils.instrument import timed, count
+
 class Vertex(object):
     """
     Vertex class. 
@@ -96,9 +104,9 @@ class Vertex(object):
 
     def set_label_id(self, label_id):
         """
-        :param label_id: (int) Set the label_id.
+        :param label_id: (int) Set the label_id i.e the text id.
         """
-        self.label_id = label_id
+        self.text_id = label_id
     
     def set_coords (self, coords):
         """
@@ -167,6 +175,12 @@ class Edge(object):
         """
         return self.line_id
 
+    def get_weight_id(self):
+        """
+        :returns: (int) id of the weight text on the canvas.
+        """
+        return self.weight_id
+
     def get_weight(self):
         """
         :returns: (int) return the weight of the edge.
@@ -214,6 +228,39 @@ class Edge(object):
 
 # -----------------------------------------------------------------------------
 
+class ItemSet(object):
+    """
+    ItemSet class
+
+    Ordered set of verticies or edges, it keeps the insertion order like 
+    a list but the items are removed in constant time.
+    """
+    def __init__(self, items=()):
+        """
+        :param items: (iterable) initial items.
+        """
+        self._items = dict.fromkeys(items)
+
+    def append(self, item):
+        self._items[item] = None
+
+    def remove(self, item):
+        del self._items[item]
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return repr(list(self._items))
+
+# -----------------------------------------------------------------------------
+
 class Graph(object): 
     """
     The Graph class 
@@ -221,82 +268,282 @@ class Graph(object):
     The graph datastructure, to store the drawn graph.
     To simplify the the relation between the graph on the canvas and 
     the actual graph there is an array for the verticies and the edges, 
-    and also an adjacency list.
+    an adjacency list and the set of incident edges of each vertex.
 
     A graph object can be created in two cases : 
     - an empty graph when we start a new embedding
     - create graph from a serialized object previously drawn.
     """
-    def __init__(self, verticies=None, edges=None, directed=False, weighted=False):
+    def __init__(self, verticies=None, edges=None, directed=False, weighted=False,
+                 compact=False):
         """
         :param verticies: (list(Vertex)) array of verticies. 
         :param edges: (list(Edge)) array of edges.
         :param adjacency_list: (dict) adjacency list.
+        :param compact: (bool) if True the verticies and edges data is kept
+        in typed arrays (see storage.py) and the graph holds VertexView and
+        EdgeView instances, for the large graphs. In compact mode verticies
+        and edges can also be a VertexStore and its EdgeStore.
 
         Constructor.
         """
         self.directed = directed
         self.weighted = weighted
+        self.compact = compact
         
         # empty graph, new drawing
         if verticies == None:
             self.vx_counter = 0
-            self.verticies = []
-            self.edges = []
+            verticies = []
+            edges = []
         # serialized graph
         else:
             # we retrieve the label on the last vertex
             self.vx_counter = len(verticies) - 1
+
+        if compact:
+            self._to_compact(verticies, edges)
+        else:
+            self.verticies = ItemSet(verticies)
+            self.edges = ItemSet(edges)
+
+        # the CSR adjacency is cached until the next change of the graph
+        self._version = 0
+        self._csr = {}
+
+        # hash indexes from the canvas ids to the graph items, every click
+        # on the canvas gives us ids, so the lookups must be constant time.
+        self._ovals = {}
+        self._texts = {}
+        self._lines = {}
+        self._weights = {}
+
+        # spatial indexes of the verticies and edges, built on the first
+        # spatial query and then kept up to date.
+        self._vx_grid = None
+        self._edge_grid = None
+
+        # journal where the changes are recorded (see utils/journal.py)
+        self.journal = None
+
+        # only the items drawn on the canvas have ids
+        for vertex in self._drawn(self.verticies):
+            self._index_vx(vertex)
+        for edge in self._drawn(self.edges):
+            self._index_edge(edge)
+
+        self.generate_adjacency_list()
+
+        # incident edges of each vertex, kept in the EdgeStore in compact 
+        # mode.
+        self._incident = {}
+        if not compact:
+            for vertex in self.verticies:
+                self._incident[vertex] = {}
+            for edge in self.edges:
+                self._incident_add(edge)
+
+    def _to_compact(self, verticies, edges):
+        """
+        :param verticies: (list(Vertex))
+        :param edges: (list(Edge))
+
+        copy the verticies and edges given to the constructor in the 
+        compact storage, the graph then holds the stores.
+        """
+        if isinstance(verticies, VertexStore):
             self.verticies = verticies
             self.edges = edges
+            return
 
-        self.adjacency_list = {}
-        self.incidence_matrix = [[]]
+        self.verticies = VertexStore()
+        self.edges = EdgeStore(self.verticies)
+
+        views = {}
+        for vertex in verticies:
+            views[vertex] = self.verticies.append(vertex)
+
+        for edge in edges:
+            self.edges.append(Edge(views[edge.get_vx_start()],
+                                   views[edge.get_vx_end()],
+                                   edge.get_line_id(),
+                                   weight=edge.get_weight(),
+                                   weight_id=edge.get_weight_id(),
+                                   color=edge.get_color()))
+
+    def _drawn(self, items):
+        """
+        :param items: (iterable) verticies or edges of the graph.
 
+        :returns: (iterable) the items that may have canvas ids, in compact
+        mode the id columns are scanned without creating the views.
+        """
+        if self.compact:
+            return items.drawn()
+        return items
+
+    @timed
     def generate_adjacency_list(self):
         """
-        TODO doc
+        :returns: (dict) the adjacency list.
+
+        rebuild the whole adjacency list from the verticies and edges.
+        The adjacency list is maintained in place by add_vx, add_edge,
+        delete_vx and delete_edge so this is only needed when the graph
+        changes from undirected to directed.
+
+        The adjacency list maps each vertex to a dict {edge : (neighbour, 
+        weight)}, so an edge can be removed in constant time. In compact
+        mode the lists of edges are kept in the EdgeStore.
         """
+        if self.compact:
+            self.adjacency_list = CompactAdjacency(self.edges, self.directed)
+            return self.adjacency_list
+
+        self.adjacency_list = {}
         for vertex in self.verticies:
-            self.adjacency_list[vertex.get_label()] = []
+            self.adjacency_list[vertex] = {}
         
         for edge in self.edges:
-            vx_start_label = edge.get_vx_start().get_label()
-            vx_end_label = edge.get_vx_end().get_label()
-            edge_weight = edge.get_weight()
+            self._adjacency_add(edge)
+
+        return self.adjacency_list
+
+    def _adjacency_add(self, edge):
+        """
+        :param edge: (Edge)
 
-            self.adjacency_list[vx_start_label].append((vx_end_label, 
-                                                        edge_weight))
+        add an edge to the adjacency list.
+        """
+        if self.compact:
+            return
+
+        vx_start = edge.get_vx_start()
+        vx_end = edge.get_vx_end()
+        edge_weight = edge.get_weight()
 
-            if not self.directed:
-                self.adjacency_list[vx_end_label].append((vx_start_label,
-                                                          edge_weight))
-            print(self.adjacency_list)
+        self.adjacency_list[vx_start][edge] = (vx_end, edge_weight)
+        if not self.directed:
+            self.adjacency_list[vx_end][edge] = (vx_start, edge_weight)
 
-    def genereate_incidence_matrix(self):
+    def _adjacency_remove(self, edge):
         """
-        TODO doc 
+        :param edge: (Edge)
+
+        remove an edge from the adjacency list.
         """
-        # resizing the matrix n*n 
-        n = len(self.verticies) 
-        self.incidence_matrix = [[0] * n for i in range(n)]
-        
-        for edge in self.edges:
-            # we retrieve the indexes of the start/end verticies of the edges
-            # because their label can be anything 
-            index_vx_start = self.verticies.index(edge.get_vx_start()) 
-            index_vx_end = self.verticies.index(edge.get_vx_end())
-            
-            if self.is_weighted():
-                value = edge.get_weight()
-            else: 
-                value = 1
-
-            self.incidence_matrix[index_vx_start][index_vx_end] = value 
-            if not self.directed:
-                self.incidence_matrix[index_vx_end][index_vx_start] = value
-
-            print(self.incidence_matrix)
+        if self.compact:
+            return
+
+        for vertex in (edge.get_vx_start(), edge.get_vx_end()):
+            neighbours = self.adjacency_list.get(vertex)
+            if neighbours is not None:
+                neighbours.pop(edge, None)
+
+    @timed
+    def get_csr(self, reverse=False):
+        """
+        :param reverse: (bool) if True, for a directed graph, the adjacency 
+        of the reversed graph (the in-neighbours).
+
+        :returns: (CSRAdjacency) compressed sparse row adjacency.
+
+        The CSR adjacency is built once and cached, it is only rebuilt 
+        after the graph has changed.
+        """
+        reverse = reverse and self.directed
+        version, csr = self._csr.get(reverse, (None, None))
+        if version != self._version:
+            csr = CSRAdjacency(self.verticies, 
+                               self.edges, 
+                               self.directed, 
+                               reverse=reverse)
+            self._csr[reverse] = (self._version, csr)
+            count('Graph.csr_builds')
+        return csr
+
+    def _incident_add(self, edge):
+        """
+        :param edge: (Edge)
+
+        add the edge to the incident edges of its verticies.
+        """
+        if self.compact:
+            return
+
+        self._incident[edge.get_vx_start()][edge] = None
+        self._incident[edge.get_vx_end()][edge] = None
+
+    def _incident_remove(self, edge):
+        """
+        :param edge: (Edge)
+
+        remove the edge from the incident edges of its verticies.
+        """
+        if self.compact:
+            return
+
+        for vertex in (edge.get_vx_start(), edge.get_vx_end()):
+            incident = self._incident.get(vertex)
+            if incident is not None:
+                incident.pop(edge, None)
+
+    def get_incident_edges(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        :returns: (iterable(Edge)) the edges starting or ending at the vertex,
+        a loop is given once.
+        """
+        if self.compact:
+            return self.edges.incident_edges(vertex._index)
+        return self._incident[vertex].keys()
+
+    def _index_vx(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        register the canvas ids of the vertex in the indexes.
+        """
+        if vertex.get_oval() is not None:
+            self._ovals[vertex.get_oval()] = vertex
+        if vertex.get_text() is not None:
+            self._texts[vertex.get_text()] = vertex
+
+    def _unindex_vx(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        remove the canvas ids of the vertex from the indexes, an id is only
+        removed if it still points to this vertex, it may have been reused
+        by another item in the meantime.
+        """
+        if self._ovals.get(vertex.get_oval()) == vertex:
+            del self._ovals[vertex.get_oval()]
+        if self._texts.get(vertex.get_text()) == vertex:
+            del self._texts[vertex.get_text()]
+
+    def _index_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        edge analogue of _index_vx.
+        """
+        if edge.get_line_id() is not None:
+            self._lines[edge.get_line_id()] = edge
+        if edge.get_weight_id() is not None:
+            self._weights[edge.get_weight_id()] = edge
+
+    def _unindex_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        edge analogue of _unindex_vx.
+        """
+        if self._lines.get(edge.get_line_id()) == edge:
+            del self._lines[edge.get_line_id()]
+        if self._weights.get(edge.get_weight_id()) == edge:
+            del self._weights[edge.get_weight_id()]
 
     def find_vx_from_id(self, vx_id):
         """
@@ -307,9 +554,15 @@ class Graph(object):
         On the canvas when selecting a vertex we get items ids, this 
         function returns the Vertex instance with this circle id.
         """
-        for vertex in self.verticies:
-            if vx_id == vertex.get_oval():
-                return vertex
+        return self._ovals.get(vx_id)
+
+    def find_vx_from_text_id(self, text_id):
+        """
+        :param text_id: (int) id of the canvas text label
+
+        :returns: (Vertex) Vertex instance corresponding to the text id.
+        """
+        return self._texts.get(text_id)
 
     def find_edge_from_id(self, line_id):
         """
@@ -320,45 +573,241 @@ class Graph(object):
         On the canvas when selecting an edge we get the line id, this 
         function returns the Edge instance corresponding the line id.
         """
+        return self._lines.get(line_id)
+
+    def find_edge_from_weight_id(self, weight_id):
+        """
+        :param weight_id: (int) id of the canvas weight text
+
+        :returns: (Edge) Edge instance corresponding to the weight id.
+        """
+        return self._weights.get(weight_id)
+
+    def _build_grids(self):
+        """
+        build the spatial indexes if needed.
+        """
+        if self._vx_grid is not None:
+            return
+
+        self._vx_grid = SpatialGrid()
+        self._edge_grid = SpatialGrid()
+        for vertex in self.verticies:
+            self._vx_grid.insert(vertex, vertex_bbox(*vertex_center(vertex)))
         for edge in self.edges:
-            if line_id == edge.get_line_id():
-                return edge 
+            self._edge_grid.insert(edge, edge_bbox(edge), edge_line(edge))
+
+    def find_verticies_in(self, x0, y0, x1, y1):
+        """
+        :param x0:
+        :param y0:
+        :param x1:
+        :param y1: (float) a region of the canvas.
+
+        :returns: (set(Vertex)) the verticies whose circle is in the region.
+        """
+        self._build_grids()
+        return self._vx_grid.query(x0, y0, x1, y1)
+
+    def find_edges_in(self, x0, y0, x1, y1):
+        """
+        :param x0:
+        :param y0:
+        :param x1:
+        :param y1: (float) a region of the canvas.
+
+        :returns: (set(Edge)) the edges whose line is in the region.
+        """
+        self._build_grids()
+        return self._edge_grid.query(x0, y0, x1, y1)
+
+    def nearest_vx(self, x, y, radius):
+        """
+        :param x:
+        :param y: (float) a point of the canvas.
+        :param radius: (float) maximum distance to the center.
+
+        :returns: (Vertex) the vertex with the nearest center, None if 
+        there is none within the radius.
+        """
+        nearest = None
+        best = radius
+        for vertex in self.find_verticies_in(x - radius, y - radius,
+                                             x + radius, y + radius):
+            vx_x, vx_y = vertex_center(vertex)
+            distance = hypot(x - vx_x, y - vx_y)
+            if distance <= best:
+                nearest, best = vertex, distance
+        return nearest
+
+    def nearest_edge(self, x, y, tolerance):
+        """
+        :param x:
+        :param y: (float) a point of the canvas.
+        :param tolerance: (float) maximum distance to the line.
+
+        :returns: (Edge) the edge with the nearest line, None if there is
+        none within the tolerance.
+        """
+        nearest = None
+        best = tolerance
+        for edge in self.find_edges_in(x - tolerance, y - tolerance,
+                                       x + tolerance, y + tolerance):
+            distance = distance_to_edge(edge, x, y)
+            if distance <= best:
+                nearest, best = edge, distance
+        return nearest
+
+    @timed
+    def find_item_at(self, x, y, tolerance=5):
+        """
+        :param x:
+        :param y: (float) a point of the canvas, e.g. a click.
+        :param tolerance: (float) distance around the items still 
+        considered on them.
+
+        :returns: (Tuple(Vertex, Edge)) the vertex at this point, if 
+        there is no vertex the edge at this point, (None, None) if the 
+        point is on nothing. The verticies are above the edges.
+        """
+        vertex = self.nearest_vx(x, y, VX_RADIUS + tolerance)
+        if vertex is not None:
+            return (vertex, None)
+        return (None, self.nearest_edge(x, y, tolerance))
+
+    def drawn_verticies(self):
+        """
+        :returns: (list(Vertex)) the verticies drawn on the canvas.
+        """
+        return list(self._ovals.values())
+
+    def drawn_edges(self):
+        """
+        :returns: (list(Edge)) the edges drawn on the canvas.
+        """
+        return list(self._lines.values())
+
+    def set_vx_ids(self, vertex, oval_id, text_id):
+        """
+        :param vertex: (Vertex)
+        :param oval_id: (int) new id of the circle on the canvas.
+        :param text_id: (int) new id of the text label on the canvas.
+
+        when the graph is redrawn the canvas items get new ids, they
+        must be changed through the graph to keep the indexes up to date.
+        """
+        self._unindex_vx(vertex)
+        vertex.set_oval_id(oval_id)
+        vertex.set_label_id(text_id)
+        self._index_vx(vertex)
+
+    def set_edge_ids(self, edge, line_id, weight_id):
+        """
+        :param edge: (Edge)
+        :param line_id: (int) new id of the line on the canvas.
+        :param weight_id: (int) new id of the weight text on the canvas.
+
+        edge analogue of set_vx_ids.
+        """
+        self._unindex_edge(edge)
+        edge.set_line_id(line_id)
+        edge.set_weight_id(weight_id)
+        self._index_edge(edge)
     
+    @timed
     def add_vx(self, vertex):
         """
         :param vertex: (Vertex) 
 
+        :returns: (Vertex) the vertex stored, in compact mode its view.
+
         Add a vertex instance to the datastructure.
         """
-        self.verticies.append(vertex)
-            
+        if self.compact:
+            vertex = self.verticies.append(vertex)
+        else:
+            self.verticies.append(vertex)
+            self.adjacency_list[vertex] = {}
+            self._incident[vertex] = {}
+
+        self._index_vx(vertex)
+        if self._vx_grid is not None:
+            self._vx_grid.insert(vertex, vertex_bbox(*vertex_center(vertex)))
+        self._version += 1
+        if self.journal is not None:
+            self.journal.add_vx(vertex)
+        return vertex
+
+    @timed
     def add_edge(self, edge):
         """
         :param edge: (Edge) 
 
-        Add an edge instance to the datastructure.
+        :returns: (Edge) the edge stored, in compact mode its view.
+
+        Add an edge instance to the datastructure, in compact mode its
+        verticies must be views of this graph.
         """
-        self.edges.append(edge)
+        if self.compact:
+            edge = self.edges.append(edge)
+        else:
+            self.edges.append(edge)
+
+        self._index_edge(edge)
+        self._adjacency_add(edge)
+        self._incident_add(edge)
+        if self._edge_grid is not None:
+            self._edge_grid.insert(edge, edge_bbox(edge), edge_line(edge))
+        self._version += 1
+        if self.journal is not None:
+            self.journal.add_edge(edge)
+        return edge
 
     def delete_vx(self, vx_id):
         """
         :params vx_id: (int) id of the circle item on the canvas
 
+        :returns: (list(Edge)) the incident edges removed with the vertex.
+
         finds the vertex instance corresponding the circle id and 
-        removes it from the datastruture.
+        removes it from the datastruture with its incident edges, 
+        in O(degree).
+        """
+        return self.remove_vx(self.find_vx_from_id(vx_id))
+
+    @timed
+    def remove_vx(self, vx):
+        """
+        :param vx: (Vertex)
+
+        :returns: (list(Edge)) the incident edges removed with the vertex.
+
+        delete_vx from the vertex instance.
         """
-        vx = self.find_vx_from_id(vx_id)
-        self.verticies.remove(vx)
-        
         # removing the incident edges of this vx
-        for edge in self.edges:
-            if edge.get_vx_start().get_oval() == vx_id or edge.get_vx_end().get_oval() == vx_id:
-                self.edges.remove(edge)
+        incident_edges = list(self.get_incident_edges(vx))
+        for edge in incident_edges:
+            self._remove_edge(edge)
+
+        self.verticies.remove(vx)
+        self._unindex_vx(vx)
+        if self._vx_grid is not None:
+            self._vx_grid.remove(vx)
+        if not self.compact:
+            del self.adjacency_list[vx]
+            del self._incident[vx]
+        self._version += 1
+        if self.journal is not None:
+            self.journal.delete_vx(vx, incident_edges)
+
+        return incident_edges
 
     def delete_edge(self, line_id):
         """
         :param line_id: (int) id of the line item on the canvas.
 
+        :returns: (Edge) the edge removed, None if there was no edge.
+
         finds the edge instance corresponding the line id and 
         removes it from the datastruture.
         """
@@ -366,7 +815,34 @@ class Graph(object):
 
         # the edge may be already deleted if we delete its incident vx
         if edge != None:
-            self.edges.remove(edge)
+            self.remove_edge(edge)
+
+        return edge
+
+    @timed
+    def remove_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        delete_edge from the edge instance.
+        """
+        self._remove_edge(edge)
+        if self.journal is not None:
+            self.journal.delete_edge(edge)
+
+    def _remove_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        removes the edge from all the structures of the graph.
+        """
+        self.edges.remove(edge)
+        self._unindex_edge(edge)
+        self._adjacency_remove(edge)
+        self._incident_remove(edge)
+        if self._edge_grid is not None:
+            self._edge_grid.remove(edge)
+        self._version += 1
         
     def update_vx_color(self, vx_id, color):
         """
@@ -377,9 +853,38 @@ class Graph(object):
         we need to update the color of the vertex instance in the 
         graph instance. 
         """
-        vx = self.find_vx_from_id(vx_id)
-        vx.set_color(color)
+        self.set_vx_color(self.find_vx_from_id(vx_id), color)
+
+    def set_vx_color(self, vertex, color):
+        """
+        :param vertex: (Vertex)
+        :param color: (hex)
+
+        update_vx_color from the vertex instance.
+        """
+        vertex.set_color(color)
+        if self.journal is not None:
+            self.journal.vx_color(vertex)
     
+    @timed
+    def update_vx_coords(self, vertex, coords):
+        """
+        :param vertex: (Vertex)
+        :param coords: (list(int)) new coords of the vertex.
+
+        when a vertex is moved on the canvas its coords must be updated
+        through the graph, to keep the spatial indexes up to date.
+        """
+        vertex.set_coords(coords)
+        for _, csr in self._csr.values():
+            csr.forget_lengths()
+        if self._vx_grid is not None:
+            self._vx_grid.move(vertex, vertex_bbox(*vertex_center(vertex)))
+            for edge in self.get_incident_edges(vertex):
+                self._edge_grid.move(edge, edge_bbox(edge), edge_line(edge))
+        if self.journal is not None:
+            self.journal.vx_coords(vertex)
+
     def update_edge_color(self, edge_id, color):
         """
         :param vx_id: (int)
@@ -387,8 +892,18 @@ class Graph(object):
 
         edge analogue of update_vx_color. 
         """
-        edge = self.find_edge_from_id(edge_id) 
+        self.set_edge_color(self.find_edge_from_id(edge_id), color)
+
+    def set_edge_color(self, edge, color):
+        """
+        :param edge: (Edge)
+        :param color: (hex)
+
+        update_edge_color from the edge instance.
+        """
         edge.set_color(color)
+        if self.journal is not None:
+            self.journal.edge_color(edge)
         
     def get_and_update_vx_counter(self): 
         """
@@ -403,21 +918,21 @@ class Graph(object):
         """
         print the adjacency list for debug. 
         """
-        print(adjacency_list)
         for vertex in adjacency_list:
             print(vertex.get_label(), ' : ', 
-                    [i for i in adjacency_list[vertex.get_label()]])
+                    [(neighbour.get_label(), weight) 
+                     for neighbour, weight in adjacency_list[vertex].values()])
             print('------------')
 
     def get_verticies(self):
         """
-        :returns: (list(Vertex)) 
+        :returns: (ItemSet(Vertex)) 
         """
         return self.verticies
 
     def get_edges(self):
         """
-        :returns: (list(Edges))
+        :returns: (ItemSet(Edges))
         """
         return self.edges
     
@@ -434,10 +949,19 @@ class Graph(object):
         At first all graphs are considered as undirected, but if the user
         add a directed edge the must be set to directed.
         """
-        self.directed = True
+        if not self.directed:
+            self.directed = True
+            # the reverse entries of the undirected edges must go
+            self.generate_adjacency_list()
+            self._version += 1
+            if self.journal is not None:
+                self.journal.directed()
 
     def set_to_weighted(self): 
-        self.weighted = True
+        if not self.weighted:
+            self.weighted = True
+            if self.journal is not None:
+                self.journal.weighted()
 
     def is_directed(self):
         return self.directed
@@ -0,0 +1,250 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   matrices.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   adjacency, degree and laplacian matrices of a graph as numpy arrays,
+#   and their export to a .npz file.
+#
+#   The matrices are built from the CSR adjacency of the graph, the rows
+#   and columns are in the order of the verticies of the graph. They are
+#   sparse (scipy.sparse.csr_array) when scipy is installed, dense numpy
+#   arrays otherwise. numpy is an optional dependency of graphix, scipy
+#   too.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+class SparseMatrix(object):
+    """
+    SparseMatrix class
+
+    the components of a matrix in compressed sparse row format, the same
+    as the ones of scipy.sparse.csr_array, so it can be used without scipy.
+    """
+    def __init__(self, data, indices, indptr, shape):
+        """
+        :param data: (numpy.ndarray) values of the entries.
+        :param indices: (numpy.ndarray) column of each entry.
+        :param indptr: (numpy.ndarray) the entries of the row i are from
+        indptr[i] to indptr[i + 1].
+        :param shape: (Tuple(int, int))
+
+        Constructor.
+        """
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+
+    def rows(self):
+        """
+        :returns: (numpy.ndarray) row of each entry.
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def dot(self, x):
+        """
+        :param x: (numpy.ndarray) vector.
+
+        :returns: (numpy.ndarray) product of the matrix and x, in O(n + E).
+        """
+        return np.bincount(self.rows(), self.data * x[self.indices],
+                           minlength=self.shape[0])
+
+    def toarray(self):
+        """
+        :returns: (numpy.ndarray) the dense matrix.
+        """
+        dense = np.zeros(self.shape)
+        np.add.at(dense, (self.rows(), self.indices), self.data)
+        return dense
+
+    def to_scipy(self):
+        """
+        :returns: (scipy.sparse.csr_array)
+        """
+        return scipy.sparse.csr_array((self.data, self.indices, self.indptr),
+                                      shape=self.shape)
+
+    def __repr__(self):
+        return 'sparse matrix {} ({} entries)'.format(self.shape, len(self.data))
+
+# -----------------------------------------------------------------------------
+
+def _check_numpy():
+    if np is None:
+        raise ImportError('numpy is needed for the matrices of a graph')
+
+def _output(matrix, sparse):
+    """
+    :param matrix: (SparseMatrix)
+    :param sparse: (bool) if True and scipy is installed, the matrix is
+    sparse.
+
+    :returns: (scipy.sparse.csr_array | numpy.ndarray)
+    """
+    if sparse and scipy is not None:
+        return matrix.to_scipy()
+    return matrix.toarray()
+
+def _from_entries(rows, columns, data, n):
+    """
+    :param rows: (numpy.ndarray)
+    :param columns: (numpy.ndarray)
+    :param data: (numpy.ndarray)
+    :param n: (int) size of the matrix.
+
+    :returns: (SparseMatrix) the entries sorted by row and column, the
+    entries at the same place are summed.
+    """
+    order = np.lexsort((columns, rows))
+    rows, columns, data = rows[order], columns[order], data[order]
+
+    # the first entry of each (row, column)
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+    starts = np.flatnonzero(first)
+    data = np.add.reduceat(data, starts) if len(data) else data
+    rows, columns = rows[starts], columns[starts]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return SparseMatrix(data.astype(np.float64), columns.astype(np.int64),
+                        indptr, (n, n))
+
+def sparse_adjacency(graph, weighted=True, symmetric=False):
+    """
+    :param graph: (Graph)
+    :param weighted: (bool) if False every edge counts for 1, else for its
+    weight (1 if it has no weight).
+    :param symmetric: (bool) if True the edges of a directed graph are
+    counted in both directions.
+
+    :returns: (SparseMatrix) the adjacency matrix, A[i, j] is the sum of
+    the weights of the edges from the vertex i to the vertex j.
+    """
+    _check_numpy()
+    csr = graph.get_csr()
+    n = len(csr)
+
+    rows = np.repeat(np.arange(n), np.diff(np.asarray(csr.indptr)))
+    columns = np.asarray(csr.indices)
+    if weighted:
+        data = np.asarray(csr.weights)
+    else:
+        data = np.ones(len(columns))
+
+    # the CSR of an undirected graph has each edge in both rows already
+    if symmetric and csr.directed:
+        loop = rows == columns
+        rows, columns = (np.concatenate((rows, columns[~loop])),
+                         np.concatenate((columns, rows[~loop])))
+        data = np.concatenate((data, data[~loop]))
+
+    return _from_entries(rows, columns, data, n)
+
+def sparse_laplacian(graph, weighted=True):
+    """
+    :param graph: (Graph)
+    :param weighted: (bool)
+
+    :returns: (Tuple(SparseMatrix, numpy.ndarray)) the laplacian matrix
+    D - A of the graph, with its edges in both directions, and the
+    degrees.
+    """
+    adjacency = sparse_adjacency(graph, weighted=weighted, symmetric=True)
+    degrees = np.bincount(adjacency.rows(), adjacency.data,
+                          minlength=adjacency.shape[0])
+
+    n = adjacency.shape[0]
+    diagonal = np.arange(n)
+    laplacian = _from_entries(np.concatenate((adjacency.rows(), diagonal)),
+                              np.concatenate((adjacency.indices, diagonal)),
+                              np.concatenate((-adjacency.data, degrees)),
+                              n)
+    return laplacian, degrees
+
+def adjacency_matrix(graph, weighted=True, sparse=True):
+    """
+    :param graph: (Graph)
+    :param weighted: (bool) if False every edge counts for 1.
+    :param sparse: (bool) if False the matrix is a dense numpy array.
+
+    :returns: (scipy.sparse.csr_array | numpy.ndarray) adjacency matrix.
+    """
+    return _output(sparse_adjacency(graph, weighted), sparse)
+
+def degree_matrix(graph, weighted=True, sparse=True):
+    """
+    :param graph: (Graph)
+    :param weighted: (bool) if False every edge counts for 1.
+    :param sparse: (bool) if False the matrix is a dense numpy array.
+
+    :returns: (scipy.sparse.csr_array | numpy.ndarray) diagonal matrix of
+    the degrees (out degrees for a directed graph).
+    """
+    adjacency = sparse_adjacency(graph, weighted)
+    n = adjacency.shape[0]
+    degrees = np.bincount(adjacency.rows(), adjacency.data, minlength=n)
+    diagonal = np.arange(n)
+    return _output(_from_entries(diagonal, diagonal, degrees, n), sparse)
+
+def laplacian_matrix(graph, weighted=True, sparse=True):
+    """
+    :param graph: (Graph)
+    :param weighted: (bool) if False every edge counts for 1.
+    :param sparse: (bool) if False the matrix is a dense numpy array.
+
+    :returns: (scipy.sparse.csr_array | numpy.ndarray) laplacian matrix
+    D - A, a directed graph is taken as undirected.
+    """
+    laplacian, _ = sparse_laplacian(graph, weighted)
+    return _output(laplacian, sparse)
+
+def save_npz(filename, graph, weighted=True):
+    """
+    :param filename: (str) .npz file.
+    :param graph: (Graph)
+    :param weighted: (bool) if False every edge counts for 1.
+
+    save the labels of the verticies, the degrees and the sparse
+    components of the adjacency and laplacian matrices. A matrix is read
+    back with :
+
+        scipy.sparse.csr_array((f['adjacency_data'],
+                                f['adjacency_indices'],
+                                f['adjacency_indptr']), shape=f['shape'])
+    """
+    adjacency = sparse_adjacency(graph, weighted)
+    laplacian, _ = sparse_laplacian(graph, weighted)
+    degrees = np.bincount(adjacency.rows(), adjacency.data,
+                          minlength=adjacency.shape[0])
+    labels = [str(vertex.get_label()) for vertex in graph.get_csr().verticies]
+
+    np.savez_compressed(filename,
+                        labels=np.array(labels, dtype=str),
+                        shape=np.array(adjacency.shape),
+                        degrees=degrees,
+                        adjacency_data=adjacency.data,
+                        adjacency_indices=adjacency.indices,
+                        adjacency_indptr=adjacency.indptr,
+                        laplacian_data=laplacian.data,
+                        laplacian_indices=laplacian.indices,
+                        laplacian_indptr=laplacian.indptr)
@@ -0,0 +1,223 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   spatial.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   grids to find the items of a region of the canvas.
+
+from collections import defaultdict
+from math import floor
+
+class SpatialGrid(object):
+    """
+    SpatialGrid class
+
+    The plane is cut in square cells, each item is registered in the cells 
+    covered by its bounding box, or crossed by its segment for a line. A 
+    query only looks at the cells covered by the region, so its cost 
+    depends on the number of items around and not on the size of the 
+    graph.
+
+    The cells are on several levels, the cells of a level are twice as
+    large as the ones of the level below. An item is on the first level
+    where it is in at most max_cells cells, so a very long edge is in a
+    few large cells instead of many small ones.
+    """
+    def __init__(self, cell_size=64, max_cells=32):
+        """
+        :param cell_size: (float) size of the side of a cell of the first
+        level.
+        :param max_cells: (int) maximum number of cells of an item.
+        """
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        # the cells of each level, by their position
+        self.levels = []
+        self.boxes = {}
+        self.segments = {}
+        self.level_of = {}
+
+    def _cell_range(self, level, x0, y0, x1, y1):
+        """
+        :param level: (int)
+
+        :returns: (Tuple(int)) first and last cells covered by the box.
+        """
+        size = self.cell_size * (1 << level)
+        return (floor(x0 / size), floor(y0 / size), 
+                floor(x1 / size), floor(y1 / size))
+
+    def _level(self, bbox, segment):
+        """
+        :returns: (int) the first level where the item is in at most
+        max_cells cells.
+        """
+        level = 0
+        while True:
+            i0, j0, i1, j1 = self._cell_range(level, *bbox)
+            if segment is None:
+                cells = (i1 - i0 + 1) * (j1 - j0 + 1)
+            else:
+                # a segment crosses one more cell at each column or row
+                cells = i1 - i0 + j1 - j0 + 1
+            if cells <= self.max_cells:
+                return level
+            level += 1
+
+    def _cells(self, level, bbox, segment):
+        """
+        :param level: (int)
+        :param bbox: (Tuple(float)) bounding box of the item.
+        :param segment: (Tuple(float)) the line of the item, None if it
+        fills its bounding box.
+
+        :yields: (Tuple(int, int)) the cells of the item on the level.
+        """
+        if segment is None:
+            i0, j0, i1, j1 = self._cell_range(level, *bbox)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    yield (i, j)
+            return
+
+        size = self.cell_size * (1 << level)
+        xa, ya, xb, yb = segment
+        if xa > xb:
+            xa, ya, xb, yb = xb, yb, xa, ya
+        i0, i1 = floor(xa / size), floor(xb / size)
+        slope = (yb - ya) / (xb - xa) if i0 != i1 else 0
+
+        # column by column, the cells between the heights of the segment
+        # where it enters and leaves the column
+        y_in = ya
+        for i in range(i0, i1 + 1):
+            y_out = yb if i == i1 else ya + ((i + 1) * size - xa) * slope
+            if y_in < y_out:
+                j0, j1 = floor(y_in / size), floor(y_out / size)
+            else:
+                j0, j1 = floor(y_out / size), floor(y_in / size)
+            for j in range(j0, j1 + 1):
+                yield (i, j)
+            y_in = y_out
+
+    def insert(self, item, bbox, segment=None):
+        """
+        :param item: (Vertex or Edge)
+        :param bbox: (Tuple(float)) (x0, y0, x1, y1) bounding box of the item.
+        :param segment: (Tuple(float)) (x_start, y_start, x_end, y_end) if
+        the item is a line.
+        """
+        self.boxes[item] = bbox
+        if segment is not None:
+            self.segments[item] = segment
+
+        level = self._level(bbox, segment)
+        self.level_of[item] = level
+        while len(self.levels) <= level:
+            self.levels.append(defaultdict(set))
+
+        cells = self.levels[level]
+        for key in self._cells(level, bbox, segment):
+            cells[key].add(item)
+
+    def remove(self, item):
+        """
+        :param item: (Vertex or Edge)
+        """
+        bbox = self.boxes.pop(item, None)
+        if bbox is None:
+            return
+        segment = self.segments.pop(item, None)
+        level = self.level_of.pop(item)
+
+        cells = self.levels[level]
+        for key in self._cells(level, bbox, segment):
+            cell = cells.get(key)
+            if cell is not None:
+                cell.discard(item)
+                if not cell:
+                    del cells[key]
+
+    def move(self, item, bbox, segment=None):
+        """
+        :param item: (Vertex or Edge)
+        :param bbox: (Tuple(float)) new bounding box of the item.
+        :param segment: (Tuple(float)) new line of the item.
+        """
+        self.remove(item)
+        self.insert(item, bbox, segment)
+
+    def query(self, x0, y0, x1, y1):
+        """
+        :param x0:
+        :param y0:
+        :param x1:
+        :param y1: (float) the region.
+
+        :returns: (set) the items whose bounding box, or segment for a 
+        line, intersects the region.
+        """
+        candidates = set()
+        for level, cells in enumerate(self.levels):
+            if not cells:
+                continue
+            i0, j0, i1, j1 = self._cell_range(level, x0, y0, x1, y1)
+
+            # a huge region, e.g. zoomed out on a small graph
+            if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+                for cell in cells.values():
+                    candidates.update(cell)
+            else:
+                for i in range(i0, i1 + 1):
+                    for j in range(j0, j1 + 1):
+                        cell = cells.get((i, j))
+                        if cell is not None:
+                            candidates.update(cell)
+
+        found = set()
+        for item in candidates:
+            bx0, by0, bx1, by1 = self.boxes[item]
+            if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                segment = self.segments.get(item)
+                if segment is None or _crosses(segment, x0, y0, x1, y1):
+                    found.add(item)
+        return found
+
+    def __len__(self):
+        return len(self.boxes)
+
+def _crosses(segment, x0, y0, x1, y1):
+    """
+    :param segment: (Tuple(float)) (x_start, y_start, x_end, y_end)
+    :param x0:
+    :param y0:
+    :param x1:
+    :param y1: (float) the region.
+
+    :returns: (bool) True if a part of the segment is in the region, the 
+    segment is clipped to each side of the region (Liang-Barsky).
+    """
+    xa, ya, xb, yb = segment
+    dx, dy = xb - xa, yb - ya
+    t_in, t_out = 0.0, 1.0
+    for p, q in ((-dx, xa - x0), (dx, x1 - xa), (-dy, ya - y0), (dy, y1 - ya)):
+        if p == 0:
+            # parallel to this side, and outside of it
+            if q < 0:
+                return False
+        elif p < 0:
+            t_in = max(t_in, q / p)
+        else:
+            t_out = min(t_out, q / p)
+        if t_in > t_out:
+            return False
+    return True
@@ -0,0 +1,478 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   storage.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   compact storage of the verticies and edges in typed arrays, for the
+#   large graphs. The VertexView and EdgeView classes have the same
+#   interface as Vertex and Edge but only hold an index in the storage.
+
+from array import array
+from math import isnan
+
+# canvas ids are stored as ints, NO_ID stands for None
+NO_ID = -1
+# end of the linked lists of edges
+NO_EDGE = -1
+
+class Palette(object):
+    """
+    Palette class
+
+    The colors are few compared to the items, each distinct color is
+    stored once and the columns only keep its index, the index 0 being
+    None (no color).
+    """
+    def __init__(self):
+        self.colors = [None]
+        self._index = {None : 0}
+
+    def index(self, color):
+        """
+        :param color: (hex)
+
+        :returns: (int) index of the color, added to the palette if needed.
+        """
+        i = self._index.get(color)
+        if i is None:
+            i = len(self.colors)
+            self.colors.append(color)
+            self._index[color] = i
+        return i
+
+    def __getitem__(self, i):
+        return self.colors[i]
+
+# -----------------------------------------------------------------------------
+
+class VertexStore(object):
+    """
+    VertexStore class
+
+    The verticies as columns, the vertex i is made of :
+    - coords[4*i:4*i+n_coords[i]]
+    - labels[i]
+    - palette[colors[i]]
+    - oval_ids[i], text_ids[i]
+    - first_out[i], first_in[i] the heads of its lists of edges in the 
+      EdgeStore
+
+    The store is used as the sequence of verticies of a compact graph, 
+    iterating over it gives VertexView instances. Deleted verticies are 
+    only marked as dead, their index is never reused so the views stay 
+    valid.
+    """
+    def __init__(self):
+        self.coords = array('d')
+        self.n_coords = array('b')
+        self.labels = []
+        self.colors = array('i')
+        self.oval_ids = array('i')
+        self.text_ids = array('i')
+        self.first_out = array('i')
+        self.first_in = array('i')
+        self.alive = array('b')
+        self.n_alive = 0
+        self.palette = Palette()
+
+    def append(self, vertex):
+        """
+        :param vertex: (Vertex) vertex to copy in the storage.
+
+        :returns: (VertexView) view on the stored vertex.
+        """
+        coords = list(vertex.get_coords())
+        self.n_coords.append(len(coords))
+        self.coords.extend(coords + [0] * (4 - len(coords)))
+        self.labels.append(vertex.get_label())
+        self.colors.append(self.palette.index(vertex.get_color()))
+        self.oval_ids.append(_to_id(vertex.get_oval()))
+        self.text_ids.append(_to_id(vertex.get_text()))
+        self.first_out.append(NO_EDGE)
+        self.first_in.append(NO_EDGE)
+        self.alive.append(1)
+        self.n_alive += 1
+
+        return VertexView(self, len(self.alive) - 1)
+
+    def remove(self, vertex):
+        """
+        :param vertex: (VertexView) 
+        """
+        self.alive[vertex._index] = 0
+        self.labels[vertex._index] = None
+        self.n_alive -= 1
+
+    def drawn(self):
+        """
+        :returns: (generator(VertexView)) the verticies with canvas ids.
+        """
+        for i in range(len(self.alive)):
+            if self.alive[i] and (self.oval_ids[i] != NO_ID or self.text_ids[i] != NO_ID):
+                yield VertexView(self, i)
+
+    def view(self, i):
+        """
+        :param i: (int) index of the vertex.
+
+        :returns: (VertexView)
+        """
+        return VertexView(self, i)
+
+    def __iter__(self):
+        alive = self.alive
+        for i in range(len(alive)):
+            if alive[i]:
+                yield VertexView(self, i)
+
+    def __len__(self):
+        return self.n_alive
+
+# -----------------------------------------------------------------------------
+
+class EdgeStore(object):
+    """
+    EdgeStore class
+
+    The edges as columns, the edge i is made of :
+    - starts[i], ends[i] the indexes of its verticies in the VertexStore
+    - weights[i], nan when the edge has no weight
+    - palette[colors[i]]
+    - line_ids[i], weight_ids[i]
+    - next_out[i], next_in[i] the next edges in the lists of edges of its
+      start and end verticies.
+
+    The lists of edges of the verticies are linked lists in arrays, adding
+    an edge is O(1) and a deleted edge is marked as dead and skipped.
+    """
+    def __init__(self, vertex_store):
+        """
+        :param vertex_store: (VertexStore) storage of the verticies.
+        """
+        self.vertex_store = vertex_store
+        self.starts = array('i')
+        self.ends = array('i')
+        self.weights = array('d')
+        self.colors = array('i')
+        self.line_ids = array('i')
+        self.weight_ids = array('i')
+        self.next_out = array('i')
+        self.next_in = array('i')
+        self.alive = array('b')
+        self.n_alive = 0
+        self.palette = vertex_store.palette
+
+    def append(self, edge):
+        """
+        :param edge: (Edge) edge to copy, its verticies must be VertexView
+        of the same storage.
+
+        :returns: (EdgeView) view on the stored edge.
+        """
+        i = len(self.alive)
+        start = edge.get_vx_start()._index
+        end = edge.get_vx_end()._index
+        weight = edge.get_weight()
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self.weights.append(float('nan') if weight is None else weight)
+        self.colors.append(self.palette.index(edge.get_color()))
+        self.line_ids.append(_to_id(edge.get_line_id()))
+        self.weight_ids.append(_to_id(edge.get_weight_id()))
+        self.alive.append(1)
+        self.n_alive += 1
+
+        # linking the edge at the head of the lists of its verticies
+        self.next_out.append(self.vertex_store.first_out[start])
+        self.vertex_store.first_out[start] = i
+        self.next_in.append(self.vertex_store.first_in[end])
+        self.vertex_store.first_in[end] = i
+
+        return EdgeView(self, i)
+
+    def remove(self, edge):
+        """
+        :param edge: (EdgeView)
+        """
+        if self.alive[edge._index]:
+            self.alive[edge._index] = 0
+            self.n_alive -= 1
+
+    def out_edges(self, vx_index):
+        """
+        :param vx_index: (int) index of a vertex.
+
+        :returns: (generator(int)) indexes of the edges starting from it.
+        """
+        i = self.vertex_store.first_out[vx_index]
+        while i != NO_EDGE:
+            if self.alive[i]:
+                yield i
+            i = self.next_out[i]
+
+    def in_edges(self, vx_index):
+        """
+        :param vx_index: (int) index of a vertex.
+
+        :returns: (generator(int)) indexes of the edges ending at it.
+        """
+        i = self.vertex_store.first_in[vx_index]
+        while i != NO_EDGE:
+            if self.alive[i]:
+                yield i
+            i = self.next_in[i]
+
+    def incident_edges(self, vx_index):
+        """
+        :param vx_index: (int) index of a vertex.
+
+        :returns: (generator(EdgeView)) the edges starting or ending at it, 
+        a loop is given once.
+        """
+        for i in self.out_edges(vx_index):
+            yield EdgeView(self, i)
+        for i in self.in_edges(vx_index):
+            if self.starts[i] != vx_index:
+                yield EdgeView(self, i)
+
+    def drawn(self):
+        """
+        :returns: (generator(EdgeView)) the edges with canvas ids.
+        """
+        for i in range(len(self.alive)):
+            if self.alive[i] and (self.line_ids[i] != NO_ID or self.weight_ids[i] != NO_ID):
+                yield EdgeView(self, i)
+
+    def view(self, i):
+        """
+        :param i: (int) index of the edge.
+
+        :returns: (EdgeView)
+        """
+        return EdgeView(self, i)
+
+    def __iter__(self):
+        alive = self.alive
+        for i in range(len(alive)):
+            if alive[i]:
+                yield EdgeView(self, i)
+
+    def __len__(self):
+        return self.n_alive
+
+# -----------------------------------------------------------------------------
+
+class CompactAdjacency(object):
+    """
+    CompactAdjacency class
+
+    The adjacency list of a compact graph, it has the same shape as the 
+    adjacency list of Graph ({vertex : {edge : (neighbour, weight)}}) 
+    but the dict of a vertex is built from the EdgeStore when accessed,
+    in O(degree).
+    """
+    def __init__(self, edge_store, directed):
+        """
+        :param edge_store: (EdgeStore)
+        :param directed: (bool)
+        """
+        self.edge_store = edge_store
+        self.directed = directed
+
+    def __getitem__(self, vertex):
+        store = self.edge_store
+        vertex_store = store.vertex_store
+        neighbours = {}
+        for i in store.out_edges(vertex._index):
+            edge = EdgeView(store, i)
+            neighbours[edge] = (VertexView(vertex_store, store.ends[i]), 
+                                edge.get_weight())
+        if not self.directed:
+            for i in store.in_edges(vertex._index):
+                edge = EdgeView(store, i)
+                neighbours[edge] = (VertexView(vertex_store, store.starts[i]), 
+                                    edge.get_weight())
+        return neighbours
+
+    def get(self, vertex, default=None):
+        if vertex._store is not self.edge_store.vertex_store \
+                or not vertex._store.alive[vertex._index]:
+            return default
+        return self[vertex]
+
+    def __contains__(self, vertex):
+        return self.get(vertex) is not None
+
+    def __iter__(self):
+        return iter(self.edge_store.vertex_store)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for vertex in self:
+            yield vertex, self[vertex]
+
+    def __len__(self):
+        return len(self.edge_store.vertex_store)
+
+# -----------------------------------------------------------------------------
+
+def _to_id(item_id):
+    """
+    :param item_id: (int) canvas id or None.
+
+    :returns: (int) the id to store.
+    """
+    return NO_ID if item_id is None else item_id
+
+def _from_id(item_id):
+    """
+    :param item_id: (int) stored canvas id.
+
+    :returns: (int) the canvas id or None.
+    """
+    return None if item_id == NO_ID else item_id
+
+# -----------------------------------------------------------------------------
+
+class VertexView(object):
+    """
+    VertexView class
+
+    Same interface as Vertex, the data lives in a VertexStore. Views are 
+    created on demand, two views of the same vertex are equal.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        """
+        :param store: (VertexStore)
+        :param index: (int) index of the vertex in the store.
+        """
+        self._store = store
+        self._index = index
+
+    def __eq__(self, other):
+        return isinstance(other, VertexView) and other._index == self._index \
+               and other._store is self._store
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+    def get_oval(self):
+        return _from_id(self._store.oval_ids[self._index])
+
+    def get_text(self):
+        return _from_id(self._store.text_ids[self._index])
+
+    def get_label(self):
+        return self._store.labels[self._index]
+
+    def get_coords(self):
+        start = 4 * self._index
+        return self._store.coords[start:start + self._store.n_coords[self._index]].tolist()
+
+    def get_color(self):
+        return self._store.palette[self._store.colors[self._index]]
+
+    def get_vertex(self):
+        return (self.get_oval(), self.get_text(), self.get_label(), self.get_color())
+
+    def set_label(self, new_label):
+        self._store.labels[self._index] = new_label
+
+    def set_oval_id(self, oval_id):
+        self._store.oval_ids[self._index] = _to_id(oval_id)
+
+    def set_label_id(self, label_id):
+        self._store.text_ids[self._index] = _to_id(label_id)
+
+    def set_coords(self, coords):
+        coords = list(coords)
+        start = 4 * self._index
+        self._store.n_coords[self._index] = len(coords)
+        self._store.coords[start:start + 4] = array('d', coords + [0] * (4 - len(coords)))
+
+    def set_color(self, color):
+        self._store.colors[self._index] = self._store.palette.index(color)
+
+    def __repr__(self):
+        return 'vertex ({}), color : ({})'.format(self.get_label(), self.get_color())
+
+# -----------------------------------------------------------------------------
+
+class EdgeView(object):
+    """
+    EdgeView class
+
+    Same interface as Edge, the data lives in an EdgeStore.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        """
+        :param store: (EdgeStore)
+        :param index: (int) index of the edge in the store.
+        """
+        self._store = store
+        self._index = index
+
+    def __eq__(self, other):
+        return isinstance(other, EdgeView) and other._index == self._index \
+               and other._store is self._store
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+    def get_vx_start(self):
+        return VertexView(self._store.vertex_store, self._store.starts[self._index])
+
+    def get_vx_end(self):
+        return VertexView(self._store.vertex_store, self._store.ends[self._index])
+
+    def get_line_id(self):
+        return _from_id(self._store.line_ids[self._index])
+
+    def get_weight_id(self):
+        return _from_id(self._store.weight_ids[self._index])
+
+    def get_weight(self):
+        weight = self._store.weights[self._index]
+        if isnan(weight):
+            return None
+        # weights are integers most of the time
+        if weight.is_integer():
+            return int(weight)
+        return weight
+
+    def get_color(self):
+        return self._store.palette[self._store.colors[self._index]]
+
+    def get_edge(self):
+        return (self.get_vx_start(), self.get_vx_end(), self.get_line_id())
+
+    def set_line_id(self, line_id):
+        self._store.line_ids[self._index] = _to_id(line_id)
+
+    def set_weight_id(self, weight_id):
+        self._store.weight_ids[self._index] = _to_id(weight_id)
+
+    def set_color(self, color):
+        self._store.colors[self._index] = self._store.palette.index(color)
+
+    def __repr__(self):
+        return 'edge ({},{}), weight : {}, color : {}'.format(self.get_vx_start(),
+                                                            self.get_vx_end(),
+                                                            self.get_weight(),
+                                                            self.get_color())
@@ -0,0 +1,269 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   force_directed.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   force directed layout of a graph (Fruchterman-Reingold), the edges
+#   pull their verticies together and all the verticies push each other
+#   away.
+#
+#   The repulsion between all the pairs of verticies is approximated with
+#   a Barnes-Hut quadtree : a group of verticies far enough from a vertex
+#   acts as a single vertex at its center of mass, so an iteration is in
+#   O(n log n). The quadtree is built from the Morton codes of the
+#   verticies, one level at a time, and is traversed for all the verticies
+#   together with numpy.
+#
+#   numpy is needed for the layout, it is an optional dependency of
+#   graphix.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..graph.geometry import vertex_center, vertex_bbox
+from ..utils.instrument import timed
+
+# ideal length of an edge on the canvas.
+EDGE_LENGTH = 60
+# margin between the border of the canvas and the verticies.
+MARGIN = 50
+# the deepest level of the quadtree.
+MAX_DEPTH = 16
+
+@timed
+def force_directed(graph, iterations=100, theta=0.8, tol=0.01, seed=0):
+    """
+    :param graph: (Graph)
+    :param iterations: (int) maximum number of iterations.
+    :param theta: (float) a cell of the quadtree acts as one vertex when
+    its size is less than theta times its distance to the vertex, 0 to
+    compute all the pairs exactly.
+    :param tol: (float) the layout has converged when no vertex moves by
+    more than tol times the length of an edge.
+    :param seed: (int) seed of the small random moves which separate the
+    verticies at the same place.
+
+    :returns: (int) number of iterations done.
+
+    compute a new position for every vertex, starting from the current
+    ones, and save it in the graph. The graph must be redrawn after.
+    """
+    if np is None:
+        raise ImportError('numpy is needed for the force directed layout')
+
+    csr = graph.get_csr()
+    n = len(csr)
+    if n == 0:
+        return 0
+
+    positions = np.array([vertex_center(vertex) for vertex in csr.verticies],
+                         dtype=np.float64)
+
+    rows = np.repeat(np.arange(n), np.diff(np.asarray(csr.indptr)))
+    columns = np.asarray(csr.indices)
+    # an undirected edge is in both rows of the CSR, a directed edge only
+    # in the row of its start, the force on its end is added separately.
+    keep = rows != columns
+    rows, columns = rows[keep], columns[keep]
+
+    positions, done = fruchterman_reingold(positions, rows, columns,
+                                           both_ends=csr.directed,
+                                           iterations=iterations,
+                                           theta=theta, tol=tol,
+                                           rng=np.random.default_rng(seed))
+
+    set_positions(graph, csr.verticies, positions)
+    return done
+
+def set_positions(graph, verticies, positions):
+    """
+    :param graph: (Graph)
+    :param verticies: (list(Vertex))
+    :param positions: (numpy.ndarray) n x 2 centers of the verticies.
+
+    save the positions in the graph, moved so the layout starts at the
+    top left of the canvas.
+    """
+    positions = positions - positions.min(axis=0) + MARGIN
+    for vertex, (x, y) in zip(verticies, positions.tolist()):
+        graph.update_vx_coords(vertex, list(vertex_bbox(x, y)))
+
+def fruchterman_reingold(positions, rows, columns, both_ends=False,
+                         iterations=100, theta=0.8, tol=0.01, rng=None):
+    """
+    :param positions: (numpy.ndarray) n x 2 start positions.
+    :param rows: (numpy.ndarray) first vertex of each edge.
+    :param columns: (numpy.ndarray) second vertex of each edge.
+    :param both_ends: (bool) if False the attraction is only applied to
+    the first vertex of each edge, (i, j) and (j, i) are both given.
+    :param iterations: (int) maximum number of iterations.
+    :param theta: (float) Barnes-Hut criterion.
+    :param tol: (float) convergence threshold, in edge lengths.
+    :param rng: (numpy.random.Generator)
+
+    :returns: (Tuple(numpy.ndarray, int)) the positions and the number of
+    iterations done.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = len(positions)
+    k = EDGE_LENGTH
+    positions = positions.copy()
+
+    # the verticies at the same place would never separate, they are
+    # moved a little, or spread on a square if they are all at the same
+    # place.
+    distinct = len(np.unique(positions, axis=0))
+    if distinct < n:
+        scale = k * np.sqrt(n) if distinct == 1 else k / 10
+        positions += rng.uniform(-scale, scale, positions.shape)
+
+    # the temperature is the maximum move of a vertex, it cools down
+    # linearly
+    start_temperature = k * max(1.0, np.sqrt(n)) / 10
+    done = 0
+    for done in range(1, iterations + 1):
+        forces = barnes_hut(positions, k * k, theta)
+
+        delta = positions[rows] - positions[columns]
+        distance = np.sqrt((delta * delta).sum(axis=1))[:, None]
+        attraction = delta * distance / k
+        forces -= _sum_by(rows, attraction, n)
+        if both_ends:
+            forces += _sum_by(columns, attraction, n)
+
+        temperature = start_temperature * (1 - (done - 1) / iterations)
+        length = np.sqrt((forces * forces).sum(axis=1))[:, None]
+        moves = forces / np.maximum(length, 1e-12) * np.minimum(length, temperature)
+        positions += moves
+
+        if np.abs(moves).max() < tol * k:
+            break
+
+    return positions, done
+
+def barnes_hut(positions, strength, theta):
+    """
+    :param positions: (numpy.ndarray) n x 2 positions.
+    :param strength: (float) the repulsion between two verticies at the
+    distance d is strength / d.
+    :param theta: (float) Barnes-Hut criterion.
+
+    :returns: (numpy.ndarray) n x 2 repulsion on each vertex.
+    """
+    n = len(positions)
+    levels = _quadtree(positions)
+    forces = np.zeros_like(positions)
+
+    # the (vertex, cell) pairs to look at, first each vertex with the root
+    vertex = np.arange(n)
+    cell = np.zeros(n, dtype=np.int64)
+    for depth, (inverse, mass, center, size, child_start, child_end) in enumerate(levels):
+        leaf = depth == len(levels) - 1
+
+        # the vertex itself does not count in the cell it belongs to
+        inside = inverse[vertex] == cell
+        m = mass[cell] - inside
+        c = center[cell]
+        c = np.where(inside[:, None],
+                     (c * mass[cell][:, None] - positions[vertex]) / np.maximum(m, 1)[:, None],
+                     c)
+
+        delta = positions[vertex] - c
+        distance2 = np.maximum((delta * delta).sum(axis=1), 1e-9)
+        far = size * size < theta * theta * distance2
+        accept = (m > 0) & (leaf | (far & ~inside))
+
+        contribution = delta[accept] * (m[accept] * strength / distance2[accept])[:, None]
+        forces += _sum_by(vertex[accept], contribution, n)
+
+        if leaf:
+            break
+
+        # the other pairs go down to the children of the cell
+        expand = (m > 0) & ~accept
+        vertex, cell = vertex[expand], cell[expand]
+        counts = child_end[cell] - child_start[cell]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        vertex = np.repeat(vertex, counts)
+        cell = np.repeat(child_start[cell], counts) + offsets
+
+    return forces
+
+# -----------------------------------------------------------------------------
+
+def _sum_by(index, values, n):
+    """
+    :param index: (numpy.ndarray) vertex of each value.
+    :param values: (numpy.ndarray) m x 2 values.
+    :param n: (int) number of verticies.
+
+    :returns: (numpy.ndarray) n x 2 sums of the values of each vertex.
+    """
+    return np.stack((np.bincount(index, values[:, 0], minlength=n),
+                     np.bincount(index, values[:, 1], minlength=n)), axis=1)
+
+def _spread(v):
+    """
+    :param v: (numpy.ndarray) uint64 integers of 16 bits.
+
+    :returns: (numpy.ndarray) the bits of v with a 0 between each of them.
+    """
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+def _quadtree(positions):
+    """
+    :param positions: (numpy.ndarray) n x 2 positions.
+
+    :returns: (list(tuple)) for each level from the root, the cell of each
+    vertex, the mass, center of mass and size of each cell, and the range
+    of the children of each cell in the next level.
+
+    the cells of a level are the distinct prefixes of the Morton codes of
+    the verticies, sorted, so the children of a cell are contiguous in
+    the next level.
+    """
+    n = len(positions)
+    depth = int(min(MAX_DEPTH, max(1, np.ceil(np.log2(max(n, 2)) / 2) + 2)))
+
+    low = positions.min(axis=0)
+    size = max(float((positions.max(axis=0) - low).max()), 1e-9)
+    grid = np.minimum((positions - low) / size * (1 << depth), (1 << depth) - 1)
+    grid = grid.astype(np.uint64)
+    codes = _spread(grid[:, 0]) | (_spread(grid[:, 1]) << np.uint64(1))
+
+    levels = []
+    for level in range(depth + 1):
+        prefix = codes >> np.uint64(2 * (depth - level))
+        cells, inverse = np.unique(prefix, return_inverse=True)
+        mass = np.bincount(inverse, minlength=len(cells)).astype(np.float64)
+        center = _sum_by(inverse, positions, len(cells)) / mass[:, None]
+        levels.append([cells, inverse, mass, center, size / (1 << level)])
+
+    for level in range(depth + 1):
+        cells = levels[level].pop(0)
+        if level < depth:
+            parents = levels[level + 1][0] >> np.uint64(2)
+            child_start = np.searchsorted(parents, cells, 'left')
+            child_end = np.searchsorted(parents, cells, 'right')
+        else:
+            child_start = child_end = np.zeros(len(cells), dtype=np.int64)
+        levels[level] += [child_start, child_end]
+
+    return [tuple(level) for level in levels]
@@ -0,0 +1,174 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   spectral.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   spectral layout of a graph, the coords of the verticies are the
+#   eigenvectors of the laplacian matrix with the smallest non zero
+#   eigenvalues.
+#
+#   The small graphs use the dense eigen decomposition of numpy, the
+#   large ones the LOBPCG algorithm, which only needs products of the
+#   sparse laplacian with a block of vectors. The block has more vectors
+#   than the eigenvectors looked for, so the equal eigenvalues of the
+#   symmetric graphs (grids, tori...) are all found.
+#
+#   numpy is needed for the layout, it is an optional dependency of
+#   graphix.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..graph.matrices import sparse_laplacian
+from .force_directed import EDGE_LENGTH, set_positions
+from ..utils.instrument import timed
+
+# up to this number of verticies the dense eigen decomposition is used.
+DENSE_LIMIT = 1000
+# number of vectors of the block in addition to the eigenvectors, the
+# maximum number of iterations of LOBPCG and the tolerance on the
+# residuals, relative to the largest eigenvalue.
+EXTRA = 4
+ITERATIONS = 500
+TOLERANCE = 1e-6
+
+@timed
+def spectral(graph, seed=0):
+    """
+    :param graph: (Graph) a directed graph is taken as undirected.
+    :param seed: (int) seed of the start vectors of LOBPCG.
+
+    compute a new position for every vertex and save it in the graph. The
+    graph must be redrawn after.
+
+    The verticies of a connected component are placed together, but the
+    different components of a graph which is not connected end up on top
+    of each other.
+    """
+    if np is None:
+        raise ImportError('numpy is needed for the spectral layout')
+
+    verticies = graph.get_csr().verticies
+    n = len(verticies)
+    if n == 0:
+        return
+    if n < 3:
+        set_positions(graph, verticies,
+                      np.array([[i * EDGE_LENGTH, 0.] for i in range(n)]))
+        return
+
+    laplacian, degrees = sparse_laplacian(graph, weighted=True)
+    if n <= DENSE_LIMIT:
+        _, vectors = np.linalg.eigh(laplacian.toarray())
+        positions = vectors[:, 1:3]
+    else:
+        positions = smallest_eigenvectors(laplacian, degrees, 2,
+                                          np.random.default_rng(seed))
+
+    # the eigenvectors have a norm of 1, the layout is scaled so its
+    # average edge length is about EDGE_LENGTH
+    positions = positions / np.abs(positions).max(axis=0).clip(1e-12)
+    positions *= EDGE_LENGTH * np.sqrt(n) / 2
+    set_positions(graph, verticies, positions)
+
+def smallest_eigenvectors(laplacian, degrees, k, rng, extra=EXTRA,
+                          iterations=ITERATIONS, tol=TOLERANCE):
+    """
+    :param laplacian: (SparseMatrix) laplacian matrix.
+    :param degrees: (numpy.ndarray) degree of each vertex.
+    :param k: (int) number of eigenvectors.
+    :param rng: (numpy.random.Generator)
+    :param extra: (int) number of vectors of the block in addition to the
+    k eigenvectors.
+    :param iterations: (int) maximum number of iterations.
+    :param tol: (float) an eigenvector has converged when its residual is
+    less than tol times the largest eigenvalue.
+
+    :returns: (numpy.ndarray) n x k eigenvectors with the smallest
+    eigenvalues, the constant eigenvector (eigenvalue 0) excluded.
+
+    LOBPCG algorithm (locally optimal block preconditioned conjugate
+    gradient) : at each iteration the block is replaced by the best
+    vectors of the space spanned by the block, its residuals divided by
+    the degrees and the previous directions. Each iteration costs the
+    products of the laplacian with one block of vectors. The vectors are
+    kept orthogonal to the constant vector.
+    """
+    n = laplacian.shape[0]
+    m = min(k + extra, n - 1)
+    ones = np.full(n, 1 / np.sqrt(n))
+    # the eigenvalues are between 0 and twice the maximum degree
+    scale = 2 * degrees.max()
+    preconditioner = 1 / np.clip(degrees, 1e-12, None)[:, None]
+
+    def deflate(block):
+        return block - np.outer(ones, ones @ block)
+
+    def product(block):
+        return np.column_stack([laplacian.dot(column) for column in block.T])
+
+    x, _ = np.linalg.qr(deflate(rng.standard_normal((n, m))))
+    ax = product(x)
+    values, vectors = np.linalg.eigh(x.T @ ax)
+    x, ax = x @ vectors, ax @ vectors
+    p = ap = None
+
+    for _ in range(iterations):
+        residuals = ax - x * values
+        norms = np.linalg.norm(residuals[:, :k], axis=0)
+        if np.all(norms <= tol * scale):
+            break
+
+        w = deflate(residuals * preconditioner)
+        w -= x @ (x.T @ w)
+        # the residuals get tiny, a unit norm keeps them apart from the
+        # dependent directions
+        w /= np.linalg.norm(w, axis=0).clip(1e-300)
+        aw = product(w)
+
+        if p is None:
+            s, a_s = np.hstack((x, w)), np.hstack((ax, aw))
+        else:
+            s, a_s = np.hstack((x, w, p)), np.hstack((ax, aw, ap))
+
+        # orthonormal basis of the space, the directions which are almost
+        # dependent on the others are dropped. A second pass corrects the
+        # rounding errors of the first one.
+        c = _orthonormalize(s.T @ s, drop=True)
+        c = c @ _orthonormalize(c.T @ (s.T @ s) @ c)
+
+        values, vectors = np.linalg.eigh(c.T @ (s.T @ a_s) @ c)
+        values, vectors = values[:m], c @ vectors[:, :m]
+        # the new directions, the part of the new block out of the old one
+        p, ap = s[:, m:] @ vectors[m:], a_s[:, m:] @ vectors[m:]
+        norms = np.linalg.norm(p, axis=0).clip(1e-300)
+        p, ap = p / norms, ap / norms
+        x, ax = s @ vectors, a_s @ vectors
+
+    return x[:, :k]
+
+def _orthonormalize(gram, drop=False):
+    """
+    :param gram: (numpy.ndarray) the scalar products of a set of vectors.
+    :param drop: (bool) if True the vectors almost dependent on the others
+    are dropped.
+
+    :returns: (numpy.ndarray) the combinations of the vectors which are an
+    orthonormal basis of the space they span.
+    """
+    values, vectors = np.linalg.eigh(gram)
+    if drop:
+        independent = values > 1e-10 * values.max()
+        values, vectors = values[independent], vectors[:, independent]
+    return vectors / np.sqrt(values)
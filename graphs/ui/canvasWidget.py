@@ -8,7 +8,7 @@
 #
 #   canvasWidget.py
 # 
-#   last update 16/04/22
+#   last update 18/10/26
 #
 #   laurent vouriot
 #
@@ -17,20 +17,32 @@
 import tkinter as tk
 
 class CanvasWidget(tk.Canvas):
+    """
+    CanvasWidget class
 
+    canvas wrapper that knows the items making up the verticies and
+    edges of the graph.
+    """
     def __init__(self, window):
-        tk.Canvas.__init__(self, window)
-        self._vx_items = []
-        self._edge_items = []
+        # the view is not confined, the graph can be anywhere on the plane
+        tk.Canvas.__init__(self, window, confine=False)
 
-    def add_vx_items(self, vx_items):
-        self._vx_items.append(vx_items)
-    
-    def add_edge_items(self, edge_items):
-        self._edge_items.append(edge_items)
-    
-    def delete_item(self, item_id):
-        for items in self._vx_items + self._edge_items:
-            if item_id in items: 
-                for item in items:
-                    self.delete(item)
+    def delete_vx_items(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        delete the circle and the label of the vertex.
+        """
+        for item in (vertex.get_oval(), vertex.get_text()):
+            if item is not None:
+                self.delete(item)
+
+    def delete_edge_items(self, edge):
+        """
+        :param edge: (Edge)
+
+        delete the line (or loop) and the weight of the edge.
+        """
+        for item in (edge.get_line_id(), edge.get_weight_id()):
+            if item is not None:
+                self.delete(item)
@@ -8,19 +8,19 @@
 #
 #   items.py
 # 
-#   last update 30/07/22
+#   last update 18/10/26
 #
 #   laurent vouriot
 #
 #   the differents items (vertex, edge...) that can be drawn on the canvas
 
-from tkinter import simpledialog
-
-from math import isclose
-
-from ui.canvasWidget import *
-from graph.graph import *
-from utils.graph_exc import *  
+from .canvasWidget import *
+from ..graph.graph import *
+from ..graph.geometry import *
+from ..utils.graph_exc import *  
+from ..algorithms.traversal import bfs, dfs
+from ..algorithms.shortest_path import shortest_path
+from ..utils.instrument import timed
 
 class BaseItem(object):
     """
@@ -37,9 +37,12 @@ class BaseItem(object):
         """
         self.canvas = canvas
         self.selected_items = None
+        self.selected_vx = None
+        self.selected_edge = None
         self.graph = graph
         self.text_log = text_log
 
+    @timed
     def __call__(self, event):
         """
         :param event: (tk.event) 
@@ -49,38 +52,25 @@ class BaseItem(object):
         method helps us to use the item instance as function and do some work on 
         the canvas.
         """
-        # there can be multiple items selected when clicked as they can overlap
-        # (e.g  a vertex on the canvas is an oval and a text item)
-        # so selected_items is a tuple containing one or more items ids.
-        self.selected_items = self.canvas.find_overlapping(event.x-10, event.y-10,
-                                                           event.x+10, event.y+10)
-
-    def is_vertex(self, item_ids):
-        """
-        :param item_ids: (Tuple(int)) 
-
-        when we clic on an item (or a superposition of items) we will need to
-        check wether its is an edge or a vertex in the graph point of view. 
-        """
-
-        # as a drawn vertex on the canvas is an oval and a text item 
-        # and sometimes edges, we just check if one of the selected 
-        # item is indeed the oval, no need to verify the other items. 
-        for vx in self.graph.get_verticies():
-            if vx.get_oval() in item_ids:
-                return True
-        return False
-
-    def is_edge(self, item_ids):
-        """
-        :param items_ids: (Tuple(int))
-
-        edge analogous of is_vertex().
-        """
-        for edge in self.graph.get_edges():
-            if edge.get_edge()[2] in item_ids:
-                return True
-        return False
+        # the view of the canvas can be moved, the event coords are 
+        # converted to canvas coords.
+        self.x = self.canvas.canvasx(event.x)
+        self.y = self.canvas.canvasy(event.y)
+
+        # the clicked vertex or edge is found with the spatial index of the
+        # graph, the verticies are above the edges.
+        self.selected_vx, self.selected_edge = self.graph.find_item_at(self.x, self.y)
+
+        # the canvas items of the selection, a vertex on the canvas is an
+        # oval and a text item and comes with the lines of its edges.
+        items = []
+        if self.selected_vx is not None:
+            items = [self.selected_vx.get_oval(), self.selected_vx.get_text()]
+            items += [edge.get_line_id() for edge in 
+                      self.graph.get_incident_edges(self.selected_vx)]
+        elif self.selected_edge is not None:
+            items = [self.selected_edge.get_line_id()]
+        self.selected_items = tuple(item for item in items if item is not None)
 
 # -----------------------------------------------------------------------------
 
@@ -88,71 +78,97 @@ class Select(BaseItem):
     """
     Select class. 
 
-    Item to move the verticies on the canvas. 
+    Item to move the verticies on the canvas, a moved vertex takes its 
+    edges, loops and weights with it.
     """
+    def __init__(self, canvas, text_log, graph):
+        """
+        Constructor.
+        """
+        BaseItem.__init__(self, canvas, text_log, graph)
+        self.target = None
+        self._pending = None
+
+    @timed
     def __call__(self, event):
+        """
+        :param event: (tk.Event)
+
+        select the vertex under the mouse and follow the mouse until the 
+        button is released.
+        """
         BaseItem.__call__(self, event)
 
-        self.text_log.log(coords=(event.x, event.y))
+        self.text_log.log(coords=(self.x, self.y))
         self.canvas.bind('<Motion>', self.move)
         self.canvas.bind('<ButtonRelease-1>', self.deselect)
         
-    # TODO proper logging doc and comments
+    @timed
     def move(self, event):
-        x, y = event.x, event.y
-        for item in self.selected_items:
-            # move vertex
-            if 'ovals' in self.canvas.gettags(item):
-                self.canvas.coords(item, x-10, y-10, x+10, y+10)
-                self.graph.find_vx_from_id(item).set_coords([x-10, y-10, x+10, y+10])
-            # move vx label
-            elif 'labels' in self.canvas.gettags(item):
-                self.canvas.coords(item, x, y)
-            # move edge
-            elif 'lines' in self.canvas.gettags(item):
-                x_start, y_start, x_end, y_end = self.canvas.coords(item)
-                x_center = (x_end + x_start) / 2
-                y_center = (y_end + y_start) / 2
-                weight = False
-                 
-                # if there is a weight on the edge
-                if 'weights' in self.canvas.gettags(self.canvas.find_closest(x_center, 
-                                                                             y_center)):
-                    weight_label = self.canvas.find_closest(x_center, y_center)
-                    weight = True
-
-                if isclose(x_start, x, abs_tol=50) and isclose(y_start, y, abs_tol=50):
-                    self.canvas.coords(item, x, y, x_end, y_end)
-                    if weight: 
-                        new_x = (x_end + x) / 2
-                        new_y = (y_end + y) / 2
-                        self.canvas.coords(weight_label, new_x, new_y)
-                else: 
-                    self.canvas.coords(item, x_start, y_start, x, y)
-                    if weight:
-                        new_x = (x_start + x) / 2
-                        new_y = (y_start + y) / 2
-                        self.canvas.coords(weight_label, new_x, new_y)
-            
-            # loop case
-            elif 'loops' in self.canvas.gettags(item):
-                self.canvas.coords(item, x-30, y-30, x+5, y+5)
-                 
-                # if there is a weight on the loop 
-                if 'loop_weights' in self.canvas.gettags(
-                                       self.canvas.find_closest(x, y-35)):
+        """
+        :param event: (tk.Event)
+
+        save the position of the mouse, the items are moved when Tk is 
+        idle so a burst of motion events gives a single redraw.
+        """
+        if self.selected_vx is None:
+            return
 
-                    weight_label = self.canvas.find_closest(x, y-35)
-                    self.canvas.coords(weight_label, x, y-35)
+        self.target = (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if self._pending is None:
+            self._pending = self.canvas.after_idle(self.redraw)
 
+    @timed
+    def redraw(self):
+        """
+        move the selected vertex to the last position of the mouse, and
+        its incident edges found with the graph, in O(degree).
+        """
+        self._pending = None
+        if self.selected_vx is None or self.target is None:
+            return
 
+        x, y = self.target
+        vertex = self.selected_vx
+
+        # move vertex and its label
+        self.graph.update_vx_coords(vertex, list(vertex_bbox(x, y)))
+        if vertex.get_oval() is not None:
+            self.canvas.coords(vertex.get_oval(), *vertex_bbox(x, y))
+        if vertex.get_text() is not None:
+            self.canvas.coords(vertex.get_text(), x, y)
+
+        # move the edges, the edges not drawn (culling) are skipped
+        for edge in self.graph.get_incident_edges(vertex):
+            line_id = edge.get_line_id()
+            weight_id = edge.get_weight_id()
+            if line_id is None:
+                continue
+
+            if is_loop(edge):
+                self.canvas.coords(line_id, *loop_bbox(x, y))
+                if weight_id is not None:
+                    self.canvas.coords(weight_id, *loop_weight_position(x, y))
+            else:
+                x_start, y_start, x_end, y_end = edge_segment(edge)
+                self.canvas.coords(line_id, x_start, y_start, x_end, y_end)
+                if weight_id is not None:
+                    self.canvas.coords(weight_id, (x_start + x_end) / 2,
+                                                  (y_start + y_end) / 2)
+
+    @timed
     def deselect(self, event):
         """
         :param event: (tk.Event) 
 
-        deselect an item. 
+        deselect an item, the last position is drawn right away. 
         """
         self.canvas.unbind('<Motion>') 
+        if self._pending is not None:
+            self.canvas.after_cancel(self._pending)
+            self.redraw()
+        self.selected_vx = None
+        self.target = None
 
 # -----------------------------------------------------------------------------
 
@@ -163,6 +179,7 @@ class DrawVertex(BaseItem):
     draws a vertex on the canvas. 
     A canvas vertex is the superposition of a circle item and and a text item.
     """
+    @timed
     def __call__(self, event):
         """
         :param event: (tk.Event)
@@ -176,30 +193,25 @@ class DrawVertex(BaseItem):
         # we create first the oval (i.e a circle) 
         # and then the text label, thus the text item will always be on top
         # of the the circle item.
-        oval_id = self.canvas.create_oval(event.x-r, event.y-r,
-                                          event.x+r, event.y+r, tag='ovals')
+        oval_id = self.canvas.create_oval(self.x-r, self.y-r,
+                                          self.x+r, self.y+r, tag='ovals')
         
         # if the label is not defined by the user we use counter in the Graph 
         # instance, we keep it in a variable to simplify logging
+        from tkinter import simpledialog
         label = simpledialog.askstring("Input", "Label (press cancel for no label)",
                                          parent=self.canvas)
         if label is None or label == '':
             label = str(self.graph.get_and_update_vx_counter())
 
-        label_id = self.canvas.create_text(event.x, event.y, text=label, tag='labels')
-        
-        self.canvas.add_vx_items((oval_id, label_id))
+        label_id = self.canvas.create_text(self.x, self.y, text=label, tag='labels')
 
         # after drawing the vertex on the canvas we need to save it in the
         # datastructure. 
         self.graph.add_vx(Vertex(oval_id, label_id, label, self.canvas.coords(oval_id)))
-        
-        # TODO delte
-        self.graph.generate_adjacency_list() 
-        self.graph.genereate_incidence_matrix()
 
         self.text_log.log(vertex=label)
-        self.text_log.log(coords=(event.x, event.y))
+        self.text_log.log(coords=(self.x, self.y))
         
 # -----------------------------------------------------------------------------
 
@@ -233,6 +245,7 @@ class DrawEdge(BaseItem):
         else:
             self.arrow = ''
 
+    @timed
     def __call__(self, event):
         """
         :param event: (tk.Event)
@@ -244,40 +257,34 @@ class DrawEdge(BaseItem):
 
         # if its the first vertex we select we the save the coords and return 
         # waiting for the second vertex to be selected.
-        if not self.x1 and not self.x2:
-            if self.is_vertex(self.selected_items):
-                # we use selected_items[0] because the id of the circle is 
-                # always the first element in the canvas item list.
-                self.vx1 = self.graph.find_vx_from_id(self.selected_items[0])
-
-                # we select [:2] because canvas.coords returns the coords of 
-                # the rectangle around the item
-                self.x1, self.y1 = self.canvas.coords(self.vx1.get_oval())[:2]
+        if self.vx1 is None:
+            if self.selected_vx is not None:
+                self.vx1 = self.selected_vx
+                self.x1, self.y1 = vertex_center(self.vx1)
 
                 self.text_log.log(selected_vertex=self.vx1.get_label())
             else:
                 raise GraphError('No vertex here', self.text_log) 
             return
         
-        if self.is_vertex(self.selected_items):
-            self.vx2 = self.graph.find_vx_from_id(self.selected_items[0])
+        if self.selected_vx is not None:
+            self.vx2 = self.selected_vx
             
             # loop case 
             if self.vx1 == self.vx2:
                 self.draw_loop()
                 return
 
-            self.x2, self.y2 = self.canvas.coords(self.vx2.get_oval())[:2]
+            self.x2, self.y2 = vertex_center(self.vx2)
             self.text_log.log(selected_vertex=self.vx2.get_label())
         else:
             raise GraphError('No vertex here', self.text_log) 
         
-        # we compute the center of each vertex
-        x_start = self.x1+10
-        y_start = self.y1+10
+        x_start = self.x1
+        y_start = self.y1
 
-        x_end = self.x2+10
-        y_end = self.y2+10
+        x_end = self.x2
+        y_end = self.y2
         
         x_center = (x_end + x_start) / 2
         y_center = (y_end + y_start) / 2
@@ -287,30 +294,25 @@ class DrawEdge(BaseItem):
                                           arrow=self.arrow, tag='lines')
         
 
+        from tkinter import simpledialog
         weight = simpledialog.askinteger("Input", 
                                          "Weight ? (press cancel for no weight)",
                                          parent=self.canvas)
         
-        weight_id = self.canvas.create_text(x_center,
-                                            y_center, 
-                                            text=weight,
-                                            tag='weights')
-        
-
+        # no empty text item when there is no weight
+        weight_id = None
         if weight != None: 
+            weight_id = self.canvas.create_text(x_center,
+                                                y_center, 
+                                                text=weight,
+                                                tag='weights')
             self.graph.set_to_weighted()
 
         self.graph.add_edge(Edge(self.vx1, self.vx2, line_id,
                                  weight=weight, weight_id=weight_id))
 
-        self.canvas.add_edge_items((line_id, weight_id))
-
         self.text_log.log(edge_created=(self.vx1.get_label(), self.vx2.get_label()))
         
-        # TODO delete
-        self.graph.generate_adjacency_list()
-        self.graph.genereate_incidence_matrix()
-        
         # we reset all the coords for the next edge to be drawn. 
         self.x1 = None
         self.x2 = None
@@ -324,25 +326,22 @@ class DrawEdge(BaseItem):
         when we select two times the same vertex to draw an edge, we must draw 
         a loop.
         """
-        line_id = self.canvas.create_oval(self.x1-25, self.y1-25,
-                                          self.x1+15, self.y1+15, tag='loops')
+        line_id = self.canvas.create_oval(*loop_bbox(self.x1, self.y1), 
+                                          tag='loops')
 
+        from tkinter import simpledialog
         weight = simpledialog.askinteger("Input", "Weight ?",
                                          parent=self.canvas)
         
-        weight_id = self.canvas.create_text(self.x1, self.y1-25,
-                                            text=weight, tag='loop_weights')
+        weight_id = None
+        if weight != None:
+            weight_id = self.canvas.create_text(*loop_weight_position(self.x1, self.y1),
+                                                text=weight, tag='loop_weights')
 
         self.graph.add_edge(Edge(self.vx1, self.vx2, line_id, 
                             weight=weight, weight_id=weight_id))
 
-        self.canvas.add_edge_items((line_id, weight_id))
-
         self.text_log.log(loop_created=(self.vx1.get_label(), self.vx2.get_label()))
-        
-        # TODO delete
-        self.graph.generate_adjacency_list()
-        self.graph.genereate_incidence_matrix()
 
         self.x1 = None
         self.x2 = None
@@ -358,21 +357,22 @@ class DeleteItem(BaseItem):
     DeleteItem class
     Removes an item from the canvas and from the graph.
     """
+    @timed
     def __call__(self, event):
         """
         :param event: (tk.Event)
         """
         BaseItem.__call__(self, event)
 
-        for item in self.selected_items:
-            if 'ovals' in self.canvas.gettags(item):
-                self.graph.delete_vx(item)
-            elif 'lines' in self.canvas.gettags(item):
-                self.graph.delete_edge(item)
-            elif 'loops' in self.canvas.gettags(item):
-                self.graph.delete_edge(item)
-
-            self.canvas.delete_item(item)
+        # a deleted vertex takes its incident edges with it, the items 
+        # to delete on the canvas are found from the graph instances.
+        if self.selected_vx is not None:
+            for edge in self.graph.delete_vx(self.selected_vx.get_oval()):
+                self.canvas.delete_edge_items(edge)
+            self.canvas.delete_vx_items(self.selected_vx)
+        elif self.selected_edge is not None:
+            self.graph.delete_edge(self.selected_edge.get_line_id())
+            self.canvas.delete_edge_items(self.selected_edge)
 
 # -----------------------------------------------------------------------------
 
@@ -381,20 +381,109 @@ class ColorItem(BaseItem):
         BaseItem.__init__(self, canvas, text_log, graph)
         self.color = color[1]
         
+    @timed
     def __call__(self, event):
         BaseItem.__call__(self, event)
-        for item in self.selected_items:
-            # return each time so it colors only one item each time
-            if 'ovals' in self.canvas.gettags(item):
-                self.canvas.itemconfigure(item, fill=self.color)
-                self.graph.update_vx_color(item, self.color)
-                return
-            elif 'lines' in self.canvas.gettags(item):
-                self.canvas.itemconfigure(item, fill=self.color)
-                self.graph.update_edge_color(item, self.color)
-                return
-            elif 'loops' in self.canvas.gettags(item):
-                self.canvas.itemconfigure(item, outline=self.color)
-                self.graph.update_edge_color(item, self.color)
-                return
+        # it colors only one item each time
+        if self.selected_vx is not None:
+            self.color_vertex(self.selected_vx)
+        elif self.selected_edge is not None:
+            self.color_edge(self.selected_edge)
+
+    def color_vertex(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        color the vertex on the canvas, if it is drawn, and in the graph.
+        """
+        self.graph.set_vx_color(vertex, self.color)
+        if vertex.get_oval() is not None:
+            self.canvas.itemconfigure(vertex.get_oval(), fill=self.color)
+
+    def color_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        color the edge on the canvas, if it is drawn, and in the graph.
+        """
+        self.graph.set_edge_color(edge, self.color)
+        item = edge.get_line_id()
+        if item is None:
+            return
+        if is_loop(edge):
+            self.canvas.itemconfigure(item, outline=self.color)
+        else:
+            self.canvas.itemconfigure(item, fill=self.color)
+
+# -----------------------------------------------------------------------------
+
+class RunAlgorithm(ColorItem):
+    """
+    RunAlgorithm class
 
+    runs an algorithm from the clicked vertex and colors the verticies and
+    edges of its result. A traversal needs one vertex, a shortest path 
+    needs a second one and is computed with one of the methods of 
+    shortest_path.
+    """
+    TRAVERSALS = {'bfs' : bfs, 'dfs' : dfs}
+
+    def __init__(self, canvas, text_log, graph, color, algorithm):
+        """
+        :param algorithm: (str) 'bfs', 'dfs' or a shortest path method
+        ('dijkstra', 'astar' or 'bidirectional').
+
+        Constructor.
+        """
+        ColorItem.__init__(self, canvas, text_log, graph, color)
+        self.algorithm = algorithm
+        self.source = None
+
+    @timed
+    def __call__(self, event):
+        """
+        :param event: (tk.Event)
+        """
+        BaseItem.__call__(self, event)
+        if self.selected_vx is None:
+            raise GraphError('No vertex here', self.text_log)
+
+        if self.algorithm in self.TRAVERSALS:
+            result = self.TRAVERSALS[self.algorithm](self.graph, self.selected_vx)
+        
+        # the source is saved until the target is selected
+        elif self.source is None:
+            self.source = self.selected_vx
+            self.text_log.log(source=self.source.get_label())
+            return
+        else:
+            source, self.source = self.source, None
+            try:
+                result = shortest_path(self.graph, source, self.selected_vx,
+                                       method=self.algorithm)
+            except ValueError as e:
+                raise GraphError(str(e), self.text_log)
+            if result is None:
+                raise GraphError('No path from {} to {}'.format(
+                                    source.get_label(),
+                                    self.selected_vx.get_label()),
+                                 self.text_log)
+
+        self.highlight(result)
+
+    def highlight(self, result):
+        """
+        :param result: (Result) 
+
+        color the verticies and edges of the result.
+        """
+        for vertex in result.get_verticies():
+            self.color_vertex(vertex)
+        for edge in result.get_edges():
+            self.color_edge(edge)
+
+        self.text_log.log(**{self.algorithm : [vertex.get_label() for vertex in
+                                               result.get_verticies()]})
+        if result.get_cost() is not None:
+            self.text_log.log(cost=result.get_cost(), 
+                              expanded=result.get_expanded())
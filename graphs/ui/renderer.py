@@ -0,0 +1,214 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   renderer.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   draws the Graph instance on the canvas, either entirely or only the
+#   part in the visible area of the canvas.
+
+import tkinter as tk
+
+from ..graph.geometry import *
+
+# margin around the visible area where the items are drawn too, so a
+# short pan does not show empty borders.
+MARGIN = 100
+# above this number of visible verticies the labels and weights are not
+# drawn.
+DETAIL_LIMIT = 400
+
+class Renderer(object):
+    """
+    Renderer class
+
+    Creates the canvas items of the verticies and edges of a graph and
+    gives their ids to the graph.
+
+    With culling the renderer only creates the items of the verticies and
+    edges inside the visible area, and creates or deletes items when the
+    view moves. When too many verticies are visible, the labels and the
+    weights are dropped.
+    """
+    def __init__(self, canvas, graph):
+        """
+        :param canvas: (CanvasWidget)
+        :param graph: (Graph)
+
+        Constructor.
+        """
+        self.canvas = canvas
+        self.graph = graph
+        self.culling = False
+        self.detailed = True
+        self._pending = None
+
+    def set_graph(self, graph):
+        """
+        :param graph: (Graph) the graph to draw from now on.
+        """
+        self.graph = graph
+
+    def arrow(self):
+        """
+        :returns: (str) arrow option of the lines.
+        """
+        return tk.LAST if self.graph.is_directed() else ''
+
+    def draw_vertex(self, vertex, label=True):
+        """
+        :param vertex: (Vertex)
+        :param label: (bool) if False the label is not drawn.
+        """
+        x, y = vertex_center(vertex)
+        oval_id = self.canvas.create_oval(*vertex_bbox(x, y),
+                                          fill=vertex.get_color(),
+                                          tag='ovals')
+        label_id = None
+        if label:
+            label_id = self.canvas.create_text(x, y,
+                                               text=vertex.get_label(),
+                                               tag='labels')
+
+        # we reset the different items id the creation order may be
+        # different, through the graph so its id indexes stay valid.
+        self.graph.set_vx_ids(vertex, oval_id, label_id)
+
+    def draw_edge(self, edge, weight=True, arrow=''):
+        """
+        :param edge: (Edge)
+        :param weight: (bool) if False the weight is not drawn.
+        :param arrow: (str) arrow option of the line.
+        """
+        x_start, y_start, x_end, y_end = edge_segment(edge)
+        weight_id = None
+
+        # if the edge is a loop
+        if is_loop(edge):
+            line_id = self.canvas.create_oval(*loop_bbox(x_start, y_start),
+                                              outline=edge.get_color(),
+                                              tag='loops')
+
+            if weight and edge.get_weight() is not None:
+                weight_id = self.canvas.create_text(
+                                        *loop_weight_position(x_start, y_start),
+                                        text=edge.get_weight(),
+                                        tag='loop_weights')
+
+        # common edge
+        else:
+            line_id = self.canvas.create_line(x_start, y_start,
+                                              x_end, y_end,
+                                              arrow=arrow,
+                                              fill=edge.get_color(),
+                                              tag='lines')
+
+            if weight and edge.get_weight() is not None:
+                weight_id = self.canvas.create_text((x_end + x_start) / 2,
+                                                    (y_end + y_start) / 2,
+                                                    text=edge.get_weight(),
+                                                    tag='weights')
+
+        # when opened the .graph file contains canvas ids of the items from
+        # the previous drawing, but when redrawn, the ids won't be the same
+        # that's why we set them again.
+        self.graph.set_edge_ids(edge, line_id, weight_id)
+
+    def erase_vertex(self, vertex):
+        """
+        :param vertex: (Vertex)
+
+        delete the items of the vertex, it is not drawn anymore.
+        """
+        self.canvas.delete_vx_items(vertex)
+        self.graph.set_vx_ids(vertex, None, None)
+
+    def erase_edge(self, edge):
+        """
+        :param edge: (Edge)
+
+        delete the items of the edge, it is not drawn anymore.
+        """
+        self.canvas.delete_edge_items(edge)
+        self.graph.set_edge_ids(edge, None, None)
+
+    def clear(self):
+        """
+        delete all the items of the canvas.
+        """
+        for vertex in self.graph.drawn_verticies():
+            self.graph.set_vx_ids(vertex, None, None)
+        for edge in self.graph.drawn_edges():
+            self.graph.set_edge_ids(edge, None, None)
+        self.canvas.delete('all')
+        self.detailed = True
+
+    def draw(self):
+        """
+        draw the graph, entirely or only its visible part with culling.
+        """
+        self.clear()
+        if self.culling:
+            self.refresh()
+            return
+
+        arrow = self.arrow()
+        for vertex in self.graph.get_verticies():
+            self.draw_vertex(vertex)
+        for edge in self.graph.get_edges():
+            self.draw_edge(edge, arrow=arrow)
+
+    def schedule_refresh(self):
+        """
+        refresh the visible items when Tk is idle, the events of a pan are
+        coalesced in a single refresh.
+        """
+        if self.culling and self._pending is None:
+            self._pending = self.canvas.after_idle(self.refresh)
+
+    def refresh(self):
+        """
+        create the items of the verticies and edges which entered the visible
+        area and delete the ones which left it.
+        """
+        self._pending = None
+        if not self.culling:
+            return
+
+        x0 = self.canvas.canvasx(0) - MARGIN
+        y0 = self.canvas.canvasy(0) - MARGIN
+        x1 = x0 + self.canvas.winfo_width() + 2 * MARGIN
+        y1 = y0 + self.canvas.winfo_height() + 2 * MARGIN
+
+        verticies = self.graph.find_verticies_in(x0, y0, x1, y1)
+        edges = self.graph.find_edges_in(x0, y0, x1, y1)
+
+        # level of detail, when it changes everything is redrawn
+        detailed = len(verticies) <= DETAIL_LIMIT
+        if detailed != self.detailed:
+            self.clear()
+            self.detailed = detailed
+
+        for vertex in self.graph.drawn_verticies():
+            if vertex not in verticies:
+                self.erase_vertex(vertex)
+        for edge in self.graph.drawn_edges():
+            if edge not in edges:
+                self.erase_edge(edge)
+
+        for vertex in verticies:
+            if vertex.get_oval() is None:
+                self.draw_vertex(vertex, label=detailed)
+
+        arrow = self.arrow()
+        for edge in edges:
+            if edge.get_line_id() is None:
+                self.draw_edge(edge, weight=detailed, arrow=arrow)
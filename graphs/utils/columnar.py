@@ -0,0 +1,289 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   columnar.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   binary columnar .graph format, for the large graphs.
+#
+#   All the values are little endian, every column starts on a multiple
+#   of 8 bytes :
+#
+#   header        magic, version, flags, n verticies, n edges, n colors,
+#                 size of the labels table, size of the colors table
+#   coords        float64 x 4 per vertex
+#   n_coords      int8 per vertex, number of coords used (2 or 4)
+#   vx colors     int32 per vertex, index in the colors table (0 : None)
+#   first_out     int32 per vertex, first edge of its out list (-1 : none)
+#   first_in      int32 per vertex, first edge of its in list
+#   label offsets int64 x (n verticies + 1)
+#   labels        utf-8 string table
+#   starts, ends  int32 per edge, indexes of its verticies
+#   weights       float64 per edge, nan when there is no weight
+#   edge colors   int32 per edge
+#   next_out      int32 per edge, next edge of the out list of its start
+#   next_in       int32 per edge, next edge of the in list of its end
+#   color offsets int64 x (n colors + 1)
+#   colors        utf-8 string table, the color 0 (None) is empty
+#
+#   The columns are the ones of the compact storage (see storage.py) so
+#   a file is loaded with one copy per column, without parsing.
+
+import mmap
+import struct
+import sys
+
+from array import array
+
+from ..graph.graph import Graph
+from ..graph.storage import VertexStore, EdgeStore, NO_ID, NO_EDGE
+from .instrument import timed
+
+MAGIC = b'GRAPHIXB'
+VERSION = 1
+
+DIRECTED = 1
+WEIGHTED = 2
+
+HEADER = struct.Struct('<8sHHIIIQQ')
+
+class ColumnarIO(object):
+    """
+    ColumnarIO class
+
+    read and write the binary columnar .graph format.
+    """
+    def is_columnar(self, filename):
+        """
+        :param filename: (str)
+
+        :returns: (bool) True if the file is in the binary columnar format.
+        """
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    @timed
+    def read(self, filename):
+        """
+        :param filename: (str) binary .graph file.
+
+        :returns: (Graph) the graph, in compact mode.
+
+        The file is mapped in memory and each column is copied at once in
+        the storage of the graph.
+        """
+        with open(filename, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buf = memoryview(mm)
+                try:
+                    return self._read(buf)
+                finally:
+                    buf.release()
+
+    def _read(self, buf):
+        """
+        :param buf: (memoryview) content of the file.
+
+        :returns: (Graph)
+        """
+        (magic, version, flags, n_vx, n_edges,
+         n_colors, labels_size, colors_size) = HEADER.unpack_from(buf, 0)
+
+        if magic != MAGIC:
+            raise ValueError('not a binary .graph file')
+        if version != VERSION:
+            raise ValueError('unsupported binary .graph version {}'.format(version))
+
+        reader = _ColumnReader(buf, HEADER.size)
+        vertex_store = VertexStore()
+        edge_store = EdgeStore(vertex_store)
+
+        vertex_store.coords = reader.column('d', 4 * n_vx)
+        vertex_store.n_coords = reader.column('b', n_vx)
+        vertex_store.colors = reader.column('i', n_vx)
+        vertex_store.first_out = reader.column('i', n_vx)
+        vertex_store.first_in = reader.column('i', n_vx)
+        vertex_store.labels = reader.strings(n_vx, labels_size)
+        vertex_store.oval_ids = array('i', [NO_ID]) * n_vx
+        vertex_store.text_ids = array('i', [NO_ID]) * n_vx
+        vertex_store.alive = array('b', [1]) * n_vx
+        vertex_store.n_alive = n_vx
+
+        edge_store.starts = reader.column('i', n_edges)
+        edge_store.ends = reader.column('i', n_edges)
+        edge_store.weights = reader.column('d', n_edges)
+        edge_store.colors = reader.column('i', n_edges)
+        edge_store.next_out = reader.column('i', n_edges)
+        edge_store.next_in = reader.column('i', n_edges)
+        edge_store.line_ids = array('i', [NO_ID]) * n_edges
+        edge_store.weight_ids = array('i', [NO_ID]) * n_edges
+        edge_store.alive = array('b', [1]) * n_edges
+        edge_store.n_alive = n_edges
+
+        # the color 0 is None
+        for color in reader.strings(n_colors, colors_size)[1:]:
+            vertex_store.palette.index(color)
+
+        return Graph(verticies=vertex_store,
+                     edges=edge_store,
+                     directed=bool(flags & DIRECTED),
+                     weighted=bool(flags & WEIGHTED),
+                     compact=True)
+
+    @timed
+    def write(self, filename, graph):
+        """
+        :param filename: (str) binary .graph file.
+        :param graph: (Graph) the graph to save, compact or not.
+
+        The verticies and edges are renumbered from 0, the deleted ones of
+        a compact graph are dropped.
+        """
+        index_of = {}
+        coords = array('d')
+        n_coords = array('b')
+        vx_colors = array('i')
+        labels = []
+        colors = [None]
+        color_index = {None : 0}
+
+        def color_id(color):
+            i = color_index.get(color)
+            if i is None:
+                i = color_index[color] = len(colors)
+                colors.append(color)
+            return i
+
+        for vertex in graph.get_verticies():
+            index_of[vertex] = len(labels)
+            vx_coords = list(vertex.get_coords())
+            n_coords.append(len(vx_coords))
+            coords.extend(vx_coords + [0] * (4 - len(vx_coords)))
+            vx_colors.append(color_id(vertex.get_color()))
+            labels.append(vertex.get_label())
+
+        n_vx = len(labels)
+        starts = array('i')
+        ends = array('i')
+        weights = array('d')
+        edge_colors = array('i')
+        first_out = array('i', [NO_EDGE]) * n_vx
+        first_in = array('i', [NO_EDGE]) * n_vx
+        next_out = array('i')
+        next_in = array('i')
+
+        for i, edge in enumerate(graph.get_edges()):
+            start = index_of[edge.get_vx_start()]
+            end = index_of[edge.get_vx_end()]
+            weight = edge.get_weight()
+            starts.append(start)
+            ends.append(end)
+            weights.append(float('nan') if weight is None else weight)
+            edge_colors.append(color_id(edge.get_color()))
+
+            # same linked lists as EdgeStore.append
+            next_out.append(first_out[start])
+            first_out[start] = i
+            next_in.append(first_in[end])
+            first_in[end] = i
+
+        label_offsets, label_table = _string_table(labels)
+        color_offsets, color_table = _string_table(colors)
+
+        flags = (DIRECTED if graph.is_directed() else 0) \
+              | (WEIGHTED if graph.is_weighted() else 0)
+
+        with open(filename, 'wb') as f:
+            writer = _ColumnWriter(f)
+            writer.write(HEADER.pack(MAGIC, VERSION, flags, n_vx, len(starts),
+                                     len(colors), len(label_table),
+                                     len(color_table)))
+            for column in (coords, n_coords, vx_colors, first_out, first_in,
+                           label_offsets):
+                writer.column(column)
+            writer.write(label_table)
+            for column in (starts, ends, weights, edge_colors, next_out,
+                           next_in, color_offsets):
+                writer.column(column)
+            writer.write(color_table)
+
+# -----------------------------------------------------------------------------
+
+def _string_table(strings):
+    """
+    :param strings: (list(str)) strings, None is stored as ''.
+
+    :returns: (Tuple(array, bytes)) offsets and utf-8 table.
+    """
+    offsets = array('q', [0])
+    encoded = []
+    size = 0
+    for string in strings:
+        data = b'' if string is None else str(string).encode('utf-8')
+        encoded.append(data)
+        size += len(data)
+        offsets.append(size)
+    return offsets, b''.join(encoded)
+
+def _align(size):
+    """
+    :param size: (int)
+
+    :returns: (int) size rounded up to a multiple of 8.
+    """
+    return (size + 7) & ~7
+
+class _ColumnWriter(object):
+    """
+    write the columns aligned on 8 bytes, little endian.
+    """
+    def __init__(self, f):
+        self.f = f
+        self.pos = 0
+
+    def write(self, data):
+        self.f.write(data)
+        self.pos += len(data)
+        padding = _align(self.pos) - self.pos
+        self.f.write(b'\0' * padding)
+        self.pos += padding
+
+    def column(self, column):
+        if sys.byteorder != 'little':
+            column = array(column.typecode, column)
+            column.byteswap()
+        self.write(column.tobytes())
+
+class _ColumnReader(object):
+    """
+    read the columns written by _ColumnWriter.
+    """
+    def __init__(self, buf, pos):
+        self.buf = buf
+        self.pos = _align(pos)
+
+    def raw(self, size):
+        data = self.buf[self.pos:self.pos + size]
+        self.pos = _align(self.pos + size)
+        return data
+
+    def column(self, typecode, n):
+        column = array(typecode)
+        column.frombytes(self.raw(n * column.itemsize))
+        if sys.byteorder != 'little':
+            column.byteswap()
+        return column
+
+    def strings(self, n, size):
+        offsets = self.column('q', n + 1)
+        table = self.raw(size).tobytes()
+        return [table[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i in range(n)]
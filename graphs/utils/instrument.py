@@ -0,0 +1,152 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   instrument.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   timers and counters of the main operations of graphix.
+#
+#   The instrumentation is enabled by the environment variable
+#   GRAPHIX_PROFILE, read when the modules are imported :
+#
+#       GRAPHIX_PROFILE=1 python3 app.py
+#
+#   When it is not set, timed returns the functions unchanged and count
+#   does nothing, so the instrumentation costs nothing. When it is set,
+#   the calls are aggregated by name (calls, total and maximum time) and
+#   recorded as Chrome trace events, the trace is opened in
+#   chrome://tracing or https://ui.perfetto.dev.
+
+import functools
+import json
+import os
+import threading
+import time
+
+from collections import deque
+
+ENABLED = bool(os.environ.get('GRAPHIX_PROFILE'))
+
+# maximum number of trace events kept, the oldest ones are dropped
+MAX_EVENTS = 100000
+
+# name : [calls, total ns, max ns]
+_stats = {}
+# name : value
+_counters = {}
+# (name, start ns, duration ns, thread id)
+_events = deque(maxlen=MAX_EVENTS)
+_origin = time.perf_counter_ns()
+
+def timed(func):
+    """
+    :param func: (function) function or method to time.
+
+    :returns: (function) func itself when the instrumentation is disabled.
+
+    decorator, the calls of func are timed under its qualified name,
+    Graph.add_vx for a method.
+    """
+    if not ENABLED:
+        return func
+
+    name = func.__qualname__
+    clock = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, start, clock() - start)
+
+    return wrapper
+
+def count(name, n=1):
+    """
+    :param name: (str) counter.
+    :param n: (int) increment.
+    """
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+def stats():
+    """
+    :returns: (list(Tuple)) name, calls, total and maximum time in ms of
+    each timed operation, by decreasing total time.
+    """
+    rows = [(name, calls, total / 1e6, longest / 1e6)
+            for name, (calls, total, longest) in _stats.items()]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+def counters():
+    """
+    :returns: (dict) value of each counter.
+    """
+    return dict(_counters)
+
+def log_stats(text_log):
+    """
+    :param text_log: (Log)
+
+    log the timed operations and the counters.
+    """
+    for name, calls, total, longest in stats():
+        text_log.log(**{name : '{} calls, {:.3f} ms, max {:.3f} ms'.format(
+                                                    calls, total, longest)})
+    for name, value in sorted(_counters.items()):
+        text_log.log(**{name : value})
+
+def dump_trace(filename):
+    """
+    :param filename: (str) .json file.
+
+    write the recorded calls as Chrome trace events, with the counters
+    as metadata.
+    """
+    pid = os.getpid()
+    with open(filename, 'w') as f:
+        json.dump({'traceEvents' : [{'name' : name,
+                                     'ph' : 'X',
+                                     'ts' : (start - _origin) / 1000,
+                                     'dur' : duration / 1000,
+                                     'pid' : pid,
+                                     'tid' : tid}
+                                    for name, start, duration, tid in list(_events)],
+                   'displayTimeUnit' : 'ms',
+                   'otherData' : {'counters' : counters()}}, f)
+
+def reset():
+    """
+    forget the recorded calls and counters.
+    """
+    _stats.clear()
+    _counters.clear()
+    _events.clear()
+
+# -----------------------------------------------------------------------------
+
+def _record(name, start, duration):
+    """
+    :param name: (str)
+    :param start: (int) start of the call in ns.
+    :param duration: (int) duration of the call in ns.
+    """
+    stat = _stats.get(name)
+    if stat is None:
+        _stats[name] = [1, duration, duration]
+    else:
+        stat[0] += 1
+        stat[1] += duration
+        if duration > stat[2]:
+            stat[2] = duration
+    _events.append((name, start, duration, threading.get_ident()))
@@ -0,0 +1,379 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   journal.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   append only journal of the changes of a graph, next to its .graph
+#   file. Each change is a json line written as soon as it is made, so
+#   saving costs only the changes and the work is not lost when the
+#   application crashes : the journal is replayed on the graph read from
+#   the .graph file. The .graph file is only rewritten when the journal is
+#   compacted.
+#
+#   The verticies and edges are identified by a number, their position in
+#   the graph when the .graph file is read, then the next numbers for the
+#   new ones. The first line of the journal is the size and checksum of
+#   the .graph file it applies to, a journal of another version of the
+#   file is not replayed. It is not removed either, it is renamed with the
+#   ORPHAN suffix so its changes are not lost.
+
+import hashlib
+import json
+import os
+
+from ..graph.graph import Vertex, Edge
+from .instrument import count
+
+# suffix of the journal file of a .graph file
+SUFFIX = '.journal'
+# suffix of a journal kept aside because its .graph file changed
+ORPHAN = '.orphan'
+# size of the blocks read to compute the checksum of a .graph file
+BLOCK_SIZE = 1 << 20
+
+class Journal(object):
+    """
+    Journal class
+
+    records the changes of a graph, the graph calls it after each change
+    once the journal is attached to it.
+    """
+    def __init__(self, filename, base=None):
+        """
+        :param filename: (str) journal file.
+        :param base: (str) .graph file the journal applies to, None for a
+        new graph never saved.
+
+        Constructor.
+        """
+        self.filename = filename
+        self.base = base
+        self.graph = None
+        self.f = None
+        self.encode = json.JSONEncoder(separators=(',', ':')).encode
+
+        self.vx_ids = {}
+        self.edge_ids = {}
+        self.verticies = None
+        self.edges = None
+        self.next_vx = 0
+        self.next_edge = 0
+        # where the journal of another version of the base file was moved
+        self.orphan = None
+
+    def stamp(self):
+        """
+        :returns: (list) size and checksum of the base file, None if there
+        is no base file.
+
+        the checksum is of the content, a copy or a restore of the same
+        file keeps its journal, whatever its modification time.
+        """
+        if self.base is None:
+            return None
+        checksum = hashlib.blake2b(digest_size=16)
+        size = 0
+        with open(self.base, 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                checksum.update(block)
+                size += len(block)
+        return [size, checksum.hexdigest()]
+
+    def open(self, graph):
+        """
+        :param graph: (Graph) the graph read from the base file.
+
+        :returns: (int) number of changes replayed.
+
+        replay the journal on the graph and record its next changes. A
+        line cut by a crash ends the journal, it is removed. The journal of
+        another version of the base file is renamed, see orphan.
+        """
+        replayed, valid = self._load(graph)
+        if valid is None:
+            self._set_aside()
+            self._number(graph)
+            self._create()
+        else:
+            with open(self.filename, 'r+b') as f:
+                f.truncate(valid)
+
+        self._attach(graph)
+        return replayed
+
+    def replay(self, graph):
+        """
+        :param graph: (Graph) the graph read from the base file.
+
+        :returns: (int) number of changes replayed.
+
+        replay the journal on the graph without changing the journal and
+        without recording the next changes, to read the last saved graph.
+        """
+        replayed, _ = self._load(graph)
+        return replayed
+
+    def reset(self, graph, base=None):
+        """
+        :param graph: (Graph) the graph just written in the base file.
+        :param base: (str) new base file, if it changed.
+
+        start an empty journal, after the graph was saved entirely.
+        """
+        self.close()
+        if base is not None:
+            self.base = base
+        self._number(graph)
+        self._create()
+        self._attach(graph)
+
+    def sync(self):
+        """
+        make sure the recorded changes are on the disk.
+        """
+        if self.f is not None:
+            self.f.flush()
+            os.fsync(self.f.fileno())
+
+    def close(self):
+        """
+        stop recording the changes of the graph.
+        """
+        if self.graph is not None:
+            self.graph.journal = None
+            self.graph = None
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def discard(self):
+        """
+        close the journal and remove its file.
+        """
+        self.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    # the changes, called by the graph
+
+    def add_vx(self, vertex):
+        self.vx_ids[vertex] = self.next_vx
+        self._write({'op' : 'add_vx',
+                     'id' : self.next_vx,
+                     'label' : vertex.get_label(),
+                     'coords' : list(vertex.get_coords()),
+                     'color' : vertex.get_color()})
+        self.next_vx += 1
+
+    def add_edge(self, edge):
+        self.edge_ids[edge] = self.next_edge
+        self._write({'op' : 'add_edge',
+                     'id' : self.next_edge,
+                     'vx_start' : self.vx_ids[edge.get_vx_start()],
+                     'vx_end' : self.vx_ids[edge.get_vx_end()],
+                     'weight' : edge.get_weight(),
+                     'color' : edge.get_color()})
+        self.next_edge += 1
+
+    def delete_vx(self, vertex, edges):
+        # the incident edges are removed with the vertex when replayed
+        for edge in edges:
+            del self.edge_ids[edge]
+        self._write({'op' : 'delete_vx', 'id' : self.vx_ids.pop(vertex)})
+
+    def delete_edge(self, edge):
+        self._write({'op' : 'delete_edge', 'id' : self.edge_ids.pop(edge)})
+
+    def vx_color(self, vertex):
+        self._write({'op' : 'vx_color',
+                     'id' : self.vx_ids[vertex],
+                     'color' : vertex.get_color()})
+
+    def edge_color(self, edge):
+        self._write({'op' : 'edge_color',
+                     'id' : self.edge_ids[edge],
+                     'color' : edge.get_color()})
+
+    def vx_coords(self, vertex):
+        self._write({'op' : 'vx_coords',
+                     'id' : self.vx_ids[vertex],
+                     'coords' : list(vertex.get_coords())})
+
+    def directed(self):
+        self._write({'op' : 'directed'})
+
+    def weighted(self):
+        self._write({'op' : 'weighted'})
+
+    # -------------------------------------------------------------------------
+
+    def _number(self, graph):
+        """
+        :param graph: (Graph)
+
+        number the verticies and edges in the order of the graph.
+        """
+        self.vx_ids = {vertex : i for i, vertex in enumerate(graph.get_verticies())}
+        self.edge_ids = {edge : i for i, edge in enumerate(graph.get_edges())}
+        self.next_vx = len(self.vx_ids)
+        self.next_edge = len(self.edge_ids)
+
+    def _load(self, graph):
+        """
+        :param graph: (Graph) the graph read from the base file.
+
+        :returns: (Tuple(int, int)) number of changes replayed, size of the
+        valid start of the journal, None if there is no journal of this
+        version of the base file.
+        """
+        # the graph is only numbered for a journal of this version of the
+        # file, reading a graph without journal costs nothing more
+        if not os.path.exists(self.filename):
+            return 0, None
+
+        replayed = 0
+        with open(self.filename, 'rb') as f:
+            header = self._decode(f.readline())
+            if header is None or header.get('stamp') != self.stamp():
+                return 0, None
+
+            self._number(graph)
+            # the items by number, only needed to replay
+            self.verticies = {i : vertex for vertex, i in self.vx_ids.items()}
+            self.edges = {i : edge for edge, i in self.edge_ids.items()}
+
+            valid = f.tell()
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break
+                self._replay(graph, record)
+                valid += len(line)
+                replayed += 1
+
+        self.verticies = self.edges = None
+        return replayed, valid
+
+    def _set_aside(self):
+        """
+        rename a journal which does not apply to the base file, if it has
+        changes, instead of overwriting them.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as f:
+            f.readline()
+            if not f.read(1):
+                # only a header, nothing to keep
+                return
+
+        orphan = self.filename + ORPHAN
+        i = 1
+        while os.path.exists(orphan):
+            orphan = '{}{}.{}'.format(self.filename, ORPHAN, i)
+            i += 1
+        os.replace(self.filename, orphan)
+        self.orphan = orphan
+
+    def _create(self):
+        """
+        write a new journal with only its header, through a temporary file
+        so there is always a valid journal on the disk.
+        """
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.encode({'stamp' : self.stamp()}) + '\n')
+        os.replace(tmp, self.filename)
+
+    def _attach(self, graph):
+        """
+        :param graph: (Graph)
+
+        record the next changes of the graph.
+        """
+        self.f = open(self.filename, 'a')
+        self.graph = graph
+        graph.journal = self
+
+    def _write(self, record):
+        """
+        :param record: (dict) a change.
+
+        the change is flushed right away, so it is in the file if the
+        application crashes.
+        """
+        self.f.write(self.encode(record) + '\n')
+        self.f.flush()
+        count('Journal.records')
+
+    def _decode(self, line):
+        """
+        :param line: (bytes)
+
+        :returns: (dict) the record, None if the line is not complete.
+        """
+        if not line.endswith(b'\n'):
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def _replay(self, graph, record):
+        """
+        :param graph: (Graph) graph without journal attached.
+        :param record: (dict) a change.
+        """
+        op = record['op']
+        if op == 'add_vx':
+            vertex = graph.add_vx(Vertex(None, None, record['label'],
+                                         record['coords'],
+                                         color=record['color']))
+            self.vx_ids[vertex] = record['id']
+            self.verticies[record['id']] = vertex
+            self.next_vx = record['id'] + 1
+            return
+        if op == 'add_edge':
+            edge = graph.add_edge(Edge(self.verticies[record['vx_start']],
+                                       self.verticies[record['vx_end']],
+                                       None,
+                                       weight=record['weight'],
+                                       color=record['color']))
+            self.edge_ids[edge] = record['id']
+            self.edges[record['id']] = edge
+            self.next_edge = record['id'] + 1
+            return
+        if op == 'directed':
+            graph.set_to_directed()
+            return
+        if op == 'weighted':
+            graph.set_to_weighted()
+            return
+
+        if op in ('delete_vx', 'vx_color', 'vx_coords'):
+            vertex = self.verticies[record['id']]
+            if op == 'delete_vx':
+                for edge in graph.remove_vx(vertex):
+                    del self.edges[self.edge_ids.pop(edge)]
+                del self.verticies[self.vx_ids.pop(vertex)]
+            elif op == 'vx_color':
+                graph.set_vx_color(vertex, record['color'])
+            else:
+                graph.update_vx_coords(vertex, record['coords'])
+            return
+
+        edge = self.edges[record['id']]
+        if op == 'delete_edge':
+            graph.remove_edge(edge)
+            del self.edges[self.edge_ids.pop(edge)]
+        else:
+            graph.set_edge_color(edge, record['color'])
@@ -1,16 +1,30 @@
-#     ___                     _ __   _         _            
-#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __  
-#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /  
-#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\  
-#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""| 
-#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-' 
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
 #
 #
 #   log.py
-# 
-#   last update 25/03/22
+#
+#   last update 18/10/26
 #
 #   laurent vouriot
+#
+#   The lines are not inserted in the text widget as they are logged, they
+#   are kept in a ring buffer and inserted together on a timer. The widget
+#   keeps only the last lines.
+
+from collections import deque
+
+# number of lines kept in the buffer and in the text widget
+MAX_LINES = 1000
+# delay between two flushes of the buffer in the widget, in ms
+FLUSH_DELAY = 100
+# number of items of a list or tuple written in a line, the others are
+# only counted
+MAX_ITEMS = 20
 
 class Log(object):
     """
@@ -21,25 +35,90 @@ class Log(object):
     def __init__(self, text):
         """
         :param text: (tk.Text) text widget
-        
+
         constructor.
         """
         self.text = text
-        self.line_counter = 0
-    
+        self.text.tag_config('EXC', foreground='red')
+
+        # lines waiting to be inserted, with their tag, the oldest ones
+        # are dropped when more than MAX_LINES are logged between two
+        # flushes.
+        self.pending = deque(maxlen=MAX_LINES)
+        self.dropped = 0
+        self.shown = 0
+        self._flush = None
+
     def log(self, exc=False, **kwargs):
         """
-        :param **kwargs: variadic positional arguments  
-        
-        insert into the text widget the logging data.
+        :param **kwargs: variadic positional arguments
+
+        add the logging data to the lines to insert in the text widget.
         """
         if exc:
-            self.text.tag_add('EXC', str(self.line_counter) + '.0', str(self.line_counter) + '.5')
-            self.text.tag_config('EXC', foreground='red')
             for key, value in kwargs.items():
-                self.text.insert('end', value + '\n')
+                self._append(value, 'EXC')
         else:
             for key, value in kwargs.items():
-                self.text.insert('end', '[LOG] {} : {}\n'.format(key, value))
+                self._append('[LOG] {} : {}'.format(key, self._format(value)))
+
+    def flush(self):
+        """
+        insert the pending lines in the text widget with a single insert,
+        and remove the oldest lines of the widget.
+        """
+        self._flush = None
+        if not self.pending and not self.dropped:
+            return
+
+        chunks = []
+        if self.dropped:
+            chunks += ['[LOG] {} lines dropped\n'.format(self.dropped), ()]
+        for line, tag in self.pending:
+            chunks += [line + '\n', tag]
+        self.shown += len(self.pending) + (self.dropped > 0)
+        self.pending.clear()
+        self.dropped = 0
 
-        self.line_counter += 1
+        self.text.insert('end', *chunks)
+        if self.shown > MAX_LINES:
+            self.text.delete('1.0', '{}.0'.format(self.shown - MAX_LINES + 1))
+            self.shown = MAX_LINES
+        self.text.see('end')
+
+    def clear(self):
+        """
+        remove all the lines, shown or pending.
+        """
+        if self._flush is not None:
+            self.text.after_cancel(self._flush)
+            self._flush = None
+        self.pending.clear()
+        self.dropped = 0
+        self.shown = 0
+        self.text.delete('1.0', 'end')
+
+    # -------------------------------------------------------------------------
+
+    def _append(self, line, tag=()):
+        """
+        :param line: (str)
+        :param tag: (str) tag of the line in the text widget.
+        """
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append((line, tag))
+        if self._flush is None:
+            self._flush = self.text.after(FLUSH_DELAY, self.flush)
+
+    def _format(self, value):
+        """
+        :param value: logged value.
+
+        :returns: (str) the value, only the first MAX_ITEMS items of a long
+        list or tuple.
+        """
+        if isinstance(value, (list, tuple)) and len(value) > MAX_ITEMS:
+            return '{}, ... ({} items)'.format(str(value[:MAX_ITEMS])[:-1],
+                                               len(value))
+        return str(value)
@@ -8,15 +8,131 @@
 #
 #   reader_parser.py
 #
-#   last update 30/07/22
+#   last update 18/10/26
 #
 #   laurent vouriot
 # 
 #   reader parser classes to save and open graphs
 
 import json
+import re
 
-from graph.graph import *
+from ..graph.graph import *
+from .columnar import ColumnarIO
+from .journal import Journal, SUFFIX
+from .instrument import timed
+
+# size of the chunks read from and written to the .graph files
+CHUNK_SIZE = 1 << 16
+# number of verticies or edges serialized before each write
+ITEMS_PER_WRITE = 1024
+
+WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+class JSONStream(object):
+    """
+    JSONStream class
+
+    Minimal incremental reader of a json document. The file is read by
+    chunks and the values are decoded one at a time with raw_decode, so 
+    the arrays of a .graph file can be iterated without loading the whole
+    document.
+    """
+    def __init__(self, f):
+        """
+        :param f: (file) text file opened for reading.
+        """
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """
+        :returns: (bool) False if the end of the file is reached.
+
+        drop the consumed part of the buffer and read the next chunk.
+        """
+        chunk = self.f.read(CHUNK_SIZE)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """
+        :returns: (str) the next non blank character, '' at the end of 
+        the file.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """
+        :param char: (str) expected character.
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError('expected {!r} got {!r} in .graph file'.format(char, found))
+        self.pos += 1
+
+    def value(self):
+        """
+        :returns: the next json value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number or a literal may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def array(self):
+        """
+        :returns: (generator) the values of the next json array.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect(']')
+                return
+
+    def members(self):
+        """
+        :returns: (generator(str)) the keys of the next json object, the 
+        caller must read the value of each key before the next one.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect('}')
+                return
+
+# -----------------------------------------------------------------------------
 
 class IO(object):
     def find_vx_from_label(self, verticies, vx_label):
@@ -46,109 +162,158 @@ class IO(object):
                 return True
         return False
 
-    def read(self, filename):
+    @timed
+    def read(self, filename, compact=False, journal=True):
         """
         :param filename: (str) file where the graph is saved.
+        :param compact: (bool) if True the graph is created in compact mode.
+        :param journal: (bool) if True the changes saved in the journal of
+        the file are replayed (see journal.py), the graph is the last one
+        saved by the app.
 
         open a .graph file and read its content and construct a graph.
+        The binary columnar files are detected and read by ColumnarIO, 
+        their graph is always compact.
+        
+        The json file is streamed, the verticies are indexed by label as they 
+        are read so the end points of the edges are found in O(1).
+        """
+        columnar = ColumnarIO()
+        if columnar.is_columnar(filename):
+            graph = columnar.read(filename)
+        else:
+            graph = self._read_json(filename, compact)
+
+        if journal:
+            Journal(filename + SUFFIX, base=filename).replay(graph)
+        return graph
+
+    def _read_json(self, filename, compact):
+        """
+        :param filename: (str) json .graph file.
+        :param compact: (bool) if True the graph is created in compact mode.
+
+        :returns: (Graph)
         """
-        with open(filename) as f:
-            data = json.load(f)       
 
-        item_counter = 0
+        data = {'directed' : False, 'weighted' : False}
         verticies = []
-        edges = [] 
-            
-        directed = data['directed']
-        weighted = data['weighted']
-
-        # read verticies
-        for vertex in data['verticies']:
-            current_vx = Vertex(item_counter, 
-                                item_counter+1, 
-                                vertex['label'], 
-                                vertex['coords'], 
-                                color=vertex['color'])
-
-            verticies.append(current_vx)
-         
-        # read edges
-        for edge in data['edges']:
-            vx_start = None
-            vx_end = None
-
-            for vx in verticies:
-                if edge['vx_start'] == vx.get_label():
-                    vx_start = vx 
-                if edge['vx_end'] == vx.get_label():
-                    vx_end = vx
-            
-            current_edge = Edge(vx_start,
-                                vx_end,
-                                edge['line_id'],
-                                weight=edge['weight'],
-                                color=edge['color'])
-
-            edges.append(current_edge) 
+        edges = []
+        labels = {}
+        # edges read before the verticies, not written by parse() 
+        pending_edges = []
+
+        with open(filename) as f:
+            stream = JSONStream(f)
+            for key in stream.members():
+                if key == 'verticies':
+                    # read verticies
+                    for vertex in stream.array():
+                        current_vx = Vertex(None, 
+                                            None, 
+                                            vertex['label'], 
+                                            vertex['coords'], 
+                                            color=vertex['color'])
+
+                        verticies.append(current_vx)
+                        labels[vertex['label']] = current_vx
+
+                elif key == 'edges':
+                    # read edges
+                    for edge in stream.array():
+                        if labels:
+                            edges.append(self._read_edge(edge, labels))
+                        else:
+                            pending_edges.append(edge)
+                else:
+                    data[key] = stream.value()
+
+        for edge in pending_edges:
+            edges.append(self._read_edge(edge, labels))
 
         return Graph(verticies=verticies, 
                      edges=edges, 
-                     directed=directed,
-                     weighted=weighted) 
+                     directed=data['directed'],
+                     weighted=data['weighted'],
+                     compact=compact) 
+
+    def _read_edge(self, edge, labels):
+        """
+        :param edge: (dict) serialized edge.
+        :param labels: (dict) verticies by label.
+
+        :returns: (Edge)
+        """
+        return Edge(labels.get(edge['vx_start']),
+                    labels.get(edge['vx_end']),
+                    None,
+                    weight=edge['weight'],
+                    color=edge['color'])
     
+    @timed
     def parse(self, filename, graph):
         """
-        :param filename: (str) file where to save the save.
+        :param filename: (file) file where to save the save.
         :param graph: (Graph) Graph instance we want to save.
-        """
-        graph_dict = {}
-        graph_dict['directed'] = graph.is_directed()
-        graph_dict['weighted'] = graph.is_weighted()
-        graph_dict['verticies'] = []
-        graph_dict['edges'] = []
-        
-        for vertex in graph.get_verticies():
-            vx_data = {
-                       'label' : vertex.get_label(),
-                       'coords' : vertex.get_coords(),
-                       'color' : vertex.get_color()
-                      }
-            graph_dict['verticies'].append(vx_data)
-
-        for edge in graph.get_edges():
-            edge_data = {
-                          'vx_start' : edge.get_vx_start().get_label(), 
-                          'vx_end' : edge.get_vx_end().get_label(), 
-                          'line_id' : edge.get_line_id(),
-                          'weight' : edge.get_weight(),
-                          'color' : edge.get_color()
-                         }   
-
-            graph_dict['edges'].append(edge_data)
-        
-        json.dump(graph_dict, filename, indent=2) 
 
-# -----------------------------------------------------------------------------
-
-if __name__ == '__main__':
-    io = IO()
-    graph = Graph()
+        The graph is written by chunks of items without building the whole
+        document in memory. The output is compact json with the same keys 
+        as before so it can be read by the older versions.
+        """
+        encode = json.JSONEncoder(separators=(',', ':')).encode
 
-    vx1 = Vertex(1, 1, '1', [1, 2])
-    vx2 = Vertex(2, 2, '2', [3, 3])
-    vx3 = Vertex(3, 3, '3', [1, 3])
+        filename.write('{{"directed":{},"weighted":{},"verticies":['.format(
+                                                encode(graph.is_directed()),
+                                                encode(graph.is_weighted())))
 
-    e1 = Edge(vx1, vx2, 4) 
-    e2 = Edge(vx1, vx3, 5)
+        self._write_items(filename, 
+                          (encode({
+                                   'label' : vertex.get_label(),
+                                   'coords' : vertex.get_coords(),
+                                   'color' : vertex.get_color()
+                                  }) for vertex in graph.get_verticies()))
 
+        filename.write('],"edges":[')
 
-    graph.add_vx(vx1)
-    graph.add_vx(vx2)
-    graph.add_vx(vx3)
+        self._write_items(filename,
+                          (encode({
+                                   'vx_start' : edge.get_vx_start().get_label(), 
+                                   'vx_end' : edge.get_vx_end().get_label(), 
+                                   'line_id' : edge.get_line_id(),
+                                   'weight' : edge.get_weight(),
+                                   'color' : edge.get_color()
+                                  }) for edge in graph.get_edges()))
 
-    graph.add_edge(e1) 
-    graph.add_edge(e2) 
+        filename.write(']}\n')
 
-    print(io.read('ex.graph').get_edges())
+    def convert(self, src, dst, binary=True):
+        """
+        :param src: (str) .graph file to convert, json or binary.
+        :param dst: (str) converted .graph file.
+        :param binary: (bool) if True dst is written in the binary columnar 
+        format, else in json.
+        """
+        graph = self.read(src, compact=True)
+        if binary:
+            ColumnarIO().write(dst, graph)
+        else:
+            with open(dst, 'w') as f:
+                self.parse(f, graph)
 
+    def _write_items(self, f, items):
+        """
+        :param f: (file)
+        :param items: (iterable(str)) serialized items.
 
+        write the items separated by commas, ITEMS_PER_WRITE at a time.
+        """
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == ITEMS_PER_WRITE:
+                f.write(('' if first else ',') + ','.join(chunk))
+                first = False
+                chunk = []
+        if chunk:
+            f.write(('' if first else ',') + ','.join(chunk))
@@ -0,0 +1,210 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   watchdog.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   detects the stalls of the Tk event loop. A heartbeat is scheduled with
+#   after, how late it runs is the latency of the event loop. A helper
+#   thread looks at the last heartbeat, when the loop is stalled it takes
+#   the stack of the main thread, so the handler which blocks the loop is
+#   known when the stall ends and is reported.
+
+import os
+import sys
+import threading
+import time
+import traceback
+
+from collections import deque
+
+# delay between two heartbeats, in ms
+INTERVAL = 100
+# a heartbeat later than this is a stall, in ms
+THRESHOLD = 500
+# number of latencies in the histogram
+WINDOW = 1000
+# upper bounds of the buckets of the histogram, in ms
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+
+class Watchdog(object):
+    """
+    Watchdog class
+
+    measures the latency of the event loop and logs its stalls with the
+    handler which caused them.
+    """
+    def __init__(self, widget, text_log, interval=INTERVAL, threshold=THRESHOLD):
+        """
+        :param widget: (tk.Widget) any widget, to schedule the heartbeat.
+        :param text_log: (Log) where the stalls are reported.
+        :param interval: (int) delay between two heartbeats, in ms.
+        :param threshold: (int) latency of a stall, in ms.
+
+        Constructor.
+        """
+        self.widget = widget
+        self.text_log = text_log
+        self.interval = interval
+        self.threshold = threshold
+
+        self.latencies = deque(maxlen=WINDOW)
+        self.stalls = 0
+        self.worst = 0.0
+
+        self._expected = None
+        self._beat = None
+        self._last_beat = None
+        # stack of the main thread taken by the helper thread during a stall
+        self._stack = None
+        self._stop = None
+        self._thread = None
+        self._main = threading.main_thread().ident
+
+    def start(self):
+        """
+        start the heartbeat and the helper thread.
+        """
+        if self._beat is not None:
+            return
+        self._stack = None
+        self._last_beat = time.monotonic()
+        self._schedule()
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch,
+                                        args=(self._stop,),
+                                        name='graphix-watchdog',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        stop the heartbeat and the helper thread.
+        """
+        if self._beat is None:
+            return
+        self.widget.after_cancel(self._beat)
+        self._beat = None
+        self._stop.set()
+        self._thread = None
+
+    def is_running(self):
+        return self._beat is not None
+
+    def histogram(self):
+        """
+        :returns: (list(Tuple(float, int))) upper bound in ms and number of
+        the last WINDOW latencies in each bucket.
+        """
+        counts = [0] * len(BUCKETS)
+        for latency in self.latencies:
+            for i, bound in enumerate(BUCKETS):
+                if latency <= bound:
+                    counts[i] += 1
+                    break
+        return list(zip(BUCKETS, counts))
+
+    def percentile(self, p):
+        """
+        :param p: (float) between 0 and 100.
+
+        :returns: (float) the latency in ms under which are p % of the last
+        WINDOW latencies, None if there is no latency yet.
+        """
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+
+    def log_latency(self):
+        """
+        log the percentiles and the histogram of the latencies.
+        """
+        if not self.latencies:
+            self.text_log.log(latency='no heartbeat yet')
+            return
+        self.text_log.log(latency='p50 {:.1f} ms, p90 {:.1f} ms, p99 {:.1f} ms, '
+                                  'max {:.1f} ms, {} stalls'.format(
+                                        self.percentile(50),
+                                        self.percentile(90),
+                                        self.percentile(99),
+                                        self.worst,
+                                        self.stalls))
+        self.text_log.log(histogram=', '.join(
+                            '<={:g} ms : {}'.format(bound, count)
+                            for bound, count in self.histogram() if count))
+
+    # -------------------------------------------------------------------------
+
+    def _schedule(self):
+        self._expected = time.monotonic() + self.interval / 1000
+        self._beat = self.widget.after(self.interval, self._heartbeat)
+
+    def _heartbeat(self):
+        """
+        runs in the event loop, records how late it is and reports the
+        stall it ends.
+        """
+        now = time.monotonic()
+        latency = max(0.0, (now - self._expected) * 1000)
+        self._last_beat = now
+        self.latencies.append(latency)
+        self.worst = max(self.worst, latency)
+
+        stack, self._stack = self._stack, None
+        if latency >= self.threshold:
+            self.stalls += 1
+            self.text_log.log(stall='{:.0f} ms in {}'.format(
+                                        latency, self._handler(stack)))
+        self._schedule()
+
+    def _watch(self, stop):
+        """
+        :param stop: (threading.Event) set when the watchdog is stopped.
+
+        runs in the helper thread, takes the stack of the main thread once
+        per stall, while it is still blocked in the handler.
+        """
+        period = self.threshold / 2000
+        while not stop.wait(period):
+            late = (time.monotonic() - self._last_beat) * 1000
+            if self._stack is None and late >= self.threshold + self.interval:
+                frame = sys._current_frames().get(self._main)
+                if frame is not None:
+                    self._stack = traceback.extract_stack(frame)
+
+    def _handler(self, stack):
+        """
+        :param stack: (traceback.StackSummary) stack of the main thread
+        during the stall.
+
+        :returns: (str) the handler called by Tk, the first frame after
+        tkinter, and the innermost frame.
+        """
+        if not stack:
+            return 'unknown handler'
+
+        handler = None
+        for i, frame in enumerate(stack):
+            if 'tkinter' in frame.filename and i + 1 < len(stack) and \
+               'tkinter' not in stack[i + 1].filename:
+                handler = stack[i + 1]
+        inner = stack[-1]
+
+        def where(frame):
+            return '{} ({}:{})'.format(frame.name, 
+                                      os.path.basename(frame.filename),
+                                      frame.lineno)
+
+        if handler is None or handler is inner:
+            return where(inner)
+        return '{}, at {}'.format(where(handler), where(inner))
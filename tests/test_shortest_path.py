@@ -0,0 +1,109 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   test_shortest_path.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   A* and the bidirectional Dijkstra find paths as short as Dijkstra, on
+#   random graphs with and without weights :
+#
+#       python3 -m unittest discover tests
+
+import random
+import unittest
+
+from graphs.graph.geometry import vertex_bbox
+from graphs.graph.graph import Graph, Vertex, Edge
+from graphs.algorithms.shortest_path import shortest_path
+
+# number of random graphs of each kind
+GRAPHS = 30
+# number of paths looked for in each graph
+QUERIES = 20
+
+def random_graph(rng, weighted, directed):
+    """
+    :param rng: (random.Random)
+    :param weighted: (bool) if False the edges have no weight and count
+    for 1.
+    :param directed: (bool)
+
+    :returns: (Graph) a random graph with verticies anywhere on the canvas.
+    """
+    n = rng.randrange(2, 40)
+    verticies = [Vertex(None, None, str(i),
+                        list(vertex_bbox(rng.uniform(0, 1000), rng.uniform(0, 1000))))
+                 for i in range(n)]
+    edges = []
+    for _ in range(rng.randrange(0, 4 * n)):
+        start, end = rng.choice(verticies), rng.choice(verticies)
+        weight = rng.choice([0, rng.uniform(0, 50), rng.randrange(1, 1000)]) \
+                 if weighted else None
+        edges.append(Edge(start, end, None, weight=weight))
+    return Graph(verticies=verticies, edges=edges, directed=directed,
+                 weighted=weighted)
+
+class TestShortestPath(unittest.TestCase):
+
+    def check(self, weighted, directed, seed):
+        rng = random.Random(seed)
+        for _ in range(GRAPHS):
+            graph = random_graph(rng, weighted, directed)
+            verticies = list(graph.get_verticies())
+            for _ in range(QUERIES):
+                source, target = rng.choice(verticies), rng.choice(verticies)
+                expected = shortest_path(graph, source, target, 'dijkstra')
+                for method in ('astar', 'bidirectional'):
+                    result = shortest_path(graph, source, target, method)
+                    if expected is None:
+                        self.assertIsNone(result, method)
+                    else:
+                        self.assertAlmostEqual(result.cost, expected.cost,
+                                               msg=method)
+
+    def test_unweighted(self):
+        self.check(weighted=False, directed=False, seed=1)
+
+    def test_unweighted_directed(self):
+        self.check(weighted=False, directed=True, seed=2)
+
+    def test_weighted(self):
+        self.check(weighted=True, directed=False, seed=3)
+
+    def test_weighted_directed(self):
+        self.check(weighted=True, directed=True, seed=4)
+
+    def test_moved_vertex(self):
+        # the path through the middle vertex is the shortest, then the
+        # vertex is moved far away, the heuristic must follow the new 
+        # lengths of the edges
+        start, middle, end = [Vertex(None, None, str(i), list(vertex_bbox(x, 0)))
+                              for i, x in enumerate((0, 250, 500))]
+        graph = Graph(verticies=[start, middle, end],
+                      edges=[Edge(start, end, None, weight=5),
+                             Edge(start, middle, None, weight=1),
+                             Edge(middle, end, None, weight=1)],
+                      weighted=True)
+        self.assertEqual(shortest_path(graph, start, end, 'astar').cost, 2)
+        graph.update_vx_coords(middle, list(vertex_bbox(250, 10000)))
+        self.assertEqual(shortest_path(graph, start, end, 'astar').cost, 2)
+
+    def test_negative_weight(self):
+        a = Vertex(None, None, 'a', list(vertex_bbox(0, 0)))
+        b = Vertex(None, None, 'b', list(vertex_bbox(100, 0)))
+        graph = Graph(verticies=[a, b], edges=[Edge(a, b, None, weight=-1)],
+                      weighted=True)
+        for method in ('dijkstra', 'astar', 'bidirectional'):
+            with self.assertRaises(ValueError):
+                shortest_path(graph, a, b, method)
+
+if __name__ == '__main__':
+    unittest.main()
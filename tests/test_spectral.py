@@ -0,0 +1,75 @@
+#     ___                     _ __   _         _
+#    / __|     _ _   __ _    | '_ \ | |_      (_)    __ __
+#   | (_ |    | '_| / _` |   | .__/ | ' \     | |    \ \ /
+#    \___|   _|_|_  \__,_|   |_|__  |_||_|   _|_|_   /_\_\
+#   _|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|_|"""""|
+#   "`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'"`-0-0-'
+#
+#
+#   test_spectral.py
+#
+#   last update 18/10/26
+#
+#   laurent vouriot
+#
+#   the iterative eigen solver of the spectral layout finds the same
+#   eigenvectors as the dense one, also for equal eigenvalues.
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from graphs.graph.geometry import vertex_bbox
+from graphs.graph.graph import Graph, Vertex, Edge
+
+# number of verticies on a side of the grid
+SIDE = 40
+
+def square_grid(side):
+    """
+    :param side: (int)
+
+    :returns: (Graph) a side x side grid, its second smallest eigenvalue
+    is double, one eigenvector for each direction of the grid.
+    """
+    verticies = [Vertex(None, None, str(i),
+                        list(vertex_bbox(i % side * 40, i // side * 40)))
+                 for i in range(side * side)]
+    edges = []
+    for i in range(side * side):
+        if (i + 1) % side:
+            edges.append(Edge(verticies[i], verticies[i + 1], None))
+        if i + side < side * side:
+            edges.append(Edge(verticies[i], verticies[i + side], None))
+    return Graph(verticies=verticies, edges=edges)
+
+@unittest.skipIf(np is None, 'numpy is needed for the spectral layout')
+class TestSpectral(unittest.TestCase):
+
+    def test_double_eigenvalue(self):
+        from graphs.graph.matrices import sparse_laplacian
+        from graphs.layout.spectral import DENSE_LIMIT, smallest_eigenvectors
+
+        self.assertGreater(SIDE * SIDE, DENSE_LIMIT)
+        laplacian, degrees = sparse_laplacian(square_grid(SIDE), weighted=True)
+        vectors = smallest_eigenvectors(laplacian, degrees, 2,
+                                        np.random.default_rng(0))
+
+        values, dense = np.linalg.eigh(laplacian.toarray())
+        self.assertAlmostEqual(values[1], values[2])
+        for vector in vectors.T:
+            self.assertAlmostEqual(vector @ laplacian.dot(vector) / (vector @ vector),
+                                   values[1])
+
+        # the two vectors span the same plane as the dense eigenvectors of
+        # the double eigenvalue, the cosines of the angles between the
+        # planes are 1
+        vectors, _ = np.linalg.qr(vectors)
+        cosines = np.linalg.svd(dense[:, 1:3].T @ vectors, compute_uv=False)
+        np.testing.assert_allclose(cosines, 1, atol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()